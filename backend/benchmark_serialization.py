@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""
+Benchmark script for GraphQL response serialization.
+This script measures encoding time and bytes on the wire for a
+GET_TASKS-shaped response with 10,000 tasks.
+"""
+
+import gzip
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.append(str(Path(__file__).parent))
+
+# Set Django settings
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+TASK_COUNT = 10000
+ROUNDS = 5
+
+
+def build_response(task_count=TASK_COUNT):
+    """Build an execution result shaped like the frontend's GET_TASKS query."""
+    now = datetime(2025, 8, 17, 11, 6, tzinfo=timezone.utc)
+    organization = {'id': '1', 'name': 'Test Company Inc.', 'slug': 'test-company-inc'}
+    project = {'id': '1', 'name': 'Website Redesign', 'organization': organization}
+    statuses = ['TODO', 'IN_PROGRESS', 'REVIEW', 'DONE']
+    tasks = []
+    for i in range(task_count):
+        tasks.append({
+            'id': str(i + 1),
+            'title': f'Task {i + 1}',
+            'description': 'Create wireframes and mockups for the homepage. ' * 3,
+            'status': statuses[i % 4],
+            'assigneeEmail': f'user{i % 25}@company.com',
+            # graphene serializes DateTime scalars to ISO strings
+            'dueDate': (now + timedelta(days=i % 60)).isoformat(),
+            'createdAt': now.isoformat(),
+            'updatedAt': now.isoformat(),
+            'project': project,
+            'commentCount': i % 7,
+            'isOverdue': i % 5 == 0,
+        })
+    return {'data': {'tasks': tasks}}
+
+
+def time_encoder(encode, payload, rounds=ROUNDS):
+    """Return (median seconds, encoded bytes) for an encoder."""
+    timings = []
+    encoded = b''
+    for _ in range(rounds):
+        start = time.perf_counter()
+        encoded = encode(payload)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), encoded
+
+
+def main():
+    """Main benchmark function."""
+    import django
+    django.setup()
+
+    from core.compression import brotli
+    from core.encoding import OrjsonEncoder, StdlibEncoder, orjson
+
+    print(f"📊 Serializing a {TASK_COUNT:,}-task GET_TASKS response ({ROUNDS} rounds, median)")
+    print("=" * 60)
+
+    payload = build_response()
+    encoders = [
+        ('json.dumps (graphene default)', lambda d: json.dumps(d, separators=(',', ':')).encode()),
+        ('StdlibEncoder', StdlibEncoder().encode),
+    ]
+    if orjson is not None:
+        encoders.append(('OrjsonEncoder', OrjsonEncoder().encode))
+    else:
+        print("orjson not installed, skipping OrjsonEncoder (pip install orjson)")
+
+    body = b''
+    for name, encode in encoders:
+        seconds, body = time_encoder(encode, payload)
+        print(f"{name:32} {seconds * 1000:8.1f} ms")
+
+    print("\n📦 Bytes on the wire")
+    print("=" * 60)
+    print(f"{'identity':32} {len(body):>10,} bytes")
+    seconds, gzipped = time_encoder(lambda b: gzip.compress(b, compresslevel=6), body)
+    print(f"{'gzip (level 6)':32} {len(gzipped):>10,} bytes  {seconds * 1000:6.1f} ms")
+    if brotli is not None:
+        seconds, compressed = time_encoder(lambda b: brotli.compress(b, quality=5), body)
+        print(f"{'brotli (quality 5)':32} {len(compressed):>10,} bytes  {seconds * 1000:6.1f} ms")
+    else:
+        print("brotli not installed, skipping (pip install brotli)")
+
+    return True
+
+
+if __name__ == '__main__':
+    main()
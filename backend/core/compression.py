@@ -0,0 +1,74 @@
+"""
+Negotiated response compression for large GraphQL payloads.
+
+Brotli is preferred when the client accepts it and the ``brotli`` package
+is installed, gzip otherwise. Responses smaller than
+``GRAPHQL_COMPRESSION_MIN_SIZE`` bytes are sent as is, since compressing
+them costs more than it saves.
+"""
+
+import gzip
+import re
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+# A quality value as RFC 9110 defines it: 0 to 1 with up to three decimals.
+QVALUE = re.compile(r'0(\.\d{0,3})?|1(\.0{0,3})?')
+
+
+def _accepted_encodings(request):
+    """Codings the request accepts; ones with a malformed quality value are ignored."""
+    accepted = set()
+    for part in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        coding, *params = (piece.strip() for piece in part.split(';'))
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                value = value.strip()
+                quality = float(value) if QVALUE.fullmatch(value) else 0
+        if coding and quality:
+            accepted.add(coding.lower())
+    return accepted
+
+
+def choose_encoding(request):
+    accepted = _accepted_encodings(request)
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+def compress(content, encoding):
+    if encoding == 'br':
+        return brotli.compress(content, quality=getattr(settings, 'GRAPHQL_BROTLI_QUALITY', 5))
+    return gzip.compress(content, compresslevel=getattr(settings, 'GRAPHQL_GZIP_LEVEL', 6))
+
+
+def compress_response(request, response):
+    """Compress ``response`` in place when worthwhile; returns it."""
+    if response.streaming or response.has_header('Content-Encoding'):
+        return response
+    patch_vary_headers(response, ('Accept-Encoding',))
+    if len(response.content) < getattr(settings, 'GRAPHQL_COMPRESSION_MIN_SIZE', 1024):
+        return response
+    encoding = choose_encoding(request)
+    if encoding is None:
+        return response
+
+    response.content = compress(response.content, encoding)
+    response['Content-Encoding'] = encoding
+    response['Content-Length'] = str(len(response.content))
+    etag = response.get('ETag')
+    if etag and not etag.startswith('W/'):
+        # The compressed bytes differ, so a strong validator must weaken.
+        response['ETag'] = 'W/' + etag
+    return response
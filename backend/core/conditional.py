@@ -0,0 +1,211 @@
+"""
+HTTP conditional requests (ETag / If-None-Match) for GraphQL GET queries.
+
+A query whose root fields are all scoped to one organization (e.g.
+``projects(organizationSlug:)``) is tagged with that organization's data
+version (core.versioning); any other query uses the global version. When
+the client's If-None-Match matches, the view answers 304 before running
+any resolver. With ``VERSION_SHORT_CIRCUIT`` disabled the ETag is a hash
+of the response body instead, which saves bandwidth but not execution.
+
+Version tokens live in the cache backend, so the short circuit needs one
+shared by every process: with a process-local backend (LocMemCache) a
+write handled by one process would not change the tokens the others
+validate against. It is therefore off on such backends whatever the
+setting says.
+
+Some fields change with the clock alone (a task becomes overdue without
+any write), so the ETag of an operation selecting them also includes the
+current TIME_BUCKET_SECONDS window.
+"""
+
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from graphql import GraphQLError, get_operation_ast
+from graphql.language.ast import (
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    InlineFragmentNode,
+    OperationType,
+    StringValueNode,
+    VariableNode,
+)
+
+from core.ratelimit import parse_query
+from core.versioning import get_global_version, get_organization_version
+from organizations.cache import get_organization_by_slug
+from organizations.models import Organization
+
+
+DEFAULTS = {
+    'ENABLED': True,
+    'VERSION_SHORT_CIRCUIT': True,
+    'TIME_BUCKET_SECONDS': 60,
+}
+
+# Root query fields whose whole result depends on one organization, and
+# the argument that names it.
+ORGANIZATION_SCOPED_FIELDS = {
+    'organization': 'slug',
+    'projects': 'organizationSlug',
+    'organizationStats': 'organizationSlug',
+    'assigneeWorkload': 'organizationSlug',
+    'labels': 'organizationSlug',
+}
+
+# Root query fields a data version cannot validate: ``changesSince``
+# changes with time (entries settle), and ``job`` and ``deletion`` change
+# as the worker runs them, which bumps no version.
+UNVERSIONED_FIELDS = {'changesSince', 'job', 'deletion'}
+
+# Fields, at any depth, whose values depend on the current time:
+# ``isOverdue`` of tasks and projects, and the overdue counts and next due
+# dates of ``assigneeWorkload``.
+TIME_DEPENDENT_FIELDS = {'isOverdue', 'assigneeWorkload'}
+
+
+# Cache backends that are not shared between processes.
+PROCESS_LOCAL_CACHES = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+
+
+def get_setting(name):
+    return getattr(settings, 'GRAPHQL_ETAG', {}).get(name, DEFAULTS[name])
+
+
+def version_short_circuit():
+    """Whether version ETags may answer 304 before execution."""
+    backend = settings.CACHES.get('default', {}).get('BACKEND')
+    return bool(get_setting('VERSION_SHORT_CIRCUIT')) and backend not in PROCESS_LOCAL_CACHES
+
+
+def _argument_value(node, variables):
+    if isinstance(node, VariableNode):
+        return (variables or {}).get(node.name.value)
+    if isinstance(node, StringValueNode):
+        return node.value
+    return None
+
+
+def _organization_slug(operation, variables):
+    """The single organization an operation reads, or None if it may read more."""
+    slugs = set()
+    for selection in operation.selection_set.selections:
+        if not isinstance(selection, FieldNode):
+            return None
+        name = selection.name.value
+        if name == '__typename':
+            continue
+        argument_name = ORGANIZATION_SCOPED_FIELDS.get(name)
+        if argument_name is None:
+            return None
+        values = [
+            _argument_value(argument.value, variables)
+            for argument in selection.arguments
+            if argument.name.value == argument_name
+        ]
+        if len(values) != 1 or not isinstance(values[0], str):
+            return None
+        slugs.add(values[0])
+    return slugs.pop() if len(slugs) == 1 else None
+
+
+def query_operation(query, operation_name):
+    """Return the query operation to run, or None for mutations/invalid documents."""
+    try:
+        document = parse_query(query)
+    except GraphQLError:
+        return None
+    operation = get_operation_ast(document, operation_name)
+    if operation is None or operation.operation != OperationType.QUERY:
+        return None
+    return operation
+
+
+def data_version(operation, variables):
+    slug = _organization_slug(operation, variables)
+    if slug is not None:
+        try:
+            return get_organization_version(get_organization_by_slug(slug).id)
+        except Organization.DoesNotExist:
+            pass
+    return get_global_version()
+
+
+def _selects_time_dependent(selection_set, fragments, visited=frozenset()):
+    if selection_set is None:
+        return False
+    for selection in selection_set.selections:
+        if isinstance(selection, FieldNode):
+            if selection.name.value in TIME_DEPENDENT_FIELDS:
+                return True
+            if _selects_time_dependent(selection.selection_set, fragments, visited):
+                return True
+        elif isinstance(selection, InlineFragmentNode):
+            if _selects_time_dependent(selection.selection_set, fragments, visited):
+                return True
+        elif isinstance(selection, FragmentSpreadNode):
+            name = selection.name.value
+            fragment = fragments.get(name)
+            if fragment is not None and name not in visited:
+                if _selects_time_dependent(fragment.selection_set, fragments, visited | {name}):
+                    return True
+    return False
+
+
+def time_bucket(query, operation):
+    """The current time window if ``operation`` selects time-dependent fields, else ''."""
+    fragments = {
+        definition.name.value: definition
+        for definition in parse_query(query).definitions
+        if isinstance(definition, FragmentDefinitionNode)
+    }
+    if not _selects_time_dependent(operation.selection_set, fragments):
+        return ''
+    return str(int(time.time() // get_setting('TIME_BUCKET_SECONDS')))
+
+
+def _tag(*parts):
+    digest = hashlib.sha1('\x1f'.join(parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def version_etag(query, variables, operation_name):
+    """
+    ETag for a GET query derived from the data version, or None when the
+    request is not a cacheable query.
+    """
+    operation = query_operation(query, operation_name)
+    if operation is None or any(
+        isinstance(selection, FieldNode) and selection.name.value in UNVERSIONED_FIELDS
+        for selection in operation.selection_set.selections
+    ):
+        return None
+    return 'W/' + _tag(
+        data_version(operation, variables),
+        time_bucket(query, operation),
+        query,
+        json.dumps(variables or {}, sort_keys=True),
+        operation_name or '',
+    )
+
+
+def body_etag(content):
+    return f'"{hashlib.sha1(content).hexdigest()}"'
+
+
+def etag_matches(request, etag):
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    # Weak comparison, as for GET requests.
+    candidates = {candidate.strip().removeprefix('W/') for candidate in header.split(',')}
+    return etag.removeprefix('W/') in candidates
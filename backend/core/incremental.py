@@ -0,0 +1,328 @@
+"""
+Incremental delivery (``@defer`` / ``@stream``) for GraphQL queries.
+
+graphql-core 3.2 has no incremental execution, so IncrementalExecutionContext
+extends its ExecutionContext: fragments marked ``@defer`` are left out of
+the initial result and executed afterwards against the same parent object,
+and lists marked ``@stream(initialCount:)`` complete only their first items
+up front. The remaining work is sent as subsequent payloads in a
+``multipart/mixed`` response, in the format Apollo Client understands
+(``deferSpec=20220824``):
+
+    {"data": {...}, "hasNext": true}
+    {"incremental": [{"data": {...}, "path": [...]}], "hasNext": true}
+    {"incremental": [{"items": [...], "path": ["tasks", 20]}], "hasNext": false}
+
+Clients that do not accept multipart/mixed get a single ordinary response,
+with the directives ignored.
+"""
+
+from collections import deque
+
+from django.conf import settings
+from graphql import (
+    DirectiveLocation,
+    GraphQLArgument,
+    GraphQLBoolean,
+    GraphQLDirective,
+    GraphQLError,
+    GraphQLInt,
+    GraphQLNonNull,
+    GraphQLString,
+    OperationType,
+    located_error,
+    specified_directives,
+    validate,
+)
+from graphql.execution import ExecutionContext
+from graphql.execution.collect_fields import (
+    does_fragment_condition_match,
+    get_field_entry_key,
+    should_include_node,
+)
+from graphql.execution.execute import invalid_return_type_error
+from graphql.execution.values import get_directive_values
+from graphql.language import BREAK, FieldNode, InlineFragmentNode, Visitor, visit
+from graphql.pyutils import is_iterable
+
+
+DEFAULTS = {
+    'ENABLED': True,
+    # Deferred fragments / streamed items sent per subsequent payload
+    'BATCH_SIZE': 50,
+}
+
+CONTENT_TYPE = 'multipart/mixed; boundary="-"; deferSpec=20220824'
+
+_if_argument = GraphQLArgument(
+    GraphQLNonNull(GraphQLBoolean),
+    default_value=True,
+    description="Deferred or streamed when true.",
+)
+
+DeferDirective = GraphQLDirective(
+    name='defer',
+    locations=[DirectiveLocation.FRAGMENT_SPREAD, DirectiveLocation.INLINE_FRAGMENT],
+    args={
+        'if': _if_argument,
+        'label': GraphQLArgument(GraphQLString, description="Identifies the payload."),
+    },
+    description="Delivers the fragment after the rest of the response.",
+)
+
+StreamDirective = GraphQLDirective(
+    name='stream',
+    locations=[DirectiveLocation.FIELD],
+    args={
+        'if': _if_argument,
+        'label': GraphQLArgument(GraphQLString, description="Identifies the payloads."),
+        'initialCount': GraphQLArgument(
+            GraphQLNonNull(GraphQLInt),
+            default_value=0,
+            description="Number of items in the initial response.",
+        ),
+    },
+    description="Delivers the items of a list after its first initialCount items.",
+)
+
+DIRECTIVES = [*specified_directives, DeferDirective, StreamDirective]
+
+
+def get_setting(name):
+    return getattr(settings, 'GRAPHQL_INCREMENTAL', {}).get(name, DEFAULTS[name])
+
+
+class _IncrementalDirectiveFinder(Visitor):
+    found = False
+
+    def enter_directive(self, node, *args):
+        if node.name.value in (DeferDirective.name, StreamDirective.name):
+            self.found = True
+            return BREAK
+
+
+def uses_incremental_delivery(document):
+    finder = _IncrementalDirectiveFinder()
+    visit(document, finder)
+    return finder.found
+
+
+def accepts_multipart(request):
+    return 'multipart/mixed' in request.META.get('HTTP_ACCEPT', '')
+
+
+class DeferredFragment:
+    def __init__(self, label, path, parent_type, source, fields):
+        self.label = label
+        self.path = path
+        self.parent_type = parent_type
+        self.source = source
+        self.fields = fields
+
+    def execute(self, context, batch_size):
+        start = len(context.collected_errors.errors)
+        try:
+            data = context.execute_fields(self.parent_type, self.source, self.path, self.fields)
+            errors = context.collected_errors.errors[start:]
+        except GraphQLError as error:
+            data = None
+            errors = [*context.collected_errors.errors[start:], error]
+        return {'data': data, 'path': self.path.as_list() if self.path else []}, errors
+
+
+class StreamedList:
+    def __init__(self, label, path, item_type, field_nodes, info, items, index):
+        self.label = label
+        self.path = path
+        self.item_type = item_type
+        self.field_nodes = field_nodes
+        self.info = info
+        self.items = items
+        self.index = index
+
+    @property
+    def exhausted(self):
+        return self.index >= len(self.items)
+
+    def execute(self, context, batch_size):
+        start = len(context.collected_errors.errors)
+        first_index = self.index
+        chunk = self.items[first_index:first_index + batch_size]
+        self.index += len(chunk)
+        completed = []
+        try:
+            for offset, item in enumerate(chunk):
+                item_path = self.path.add_key(first_index + offset, None)
+                try:
+                    completed.append(context.complete_value(
+                        self.item_type, self.field_nodes, self.info, item_path, item
+                    ))
+                except Exception as raw_error:
+                    error = located_error(raw_error, self.field_nodes, item_path.as_list())
+                    context.handle_field_error(error, self.item_type, item_path)
+                    completed.append(None)
+            errors = context.collected_errors.errors[start:]
+        except GraphQLError as error:
+            # A non-null item failed: the rest of the list cannot be sent.
+            completed = None
+            errors = [*context.collected_errors.errors[start:], error]
+            self.index = len(self.items)
+        return {'items': completed, 'path': self.path.add_key(first_index, None).as_list()}, errors
+
+
+class IncrementalExecutionContext(ExecutionContext):
+    """ExecutionContext that postpones @defer fragments and @stream items."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pending = deque()
+        self._collected_cache = {}
+
+    def _collect(self, runtime_type, selection_set, fields, deferred, visited):
+        for selection in selection_set.selections:
+            if not should_include_node(self.variable_values, selection):
+                continue
+            if isinstance(selection, FieldNode):
+                fields.setdefault(get_field_entry_key(selection), []).append(selection)
+                continue
+            if isinstance(selection, InlineFragmentNode):
+                fragment = selection
+            else:
+                name = selection.name.value
+                if name in visited:
+                    continue
+                visited.add(name)
+                fragment = self.fragments.get(name)
+                if fragment is None:
+                    continue
+            if not does_fragment_condition_match(self.schema, fragment, runtime_type):
+                continue
+            defer = get_directive_values(DeferDirective, selection, self.variable_values)
+            if defer and defer['if']:
+                deferred_fields = {}
+                self._collect(runtime_type, fragment.selection_set, deferred_fields, deferred, visited)
+                deferred.append((defer.get('label'), deferred_fields))
+            else:
+                self._collect(runtime_type, fragment.selection_set, fields, deferred, visited)
+
+    def collect(self, runtime_type, selection_sets):
+        """Return (fields, [(label, deferred fields)]) for the selection sets."""
+        key = (runtime_type, *map(id, selection_sets))
+        collected = self._collected_cache.get(key)
+        if collected is None:
+            fields, deferred, visited = {}, [], set()
+            for selection_set in selection_sets:
+                self._collect(runtime_type, selection_set, fields, deferred, visited)
+            collected = self._collected_cache[key] = (fields, deferred)
+        return collected
+
+    def defer(self, deferred, path, parent_type, source):
+        for label, fields in deferred:
+            self.pending.append(DeferredFragment(label, path, parent_type, source, fields))
+
+    def execute_operation(self, operation, root_value):
+        root_type = self.schema.get_root_type(operation.operation)
+        if root_type is None:
+            raise GraphQLError(
+                f"Schema is not configured to execute {operation.operation.value} operation.",
+                operation,
+            )
+        fields, deferred = self.collect(root_type, [operation.selection_set])
+        self.defer(deferred, None, root_type, root_value)
+        if operation.operation == OperationType.MUTATION:
+            return self.execute_fields_serially(root_type, root_value, None, fields)
+        return self.execute_fields(root_type, root_value, None, fields)
+
+    def complete_object_value(self, return_type, field_nodes, info, path, result):
+        # Resolvers here are synchronous, so is_type_of is never awaitable.
+        if return_type.is_type_of and not return_type.is_type_of(result, info):
+            raise invalid_return_type_error(return_type, result, field_nodes)
+        selection_sets = [node.selection_set for node in field_nodes if node.selection_set]
+        fields, deferred = self.collect(return_type, selection_sets)
+        self.defer(deferred, path, return_type, result)
+        return self.execute_fields(return_type, result, path, fields)
+
+    def get_stream(self, field_nodes):
+        for node in field_nodes:
+            stream = get_directive_values(StreamDirective, node, self.variable_values)
+            if stream and stream['if']:
+                if stream['initialCount'] < 0:
+                    raise GraphQLError("initialCount must be a positive integer.", node)
+                return stream
+        return None
+
+    def complete_list_value(self, return_type, field_nodes, info, path, result):
+        stream = self.get_stream(field_nodes)
+        if stream is None or not is_iterable(result):
+            return super().complete_list_value(return_type, field_nodes, info, path, result)
+        # The resolver has already fetched the rows (querysets load whole);
+        # what is streamed is completing and serializing each item.
+        items = list(result)
+        initial_count = stream['initialCount']
+        completed = super().complete_list_value(
+            return_type, field_nodes, info, path, items[:initial_count]
+        )
+        if len(items) > initial_count:
+            self.pending.append(StreamedList(
+                stream.get('label'), path, return_type.of_type, field_nodes, info, items, initial_count
+            ))
+        return completed
+
+    def _path_nulled(self, path):
+        # An error nulled an ancestor: its deferred work has nowhere to go.
+        return self.collected_errors._has_nulled_position(path)
+
+    def payloads(self, format_error):
+        """Yield the initial result, then one payload per batch of pending work."""
+        try:
+            data = self.execute_operation(self.operation, self.root_value)
+        except GraphQLError as error:
+            self.collected_errors.add(error, None)
+            data = None
+            self.pending.clear()
+        result = self.build_response(data, self.collected_errors.errors)
+        initial = {'data': result.data}
+        if result.errors:
+            initial['errors'] = [format_error(error) for error in result.errors]
+        initial['hasNext'] = bool(self.pending)
+        yield initial
+
+        batch_size = get_setting('BATCH_SIZE')
+        while self.pending:
+            incremental = []
+            while self.pending and len(incremental) < batch_size:
+                record = self.pending.popleft()
+                if record.path is not None and self._path_nulled(record.path):
+                    continue
+                entry, errors = record.execute(self, batch_size)
+                if record.label is not None:
+                    entry['label'] = record.label
+                if errors:
+                    entry['errors'] = [format_error(error) for error in errors]
+                incremental.append(entry)
+                if isinstance(record, StreamedList) and not record.exhausted:
+                    self.pending.append(record)
+            payload = {'incremental': incremental} if incremental else {}
+            payload['hasNext'] = bool(self.pending)
+            yield payload
+
+
+def execute_incrementally(schema, document, format_error, **options):
+    """
+    Validate and start executing ``document``. Returns a generator of
+    payload dicts, or None if the request is invalid; the caller then
+    falls back to ordinary execution, which reports the errors.
+    """
+    if validate(schema, document):
+        return None
+    context = IncrementalExecutionContext.build(schema, document, **options)
+    if isinstance(context, list):
+        return None
+    return context.payloads(format_error)
+
+
+def multipart_chunks(payloads, encode):
+    """Frame encoded payloads as multipart/mixed parts."""
+    for payload in payloads:
+        yield b'\r\n---\r\nContent-Type: application/json; charset=utf-8\r\n\r\n' + encode(payload)
+    yield b'\r\n-----\r\n'
@@ -0,0 +1,81 @@
+"""
+In-memory cache of introspection results.
+
+GraphiQL, Apollo devtools and codegen send the full introspection query
+over and over, and its answer only changes with the schema. Results are
+kept per (schema hash, query, variables, operation name), the hash being
+taken over the printed SDL, so a deploy that changes the schema never
+serves a stale answer.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+from django.conf import settings
+from graphql import GraphQLError, get_operation_ast, print_schema
+from graphql.language.ast import FieldNode, OperationType
+
+from core import metrics
+from core.ratelimit import parse_query
+
+
+INTROSPECTION_FIELDS = {'__schema', '__type', '__typename'}
+
+_lock = threading.Lock()
+_results = OrderedDict()
+
+metrics.describe('graphql_introspection_cache_total', 'Introspection queries served from / added to the cache.')
+
+
+@lru_cache(maxsize=4)
+def schema_hash(graphql_schema):
+    return hashlib.sha256(print_schema(graphql_schema).encode()).hexdigest()
+
+
+def is_introspection(query, operation_name):
+    """Whether the operation only selects introspection fields."""
+    try:
+        document = parse_query(query)
+    except GraphQLError:
+        return False
+    operation = get_operation_ast(document, operation_name)
+    if operation is None or operation.operation != OperationType.QUERY:
+        return False
+    return all(
+        isinstance(selection, FieldNode) and selection.name.value in INTROSPECTION_FIELDS
+        for selection in operation.selection_set.selections
+    )
+
+
+def cache_key(graphql_schema, query, variables, operation_name):
+    """Key for an introspection request, or None if it must be executed."""
+    size = getattr(settings, 'GRAPHQL_INTROSPECTION_CACHE_SIZE', 16)
+    if not size or not query or not is_introspection(query, operation_name):
+        return None
+    return (
+        schema_hash(graphql_schema),
+        query,
+        json.dumps(variables or {}, sort_keys=True),
+        operation_name or '',
+    )
+
+
+def get(key):
+    with _lock:
+        data = _results.get(key)
+        if data is not None:
+            _results.move_to_end(key)
+    metrics.increment('graphql_introspection_cache_total', outcome='hit' if data is not None else 'miss')
+    return data
+
+
+def put(key, data):
+    size = getattr(settings, 'GRAPHQL_INTROSPECTION_CACHE_SIZE', 16)
+    with _lock:
+        _results[key] = data
+        _results.move_to_end(key)
+        while len(_results) > size:
+            _results.popitem(last=False)
@@ -0,0 +1,78 @@
+"""
+Request-scoped loaders.
+
+A loader batch-loads objects by key and memoizes them on the GraphQL
+context (the HTTP request), so every operation of a batched request, and
+every resolver within an operation, shares one lookup per key.
+"""
+
+import threading
+
+from projects.models import Project
+
+
+def _load_projects(ids):
+    return Project.objects.in_bulk(ids)
+
+
+LOADERS = {
+    'project': _load_projects,
+}
+
+CONTEXT_ATTRIBUTE = '_graphql_loaders'
+_context_lock = threading.Lock()
+
+
+class Loader:
+    """Memoizing batch loader; ``batch_load(keys)`` returns {key: object}."""
+
+    def __init__(self, batch_load):
+        self.batch_load = batch_load
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def _normalize(self, key):
+        # GraphQL IDs arrive as strings; model primary keys are ints.
+        return int(key) if isinstance(key, str) and key.isdigit() else key
+
+    def load_many(self, keys):
+        keys = [self._normalize(key) for key in keys]
+        with self._lock:
+            missing = [key for key in dict.fromkeys(keys) if key not in self._cache]
+            if missing:
+                loaded = self.batch_load(missing)
+                for key in missing:
+                    self._cache[key] = loaded.get(key)
+            return [self._cache[key] for key in keys]
+
+    def load(self, key):
+        """Return the object for ``key``, or None if it does not exist."""
+        return self.load_many([key])[0]
+
+    def prime(self, key, value):
+        with self._lock:
+            self._cache[self._normalize(key)] = value
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+def get_loader(context, name):
+    """Return the loader ``name`` bound to the request ``context``."""
+    if context is None:
+        return Loader(LOADERS[name])
+    with _context_lock:
+        loaders = getattr(context, CONTEXT_ATTRIBUTE, None)
+        if loaders is None:
+            loaders = {}
+            setattr(context, CONTEXT_ATTRIBUTE, loaders)
+        if name not in loaders:
+            loaders[name] = Loader(LOADERS[name])
+        return loaders[name]
+
+
+def clear_loaders(context):
+    """Forget everything loaded for ``context``, e.g. after a mutation."""
+    for loader in getattr(context, CONTEXT_ATTRIBUTE, {}).values():
+        loader.clear()
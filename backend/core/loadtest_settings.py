@@ -0,0 +1,20 @@
+"""
+Settings for loadtest.py: the regular settings, with admission control off
+(every simulated user comes from the same IP) and a separate database, so
+seeded data stays out of db.sqlite3.
+"""
+
+from core.settings import *  # noqa: F401,F403
+from core.settings import BASE_DIR, GRAPHQL_RATE_LIMIT
+
+# DEBUG keeps every SQL query in memory.
+DEBUG = False
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'loadtest.sqlite3',
+    }
+}
+
+GRAPHQL_RATE_LIMIT = {**GRAPHQL_RATE_LIMIT, 'ENABLED': False}
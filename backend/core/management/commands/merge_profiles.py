@@ -0,0 +1,60 @@
+import time
+from collections import Counter
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.profiling import SUFFIX, merge_captures, profile_directory
+
+
+class Command(BaseCommand):
+    help = "Merge request profiler captures into one collapsed-stack file per operation."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--directory',
+            help="Capture directory (default: REQUEST_PROFILER['DIRECTORY']).",
+        )
+        parser.add_argument(
+            '--output',
+            help="Where to write <operation>.collapsed files (default: <directory>-merged).",
+        )
+        parser.add_argument('--operation', help="Only merge this operation.")
+        parser.add_argument('--organization', help="Only merge captures tagged with this organization.")
+        parser.add_argument(
+            '--since',
+            type=float,
+            metavar='HOURS',
+            help="Only merge captures written in the last HOURS hours.",
+        )
+        parser.add_argument('--top', type=int, default=5, help="Hottest functions listed per operation.")
+
+    def handle(self, *args, **options):
+        directory = Path(options['directory']) if options['directory'] else profile_directory()
+        if not directory.is_dir():
+            raise CommandError(f"No captures in {directory}")
+        output = Path(options['output']) if options['output'] else directory.with_name(f'{directory.name}-merged')
+        since = time.time() - options['since'] * 3600 if options['since'] else None
+
+        merged = merge_captures(directory, options['operation'], options['organization'], since)
+        if not merged:
+            self.stdout.write("No matching captures")
+            return
+
+        output.mkdir(parents=True, exist_ok=True)
+        for operation, (count, stacks) in merged.items():
+            path = output / f'{operation}{SUFFIX}'
+            with open(path, 'w') as merged_file:
+                for stack, samples in stacks.most_common():
+                    merged_file.write(f'{stack} {samples}\n')
+
+            total = sum(stacks.values())
+            self.stdout.write(self.style.SUCCESS(
+                f"{operation}: {count} capture(s), {total} samples -> {path}"
+            ))
+            # Self time: samples whose innermost frame is the function.
+            leaves = Counter()
+            for stack, samples in stacks.items():
+                leaves[stack.rpartition(';')[2]] += samples
+            for frame, samples in leaves.most_common(options['top']):
+                self.stdout.write(f"  {samples / total:6.1%}  {frame}")
@@ -0,0 +1,66 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.slowsql import get_setting, load_stats, percentile
+
+
+SORT_KEYS = {
+    'total': lambda entry: entry['total_ms'],
+    'count': lambda entry: entry['count'],
+    'p99': lambda entry: percentile(entry['samples'], 0.99),
+    # Statements repeated within one request: the N+1 candidates.
+    'per-request': lambda entry: entry['max_per_request'],
+}
+
+
+class Command(BaseCommand):
+    help = "Rank SQL statement fingerprints recorded by the slow SQL log."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--directory',
+            help="Stats directory (default: SLOW_SQL['DIRECTORY']).",
+        )
+        parser.add_argument('--sort', choices=sorted(SORT_KEYS), default='total')
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument('--operation', help="Only statements issued by this GraphQL operation.")
+        parser.add_argument('--plans', action='store_true', help="Show the EXPLAIN plan of slow statements.")
+        parser.add_argument('--reset', action='store_true', help="Delete the recorded stats.")
+
+    def handle(self, *args, **options):
+        directory = Path(options['directory'] or get_setting('DIRECTORY'))
+        if not directory.is_dir():
+            raise CommandError(f"No stats in {directory}")
+        if options['reset']:
+            for path in directory.glob('*.json'):
+                path.unlink()
+            self.stdout.write(self.style.SUCCESS(f"Cleared {directory}"))
+            return
+
+        entries = load_stats(directory)
+        if options['operation']:
+            prefix = f"{options['operation']} "
+            entries = {
+                key: entry for key, entry in entries.items()
+                if any(location.startswith(prefix) for location in entry['paths'])
+            }
+        ranked = sorted(entries.items(), key=lambda item: SORT_KEYS[options['sort']](item[1]), reverse=True)
+
+        self.stdout.write(
+            f"{'fingerprint':12} {'count':>8} {'total ms':>10} {'p50 ms':>8} {'p99 ms':>8} "
+            f"{'rows':>7} {'per req':>7} {'slow':>6}"
+        )
+        for key, entry in ranked[:options['limit']]:
+            rows = entry['rows'] / entry['rows_known'] if entry['rows_known'] else None
+            self.stdout.write(
+                f"{key:12} {entry['count']:>8} {entry['total_ms']:>10.1f} "
+                f"{percentile(entry['samples'], 0.5):>8.2f} {percentile(entry['samples'], 0.99):>8.2f} "
+                f"{rows if rows is None else round(rows, 1)!s:>7} {entry['max_per_request']:>7} {entry['slow']:>6}"
+            )
+            self.stdout.write(f"  {entry['sql'][:200]}")
+            for location, count in entry['paths'].most_common(3):
+                self.stdout.write(f"    {count:>6}x {location}")
+            if options['plans'] and entry['plan']:
+                for line in entry['plan'].splitlines():
+                    self.stdout.write(f"    | {line}")
@@ -0,0 +1,54 @@
+"""
+In-process metrics, exported in the Prometheus text format at /metrics/.
+
+Counters are per process; a scraper aggregates them across workers.
+"""
+
+import threading
+
+from django.http import HttpResponse
+
+
+_lock = threading.Lock()
+_counters = {}
+_help = {}
+
+
+def describe(name, help_text):
+    """Register the HELP line for a metric."""
+    _help[name] = help_text
+
+
+def increment(name, value=1, **labels):
+    """Add ``value`` to the counter ``name`` with the given labels."""
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def snapshot():
+    """Return a copy of all counters as {(name, labels): value}."""
+    with _lock:
+        return dict(_counters)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus():
+    lines = []
+    seen = set()
+    for (name, labels), value in sorted(snapshot().items()):
+        if name not in seen:
+            seen.add(name)
+            if name in _help:
+                lines.append(f'# HELP {name} {_help[name]}')
+            lines.append(f'# TYPE {name} counter')
+        label_text = ','.join(f'{key}="{_escape(val)}"' for key, val in labels)
+        lines.append(f'{name}{{{label_text}}} {value}' if label_text else f'{name} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    return HttpResponse(render_prometheus(), content_type='text/plain; version=0.0.4')
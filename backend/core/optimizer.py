@@ -0,0 +1,169 @@
+"""
+Selection-set-aware queryset optimizer for the GraphQL resolvers.
+
+Given the ``info`` of a list or detail resolver, ``optimize_queryset``
+walks the requested selection set and applies:
+
+- ``only()`` for the requested scalar fields (plus whatever computed
+  fields declare in their type's ``optimizer_hints``),
+- ``select_related()`` for requested forward foreign keys, recursively,
+- ``prefetch_related()`` with an inner optimized queryset for requested
+  reverse relations such as ``comments``, or through a custom builder a
+  type registers in ``optimizer_prefetches`` for computed list fields.
+
+Row width and query count therefore follow the shape of the query.
+"""
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from graphene.utils.str_converters import to_snake_case
+from graphene_django.registry import get_global_registry
+from graphql.execution.values import get_argument_values
+from graphql.language.ast import FieldNode, FragmentSpreadNode, InlineFragmentNode
+
+
+def _collect_fields(selection_set, info, fields=None):
+    """
+    Flatten a selection set into an ordered mapping of field name to the
+    list of field nodes requesting it, expanding fragments.
+    """
+    if fields is None:
+        fields = {}
+    if selection_set is None:
+        return fields
+    for selection in selection_set.selections:
+        if isinstance(selection, FieldNode):
+            fields.setdefault(selection.name.value, []).append(selection)
+        elif isinstance(selection, FragmentSpreadNode):
+            fragment = info.fragments[selection.name.value]
+            _collect_fields(fragment.selection_set, info, fields)
+        elif isinstance(selection, InlineFragmentNode):
+            _collect_fields(selection.selection_set, info, fields)
+    return fields
+
+
+def _merge_selections(nodes, info):
+    fields = {}
+    for node in nodes:
+        _collect_fields(node.selection_set, info, fields)
+    return fields
+
+
+def _graphene_type(model):
+    # Archive models are served with the type of the live model they mirror.
+    model = getattr(model, 'live_model', model)
+    return get_global_registry().get_type_for_model(model)
+
+
+def _field_arguments(info, graphene_type, graphql_name, node):
+    """Coerce the arguments of a nested field node, variables included."""
+    field_def = info.schema.get_type(graphene_type._meta.name).fields[graphql_name]
+    return get_argument_values(field_def, node, info.variable_values)
+
+
+def _get_model_field(model, name):
+    try:
+        return model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+
+
+class QueryPlan:
+    """Accumulates only/select_related/prefetch lookups for one queryset."""
+
+    def __init__(self):
+        self.only = []
+        self.select_related = []
+        self.prefetch = []
+
+    def add_only(self, path):
+        if path not in self.only:
+            self.only.append(path)
+
+    def apply(self, queryset):
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch:
+            queryset = queryset.prefetch_related(*self.prefetch)
+        if self.only:
+            queryset = queryset.only(*self.only)
+        return queryset
+
+
+def _plan_model(plan, model, fields, info, prefix=''):
+    plan.add_only(prefix + model._meta.pk.name)
+    graphene_type = _graphene_type(model)
+    hints = getattr(graphene_type, 'optimizer_hints', {})
+    prefetches = getattr(graphene_type, 'optimizer_prefetches', {})
+
+    for graphql_name, nodes in fields.items():
+        if graphql_name.startswith('__'):
+            continue
+        name = to_snake_case(graphql_name)
+
+        for hinted in hints.get(name, ()):
+            plan.add_only(prefix + hinted)
+
+        if name in prefetches:
+            selections = _merge_selections(nodes, info)
+
+            def optimize_inner(queryset, extra_fields=(), selections=selections):
+                inner_plan = QueryPlan()
+                for extra in extra_fields:
+                    inner_plan.add_only(extra)
+                _plan_model(inner_plan, queryset.model, selections, info)
+                return inner_plan.apply(queryset)
+
+            # Each alias may pass different arguments, so each gets a prefetch.
+            for node in nodes:
+                arguments = _field_arguments(info, graphene_type, graphql_name, node)
+                prefetch = prefetches[name](model, prefix, arguments, optimize_inner)
+                if all(p.prefetch_to != prefetch.prefetch_to for p in plan.prefetch):
+                    plan.prefetch.append(prefetch)
+            continue
+
+        field = _get_model_field(model, name)
+        if field is None:
+            continue
+
+        if field.is_relation and (field.many_to_one or field.one_to_one) and field.concrete:
+            plan.add_only(prefix + field.name)
+            plan.select_related.append(prefix + field.name)
+            _plan_model(
+                plan,
+                field.related_model,
+                _merge_selections(nodes, info),
+                info,
+                prefix=f'{prefix}{field.name}__',
+            )
+        elif field.is_relation and (field.one_to_many or field.many_to_many):
+            inner_plan = QueryPlan()
+            if field.one_to_many:
+                # The back-reference is needed to attach prefetched rows.
+                inner_plan.add_only(field.field.name)
+            _plan_model(
+                inner_plan,
+                field.related_model,
+                _merge_selections(nodes, info),
+                info,
+            )
+            inner_queryset = inner_plan.apply(field.related_model._default_manager.all())
+            plan.prefetch.append(Prefetch(prefix + name, queryset=inner_queryset))
+        elif not field.is_relation:
+            plan.add_only(prefix + field.attname)
+
+
+def optimize_queryset(queryset, info):
+    """
+    Narrow ``queryset`` to what the current GraphQL field selects.
+
+    ``info`` is the resolver's ResolveInfo; the selections of every node
+    for the field (aliases and fragments included) are merged.
+    """
+    plan = QueryPlan()
+    _plan_model(plan, queryset.model, _merge_selections(info.field_nodes, info), info)
+    # Related managers (project.tasks.all()) attach the known parent to each
+    # row by reading its foreign key; deferring it would cost a query per row.
+    for field in queryset._known_related_objects:
+        plan.add_only(field.attname)
+    return plan.apply(queryset)
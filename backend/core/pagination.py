@@ -0,0 +1,77 @@
+"""
+Keyset (cursor) pagination helpers shared by the GraphQL connections.
+
+Cursors are opaque base64 strings wrapping the ordering key of the last
+row a client has seen, so fetching the next page is an index range scan
+instead of an OFFSET over everything before it.
+"""
+
+import base64
+import json
+from datetime import date, datetime
+
+import graphene
+from graphql import GraphQLError
+
+
+MAX_PAGE_SIZE = 100
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date)):
+        return {'dt': value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict) and 'dt' in value:
+        return datetime.fromisoformat(value['dt'])
+    return value
+
+
+def encode_cursor(*values):
+    """Encode an ordering key (e.g. timestamp and id) as an opaque cursor."""
+    payload = json.dumps([_encode_value(value) for value in values])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor, size):
+    """Decode a cursor produced by encode_cursor with ``size`` key parts."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != size:
+            raise ValueError(cursor)
+        return [_decode_value(value) for value in values]
+    except (ValueError, TypeError):
+        raise GraphQLError("Invalid cursor")
+
+
+def clamp_page_size(first, default=20):
+    """Bound a client supplied page size to 1..MAX_PAGE_SIZE."""
+    if first is None:
+        return default
+    return max(1, min(first, MAX_PAGE_SIZE))
+
+
+def build_connection(connection_type, rows, page_size, cursor_for, has_previous_page=False):
+    """
+    Build a graphene Connection from ``page_size + 1`` fetched rows.
+
+    The extra row only signals that another page exists and is dropped.
+    """
+    rows = list(rows)
+    has_next_page = len(rows) > page_size
+    rows = rows[:page_size]
+    edges = [
+        connection_type.Edge(node=row, cursor=cursor_for(row))
+        for row in rows
+    ]
+    return connection_type(
+        edges=edges,
+        page_info=graphene.relay.PageInfo(
+            has_next_page=has_next_page,
+            has_previous_page=has_previous_page,
+            start_cursor=edges[0].cursor if edges else None,
+            end_cursor=edges[-1].cursor if edges else None,
+        ),
+    )
@@ -0,0 +1,86 @@
+"""
+Paginator for admin changelists over large tables.
+
+An exact ``COUNT(*)`` over millions of rows is one of the slowest parts
+of an admin changelist. ``EstimatedCountPaginator`` asks the planner
+statistics for a row estimate first and only falls back to an exact
+count when the estimate is below ``ADMIN_ESTIMATED_COUNT_THRESHOLD``.
+"""
+
+import json
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.utils.functional import cached_property
+
+
+def estimate_table_rows(model, using='default'):
+    """
+    Return the planner's row estimate for a model's table, or None.
+
+    PostgreSQL keeps it in ``pg_class.reltuples``; SQLite only has it in
+    ``sqlite_stat1`` once ``ANALYZE`` has been run.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(
+                    'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                    [connection.ops.quote_name(table)],
+                )
+            elif connection.vendor == 'sqlite':
+                cursor.execute(
+                    'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1',
+                    [table],
+                )
+            else:
+                return None
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if not row or row[0] is None:
+        return None
+    # sqlite_stat1.stat starts with the table's row count.
+    estimate = int(str(row[0]).split()[0])
+    return estimate if estimate >= 0 else None
+
+
+def estimate_query_rows(queryset):
+    """Return the PostgreSQL planner's row estimate for a filtered queryset."""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.values('pk').query.sql_with_params()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+    except DatabaseError:
+        return None
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that uses planner estimates above a size threshold."""
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        threshold = getattr(settings, 'ADMIN_ESTIMATED_COUNT_THRESHOLD', 100000)
+        query = getattr(queryset, 'query', None)
+        if query is None:
+            return super().count
+
+        if not query.where:
+            estimate = estimate_table_rows(queryset.model, queryset.db)
+        else:
+            estimate = estimate_query_rows(queryset)
+
+        if estimate is not None and estimate >= threshold:
+            return estimate
+        return super().count
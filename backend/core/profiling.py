@@ -0,0 +1,224 @@
+"""
+Opt-in sampling profiler for slow requests.
+
+While enabled, one background thread per process samples the Python stack
+of every in-flight request under ``PATHS`` every ``INTERVAL_MS``. When a
+request finishes, its samples are kept only if it took at least
+``THRESHOLD_MS`` or was picked by ``SAMPLE_RATE``; they are then written
+in the collapsed-stack format flamegraph tools read (one
+``frame;frame;frame count`` line per stack) to
+
+    <DIRECTORY>/<operation name>/<time>-<pid>-<duration>ms-<organization>.collapsed
+
+keeping at most ``MAX_FILES`` captures. ``manage.py merge_profiles``
+combines them per operation.
+"""
+
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from core import metrics
+
+
+DEFAULTS = {
+    'ENABLED': False,
+    'PATHS': ['/graphql/'],
+    'THRESHOLD_MS': 500,
+    'SAMPLE_RATE': 0.0,
+    'INTERVAL_MS': 5,
+    'DIRECTORY': 'profiles',
+    'MAX_FILES': 500,
+}
+
+SUFFIX = '.collapsed'
+TAGS_ATTRIBUTE = '_profiling_tags'
+
+metrics.describe('request_profiles_written_total', 'Request profiles written, by operation.')
+
+
+def get_setting(name):
+    return getattr(settings, 'REQUEST_PROFILER', {}).get(name, DEFAULTS[name])
+
+
+def profile_directory():
+    return Path(get_setting('DIRECTORY'))
+
+
+def safe_name(value, fallback='unnamed'):
+    """A client supplied name (operation, organization) usable as one path component."""
+    name = re.sub(r'[^A-Za-z0-9_-]', '_', str(value))[:80]
+    return name if name.strip('_-') else fallback
+
+
+def tag_request(request, operation_name=None, organization=None):
+    """Label a request's profile; called by the GraphQL view once it has parsed the body."""
+    setattr(request, TAGS_ATTRIBUTE, {
+        'operation': operation_name or 'anonymous',
+        'organization': organization or '-',
+    })
+
+
+_labels = {}
+
+
+def _frame_label(code):
+    label = _labels.get(code)
+    if label is None:
+        filename = code.co_filename
+        for prefix in sys.path:
+            if prefix and filename.startswith(prefix):
+                filename = filename[len(prefix):].lstrip(os.sep)
+                break
+        label = _labels[code] = f'{code.co_name} ({filename}:{code.co_firstlineno})'.replace(';', ':')
+    return label
+
+
+class Capture:
+    """Stack samples of one request, taken below the ``root`` frame."""
+
+    def __init__(self, thread_id, root):
+        self.thread_id = thread_id
+        self.root = root
+        self.stacks = Counter()
+
+    def add(self, frame):
+        labels = []
+        while frame is not None and frame is not self.root:
+            labels.append(_frame_label(frame.f_code))
+            frame = frame.f_back
+        if labels:
+            self.stacks[';'.join(reversed(labels))] += 1
+
+
+class Sampler:
+    """Background thread sampling the stacks of registered request threads."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._captures = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self, capture):
+        with self._lock:
+            self._captures[capture.thread_id] = capture
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+                self._thread.start()
+
+    def stop(self, capture):
+        with self._lock:
+            self._captures.pop(capture.thread_id, None)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._captures:
+                    continue
+                frames = sys._current_frames()
+                for thread_id, capture in self._captures.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        capture.add(frame)
+
+
+def _rotate(directory, max_files):
+    captures = sorted(directory.glob(f'*/*{SUFFIX}'), key=lambda path: path.stat().st_mtime)
+    for path in captures[:max(0, len(captures) - max_files)]:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def write_capture(capture, duration_ms, tags):
+    """Write a capture as a collapsed-stack file and return its path."""
+    directory = profile_directory()
+    operation_directory = directory / safe_name(tags['operation'])
+    path = operation_directory / (
+        f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{duration_ms:.0f}ms-"
+        f"{safe_name(tags['organization'])}{SUFFIX}"
+    )
+    # _rotate() only finds captures one level below the directory.
+    if path.resolve().parent.parent != directory.resolve():
+        raise ValueError(f"Capture path {path} is outside {directory}")
+    operation_directory.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as output:
+        for stack, count in capture.stacks.most_common():
+            output.write(f'{stack} {count}\n')
+    _rotate(directory, get_setting('MAX_FILES'))
+    metrics.increment('request_profiles_written_total', operation=tags['operation'])
+    return path
+
+
+def read_capture(path):
+    stacks = Counter()
+    with open(path) as capture:
+        for line in capture:
+            stack, _, count = line.rstrip('\n').rpartition(' ')
+            if stack and count.isdigit():
+                stacks[stack] += int(count)
+    return stacks
+
+
+def capture_organization(path):
+    # <time>-<pid>-<duration>ms-<organization>.collapsed
+    return path.name[:-len(SUFFIX)].split('-', 3)[-1]
+
+
+def merge_captures(directory, operation=None, organization=None, since=None):
+    """Return {operation: (capture count, Counter of stacks)} for the captures in ``directory``."""
+    merged = {}
+    for operation_directory in sorted(path for path in Path(directory).iterdir() if path.is_dir()):
+        if operation is not None and operation_directory.name != safe_name(operation):
+            continue
+        count, stacks = 0, Counter()
+        for path in operation_directory.glob(f'*{SUFFIX}'):
+            if organization is not None and capture_organization(path) != safe_name(organization):
+                continue
+            if since is not None and path.stat().st_mtime < since:
+                continue
+            count += 1
+            stacks.update(read_capture(path))
+        if count:
+            merged[operation_directory.name] = (count, stacks)
+    return merged
+
+
+class SamplingProfilerMiddleware:
+    """Profiles requests under REQUEST_PROFILER['PATHS'] (see module docstring)."""
+
+    def __init__(self, get_response):
+        if not get_setting('ENABLED'):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.paths = tuple(get_setting('PATHS'))
+        self.threshold = get_setting('THRESHOLD_MS')
+        self.sample_rate = get_setting('SAMPLE_RATE')
+        self.sampler = Sampler(get_setting('INTERVAL_MS') / 1000)
+
+    def __call__(self, request):
+        if not request.path.startswith(self.paths):
+            return self.get_response(request)
+
+        capture = Capture(threading.get_ident(), sys._getframe())
+        started = time.perf_counter()
+        self.sampler.start(capture)
+        try:
+            return self.get_response(request)
+        finally:
+            self.sampler.stop(capture)
+            duration_ms = (time.perf_counter() - started) * 1000
+            if capture.stacks and (duration_ms >= self.threshold or random.random() < self.sample_rate):
+                tags = getattr(request, TAGS_ATTRIBUTE, None) or {'operation': 'unknown', 'organization': '-'}
+                write_capture(capture, duration_ms, tags)
@@ -0,0 +1,360 @@
+"""
+Admission control for the GraphQL endpoint.
+
+Every request is charged its estimated query cost against two limits:
+one keyed by organization (from the operation variables or the
+``X-Organization`` header) and one keyed by client IP. Each organization
+also has a cap on concurrently executing requests, so one tenant cannot
+occupy every worker.
+
+The limits are token buckets (``rate`` cost units refilled per second up
+to ``burst``), approximated with sliding-window counters so they can be
+enforced with the cache backend's atomic ``incr`` and shared by all
+processes using the same cache.
+"""
+
+import math
+import time
+from functools import lru_cache
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.cache import cache
+from graphql import GraphQLError, parse
+from graphql.language.ast import (
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    InlineFragmentNode,
+    IntValueNode,
+    OperationDefinitionNode,
+    VariableNode,
+)
+from graphql.pyutils import Undefined
+from graphql.type import GraphQLList, GraphQLNonNull, get_named_type
+
+from core import metrics
+
+
+DEFAULTS = {
+    'ENABLED': True,
+    'ORGANIZATION_RATE': 200,
+    'ORGANIZATION_BURST': 4000,
+    'IP_RATE': 100,
+    'IP_BURST': 2000,
+    'MAX_IN_FLIGHT_PER_ORGANIZATION': 8,
+    'LIST_COST_MULTIPLIER': 10,
+    'ORGANIZATION_VARIABLES': ['organizationSlug', 'targetOrganizationSlug', 'slug'],
+    'TRUST_X_FORWARDED_FOR': False,
+}
+
+metrics.describe('graphql_ratelimit_decisions_total', 'GraphQL admission decisions by limit and outcome.')
+metrics.describe('graphql_ratelimit_cost_total', 'Estimated query cost admitted or rejected.')
+
+# Arguments bounding the length of a list field (or of a connection's edges).
+SIZE_ARGUMENTS = ('first', 'limit')
+
+
+def _safe_key(identity):
+    # Keep cache keys free of spaces/control characters (memcached).
+    return quote(str(identity), safe='')[:200]
+
+
+def get_setting(name):
+    return getattr(settings, 'GRAPHQL_RATE_LIMIT', {}).get(name, DEFAULTS[name])
+
+
+@lru_cache(maxsize=512)
+def parse_query(query):
+    """Parse a query string, memoized since clients repeat the same operations."""
+    return parse(query)
+
+
+def _unwrap(graphql_type):
+    is_list = False
+    while isinstance(graphql_type, (GraphQLNonNull, GraphQLList)):
+        if isinstance(graphql_type, GraphQLList):
+            is_list = True
+        graphql_type = graphql_type.of_type
+    return graphql_type, is_list
+
+
+def _size(field, node, variables):
+    """The length a field's size argument asks for, or None."""
+    values = {argument.name.value: argument.value for argument in node.arguments}
+    for name in SIZE_ARGUMENTS:
+        if name not in field.args:
+            continue
+        value = values.get(name)
+        if isinstance(value, VariableNode):
+            value = (variables or {}).get(value.name.value)
+        elif isinstance(value, IntValueNode):
+            value = int(value.value)
+        elif value is None and field.args[name].default_value is not Undefined:
+            value = field.args[name].default_value
+        if isinstance(value, int) and not isinstance(value, bool):
+            return max(1, value)
+    return None
+
+
+def _selection_cost(selection_set, parent_type, fragments, variables, size=None):
+    """Cost of a selection set; ``size`` is a connection's page size for its edges."""
+    cost = 0
+    if selection_set is None:
+        return cost
+    for selection in selection_set.selections:
+        if isinstance(selection, FieldNode):
+            field = getattr(parent_type, 'fields', {}).get(selection.name.value)
+            if field is None:
+                cost += 1
+                continue
+            if selection.selection_set is None:
+                # A scalar: a column of a row already counted.
+                continue
+            field_type, is_list = _unwrap(field.type)
+            field_size = _size(field, selection, variables)
+            if is_list:
+                length = field_size or size or get_setting('LIST_COST_MULTIPLIER')
+                cost += length * (1 + _selection_cost(selection.selection_set, field_type, fragments, variables))
+            else:
+                cost += 1 + _selection_cost(selection.selection_set, field_type, fragments, variables, field_size)
+        elif isinstance(selection, InlineFragmentNode):
+            cost += _selection_cost(selection.selection_set, parent_type, fragments, variables, size)
+        elif isinstance(selection, FragmentSpreadNode):
+            fragment = fragments.get(selection.name.value)
+            if fragment is not None:
+                cost += _selection_cost(fragment.selection_set, parent_type, fragments, variables, size)
+    return cost
+
+
+def query_cost(graphql_schema, query, operation_name=None, variables=None):
+    """
+    Estimate the cost of an operation as the number of objects it may
+    fetch. An object field counts one; a list field counts its expected
+    length times the cost of one element. The length is the field's
+    ``first``/``limit`` argument (a connection's applies to its edges),
+    else LIST_COST_MULTIPLIER. Scalar fields are free.
+    """
+    try:
+        document = parse_query(query)
+    except GraphQLError:
+        return 1
+    fragments = {
+        definition.name.value: definition
+        for definition in document.definitions
+        if isinstance(definition, FragmentDefinitionNode)
+    }
+    for definition in document.definitions:
+        if not isinstance(definition, OperationDefinitionNode):
+            continue
+        if operation_name and (definition.name is None or definition.name.value != operation_name):
+            continue
+        root_type = graphql_schema.get_root_type(definition.operation)
+        return max(1, _selection_cost(definition.selection_set, get_named_type(root_type), fragments, variables))
+    return 1
+
+
+class TokenBucket:
+    """
+    Token bucket of ``burst`` units refilled at ``rate`` units per second.
+
+    Approximated with two fixed windows of ``burst / rate`` seconds: usage
+    is the current window's counter plus the part of the previous window's
+    counter that has not refilled yet.
+    """
+
+    def __init__(self, prefix, rate, burst):
+        self.prefix = prefix
+        self.rate = rate
+        self.burst = burst
+        self.window = max(1.0, burst / rate)
+
+    def _key(self, identity, window_index):
+        return f'ratelimit:{self.prefix}:{_safe_key(identity)}:{window_index}'
+
+    def consume(self, identity, cost, now=None):
+        """Charge ``cost`` units. Returns (allowed, retry_after_seconds)."""
+        now = time.time() if now is None else now
+        window_index = int(now // self.window)
+        elapsed = (now % self.window) / self.window
+        key = self._key(identity, window_index)
+        timeout = int(self.window * 2) + 1
+
+        cache.add(key, 0, timeout)
+        try:
+            current = cache.incr(key, cost)
+        except ValueError:
+            # The key expired between add() and incr().
+            cache.set(key, cost, timeout)
+            current = cost
+        previous = cache.get(self._key(identity, window_index - 1), 0)
+
+        used = previous * (1 - elapsed) + current
+        if used <= self.burst:
+            return True, 0
+
+        self.refund(identity, cost, now)
+        overflow = used - self.burst
+        return False, max(1, math.ceil(overflow / self.rate))
+
+    def refund(self, identity, cost, now=None):
+        """Give back units charged by consume() in the current window."""
+        now = time.time() if now is None else now
+        try:
+            cache.decr(self._key(identity, int(now // self.window)), cost)
+        except ValueError:
+            pass
+
+
+class InFlightLimiter:
+    """
+    Caps concurrently executing requests per key using a shared counter.
+
+    Every acquire refreshes the counter's expiry, so it only lapses after
+    ``timeout`` seconds without new requests; a release that then finds a
+    fresh counter clamps it at zero rather than loosening the cap.
+    """
+
+    timeout = 300
+
+    def __init__(self, limit):
+        self.limit = limit
+
+    def _key(self, identity):
+        return f'ratelimit:inflight:{_safe_key(identity)}'
+
+    def acquire(self, identity):
+        key = self._key(identity)
+        cache.add(key, 0, self.timeout)
+        try:
+            count = cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, self.timeout)
+            count = 1
+        else:
+            cache.touch(key, self.timeout)
+        if count > self.limit:
+            self.release(identity)
+            return False
+        return True
+
+    def release(self, identity):
+        key = self._key(identity)
+        try:
+            count = cache.decr(key)
+            if count < 0:
+                cache.incr(key, -count)
+        except ValueError:
+            pass
+
+
+class RateLimited(Exception):
+    def __init__(self, message, retry_after, limit):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.limit = limit
+
+    def as_graphql_error(self):
+        return GraphQLError(
+            str(self),
+            extensions={'code': 'RATE_LIMITED', 'retryAfter': self.retry_after, 'limit': self.limit},
+        )
+
+
+class QueryTooCostly(Exception):
+    """The request costs more than a full bucket holds; retrying cannot help."""
+
+    def __init__(self, cost, limit, max_cost):
+        super().__init__(f"Query cost {cost} exceeds the {limit} limit of {max_cost}")
+        self.cost = cost
+        self.limit = limit
+        self.max_cost = max_cost
+
+    def as_graphql_error(self):
+        return GraphQLError(
+            str(self),
+            extensions={'code': 'QUERY_TOO_COSTLY', 'cost': self.cost, 'maxCost': self.max_cost, 'limit': self.limit},
+        )
+
+
+def client_ip(request):
+    if get_setting('TRUST_X_FORWARDED_FOR'):
+        forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+        if forwarded:
+            return forwarded.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR', 'unknown')
+
+
+def organization_key(request, operations):
+    """The organization a request acts for: header first, then variables."""
+    header = request.META.get('HTTP_X_ORGANIZATION')
+    if header:
+        return header
+    names = get_setting('ORGANIZATION_VARIABLES')
+    for _, variables, _ in operations:
+        for name in names:
+            value = (variables or {}).get(name)
+            if isinstance(value, str) and value:
+                return value
+    return None
+
+
+class Admission:
+    """A granted admission; ``release()`` must be called when the request ends."""
+
+    def __init__(self, limiter, organization):
+        self._limiter = limiter
+        self.organization = organization
+
+    def release(self):
+        if self.organization is not None:
+            self._limiter.release(self.organization)
+
+
+def admit(request, graphql_schema, operations):
+    """
+    Admit a request made of ``operations`` [(query, variables, operation_name)].
+
+    Returns an Admission or raises QueryTooCostly or RateLimited.
+    """
+    cost = sum(
+        query_cost(graphql_schema, query, operation_name, variables)
+        for query, variables, operation_name in operations
+        if query
+    )
+    organization = organization_key(request, operations)
+
+    checks = [('ip', client_ip(request), TokenBucket('ip', get_setting('IP_RATE'), get_setting('IP_BURST')))]
+    if organization is not None:
+        checks.insert(0, (
+            'organization',
+            organization,
+            TokenBucket('org', get_setting('ORGANIZATION_RATE'), get_setting('ORGANIZATION_BURST')),
+        ))
+
+    # Checked before charging anything: no amount of waiting admits these.
+    for limit, _, bucket in checks:
+        if cost > bucket.burst:
+            metrics.increment('graphql_ratelimit_decisions_total', limit=limit, outcome='too_costly')
+            metrics.increment('graphql_ratelimit_cost_total', cost, outcome='rejected')
+            raise QueryTooCostly(cost, limit, bucket.burst)
+
+    charged = []
+    for limit, identity, bucket in checks:
+        allowed, retry_after = bucket.consume(identity, cost)
+        if not allowed:
+            for charged_identity, charged_bucket in charged:
+                charged_bucket.refund(charged_identity, cost)
+            metrics.increment('graphql_ratelimit_decisions_total', limit=limit, outcome='rejected')
+            metrics.increment('graphql_ratelimit_cost_total', cost, outcome='rejected')
+            raise RateLimited(f"Rate limit exceeded for {limit}", retry_after, limit)
+        charged.append((identity, bucket))
+
+    in_flight = InFlightLimiter(get_setting('MAX_IN_FLIGHT_PER_ORGANIZATION'))
+    if organization is not None and not in_flight.acquire(organization):
+        metrics.increment('graphql_ratelimit_decisions_total', limit='concurrency', outcome='rejected')
+        raise RateLimited("Too many concurrent requests for organization", 1, 'concurrency')
+
+    metrics.increment('graphql_ratelimit_decisions_total', limit='all', outcome='admitted')
+    metrics.increment('graphql_ratelimit_cost_total', cost, outcome='admitted')
+    return Admission(in_flight, organization)
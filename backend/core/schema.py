@@ -1,19 +1,51 @@
 import graphene
 from graphene_django import DjangoObjectType
-from django.db.models import Q
+from django.db.models import F, Prefetch, Q, Window
+from django.db.models.functions import RowNumber
+from jobs.models import Job
+from jobs.registry import enqueue
+from organizations.cache import get_organization_by_slug
+from organizations.changes import changes_since
 from organizations.models import Organization
+from organizations.stats import compute_assignee_workload, compute_organization_stats
+from core.incremental import DIRECTIVES
+from core.loaders import get_loader
+from core.optimizer import optimize_queryset
+from core.pagination import build_connection, clamp_page_size, decode_cursor, encode_cursor
 from projects.models import Project
-from tasks.models import Task, TaskComment
+from tasks.models import ArchivedTask, Deletion, Label, Task, TaskComment
+from tasks.board import column, move_task
+from tasks.cloning import clone_project
+from tasks.deletion import mark_organization_deleted, mark_project_deleted
+from tasks.dependencies import DependencyCycle, add_dependency, project_graph, remove_dependency
+from tasks.labels import LABEL_MATCH_ANY, filter_by_labels, labels_with_counts, set_task_labels
+from tasks.updates import ProjectArchiving, TaskConflict, get_writable_task, update_task
+
+
+class ArchiveAwareObjectType(DjangoObjectType):
+    """Also accepts rows of archive models mirroring this type's model."""
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def is_type_of(cls, root, info):
+        if getattr(root, 'live_model', None) is cls._meta.model:
+            return True
+        return super().is_type_of(root, info)
 
 
 # Organization Type
 class OrganizationType(DjangoObjectType):
     projectCount = graphene.Int()
     activeProjectCount = graphene.Int()
+
+    # Model fields read by computed fields, for the queryset optimizer
+    optimizer_hints = {}
     
     class Meta:
         model = Organization
-        fields = '__all__'
+        exclude = ('deleting_at',)
     
     def resolve_projectCount(self, info):
         return self.project_count
@@ -29,9 +61,12 @@ class ProjectType(DjangoObjectType):
     completion_rate = graphene.Float()
     is_overdue = graphene.Boolean()
 
+    # Model fields read by computed fields, for the queryset optimizer
+    optimizer_hints = {'is_overdue': ['due_date']}
+
     class Meta:
         model = Project
-        fields = '__all__'
+        exclude = ('deleting_at', 'archive_transition')
 
     def resolve_task_count(self, info):
         return self.task_count
@@ -46,10 +81,96 @@ class ProjectType(DjangoObjectType):
         return self.is_overdue
 
 
+# Task Comment Type
+class TaskCommentType(ArchiveAwareObjectType):
+    cursor = graphene.String()
+
+    optimizer_hints = {'cursor': ['timestamp']}
+
+    class Meta:
+        model = TaskComment
+        fields = '__all__'
+
+    def resolve_cursor(self, info):
+        return comment_cursor(self)
+
+
+class TaskCommentConnection(graphene.relay.Connection):
+    class Meta:
+        node = TaskCommentType
+
+
+MAX_RECENT_COMMENTS = 50
+
+
+def comment_cursor(comment):
+    """Keyset cursor for comments ordered newest first."""
+    return encode_cursor(comment.timestamp, comment.id)
+
+
+def recent_comments_attr(limit):
+    return f'_recent_comments_{limit}'
+
+
+def recent_comments_queryset(comment_model, limit):
+    """
+    Newest ``limit`` comments per task, ranked with
+    ROW_NUMBER() OVER (PARTITION BY task_id ORDER BY timestamp DESC) so a
+    whole task list is served by one query.
+    """
+    return comment_model.objects.annotate(
+        row_number=Window(
+            expression=RowNumber(),
+            partition_by=[F('task_id')],
+            order_by=[F('timestamp').desc(), F('id').desc()],
+        )
+    ).filter(row_number__lte=limit).order_by('-timestamp', '-id')
+
+
+def prefetch_recent_comments(task_model, prefix, arguments, optimize):
+    limit = min(max(arguments.get('limit', 5), 0), MAX_RECENT_COMMENTS)
+    comment_model = task_model._meta.get_field('comments').related_model
+    return Prefetch(
+        prefix + 'comments',
+        queryset=optimize(
+            recent_comments_queryset(comment_model, limit), extra_fields=('task',)
+        ),
+        to_attr=recent_comments_attr(limit),
+    )
+
+
+# Label Type
+class LabelType(DjangoObjectType):
+    # Set by the labels query, from one aggregate over the organization
+    open_count = graphene.Int()
+    done_count = graphene.Int()
+
+    class Meta:
+        model = Label
+        fields = ('id', 'name', 'color', 'organization', 'created_at')
+
+    def resolve_open_count(self, info):
+        return getattr(self, 'open_count', None)
+
+    def resolve_done_count(self, info):
+        return getattr(self, 'done_count', None)
+
+
+class LabelMatch(graphene.Enum):
+    ANY = 'ANY'
+    ALL = 'ALL'
+
+
 # Task Type
-class TaskType(DjangoObjectType):
+class TaskType(ArchiveAwareObjectType):
     comment_count = graphene.Int()
     is_overdue = graphene.Boolean()
+    recent_comments = graphene.List(TaskCommentType, limit=graphene.Int(default_value=5))
+    comment_history = graphene.relay.ConnectionField(TaskCommentConnection)
+
+    # Model fields read by computed fields, for the queryset optimizer
+    optimizer_hints = {'is_overdue': ['due_date']}
+    optimizer_prefetches = {'recent_comments': prefetch_recent_comments}
 
     class Meta:
         model = Task
@@ -61,12 +182,103 @@ class TaskType(DjangoObjectType):
     def resolve_is_overdue(self, info):
         return self.is_overdue
 
+    def resolve_recent_comments(self, info, limit=5):
+        limit = min(max(limit, 0), MAX_RECENT_COMMENTS)
+        prefetched = getattr(self, recent_comments_attr(limit), None)
+        if prefetched is not None:
+            return prefetched
+        return self.comments.order_by('-timestamp', '-id')[:limit]
 
-# Task Comment Type
-class TaskCommentType(DjangoObjectType):
+    def resolve_comment_history(self, info, first=None, after=None, **kwargs):
+        """Older comments, newest first, paginated by (timestamp, id)."""
+        page_size = clamp_page_size(first)
+        comments = self.comments.order_by('-timestamp', '-id')
+        if after:
+            timestamp, comment_id = decode_cursor(after, 2)
+            comments = comments.filter(
+                Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lt=comment_id)
+            )
+        return build_connection(
+            TaskCommentConnection,
+            comments[:page_size + 1],
+            page_size,
+            comment_cursor,
+            has_previous_page=bool(after),
+        )
+
+
+class TaskConnection(graphene.relay.Connection):
     class Meta:
-        model = TaskComment
-        fields = '__all__'
+        node = TaskType
+
+
+def task_cursor(task):
+    """Keyset cursor for tasks ordered newest first."""
+    return encode_cursor(task.created_at, task.id)
+
+
+class AssigneeWorkloadType(graphene.ObjectType):
+    assignee_email = graphene.String()
+    total = graphene.Int()
+    todo = graphene.Int()
+    in_progress = graphene.Int()
+    review = graphene.Int()
+    done = graphene.Int()
+    # Open (not DONE) tasks past their due date
+    overdue = graphene.Int()
+    # Earliest upcoming due date among open tasks
+    next_due_date = graphene.DateTime()
+
+
+class DeletedRecordType(graphene.ObjectType):
+    # GraphQL type of the deleted record, for evicting it from client caches
+    typename = graphene.String()
+    id = graphene.ID()
+
+
+class ChangesType(graphene.ObjectType):
+    """Records of an organization written or deleted after a cursor."""
+    organizations = graphene.List(OrganizationType)
+    projects = graphene.List(ProjectType)
+    tasks = graphene.List(TaskType)
+    comments = graphene.List(TaskCommentType)
+    deleted = graphene.List(DeletedRecordType)
+    # Pass to the next changesSince call
+    cursor = graphene.String()
+    has_more = graphene.Boolean()
+    # The cursor expired (or none was given): refetch everything, then
+    # continue from `cursor`
+    resync_required = graphene.Boolean()
+
+
+# Change log model name -> GraphQL type name
+CHANGE_TYPENAMES = {
+    'Organization': 'OrganizationType',
+    'Project': 'ProjectType',
+    'Task': 'TaskType',
+    'TaskComment': 'TaskCommentType',
+}
+
+
+# Job Type
+class JobType(DjangoObjectType):
+    class Meta:
+        model = Job
+        fields = (
+            'id', 'name', 'status', 'priority', 'attempts', 'max_attempts',
+            'run_at', 'result', 'last_error', 'created_at', 'finished_at',
+        )
+
+
+class DeletionType(DjangoObjectType):
+    is_finished = graphene.Boolean()
+
+    class Meta:
+        model = Deletion
+        fields = ('id', 'organization_id', 'project_id', 'deleted_rows', 'created_at', 'finished_at')
+
+    def resolve_is_finished(self, info):
+        return self.is_finished
 
 
 # Queries
@@ -78,70 +290,204 @@ class Query(graphene.ObjectType):
     # Project queries
     projects = graphene.List(ProjectType, organization_slug=graphene.String(required=True))
     project = graphene.Field(ProjectType, id=graphene.ID(required=True))
+    project_templates = graphene.List(ProjectType, organization_slug=graphene.String(required=True))
+    labels = graphene.List(LabelType, organization_slug=graphene.String(required=True))
     
     # Task queries
-    tasks = graphene.List(TaskType, project_id=graphene.ID(required=True))
+    tasks = graphene.List(
+        TaskType,
+        project_id=graphene.ID(required=True),
+        # Only tasks with these labels: any of them, or all with labelMatch ALL
+        labels=graphene.List(graphene.ID),
+        label_match=LabelMatch(),
+    )
     task = graphene.Field(TaskType, id=graphene.ID(required=True))
+    board_column = graphene.List(
+        TaskType,
+        project_id=graphene.ID(required=True),
+        status=graphene.String(required=True),
+    )
+    
+    # Unfinished tasks waiting for another unfinished task, in dependency order
+    blocked_tasks = graphene.List(TaskType, project_id=graphene.ID(required=True))
+    # Longest chain of unfinished tasks, each waiting for the previous one
+    critical_path = graphene.List(TaskType, project_id=graphene.ID(required=True))
+    
+    tasks_by_assignee = graphene.relay.ConnectionField(
+        TaskConnection,
+        email=graphene.String(required=True),
+        organization_slug=graphene.String(),
+    )
     
     # Statistics queries
     organization_stats = graphene.Field(
         graphene.JSONString, 
         organization_slug=graphene.String(required=True)
     )
+    assignee_workload = graphene.List(
+        AssigneeWorkloadType,
+        organization_slug=graphene.String(required=True)
+    )
+
+    # Delta sync
+    changes_since = graphene.Field(
+        ChangesType,
+        organization_slug=graphene.String(required=True),
+        cursor=graphene.String(),
+        first=graphene.Int(),
+    )
+
+    # Background job queries
+    job = graphene.Field(JobType, id=graphene.ID(required=True))
+    deletion = graphene.Field(DeletionType, id=graphene.ID(required=True))
 
     def resolve_organizations(self, info):
-        return Organization.objects.all()
+        return optimize_queryset(Organization.objects.all(), info)
 
     def resolve_organization(self, info, slug):
-        return Organization.objects.filter(slug=slug).first()
+        try:
+            return get_organization_by_slug(slug)
+        except Organization.DoesNotExist:
+            return None
 
     def resolve_projects(self, info, organization_slug):
         try:
-            organization = Organization.objects.get(slug=organization_slug)
-            return Project.objects.filter(organization=organization)
+            organization = get_organization_by_slug(organization_slug)
+            return optimize_queryset(Project.objects.filter(organization=organization, is_template=False), info)
         except Organization.DoesNotExist:
             return []
 
-    def resolve_project(self, info, id):
-        return Project.objects.filter(id=id).first()
+    def resolve_labels(self, info, organization_slug):
+        try:
+            organization = get_organization_by_slug(organization_slug)
+            return labels_with_counts(organization)
+        except Organization.DoesNotExist:
+            return []
 
-    def resolve_tasks(self, info, project_id):
+    def resolve_project_templates(self, info, organization_slug):
         try:
-            project = Project.objects.get(id=project_id)
-            return Task.objects.filter(project=project)
-        except Project.DoesNotExist:
+            organization = get_organization_by_slug(organization_slug)
+            return optimize_queryset(Project.objects.filter(organization=organization, is_template=True), info)
+        except Organization.DoesNotExist:
+            return []
+
+    def resolve_project(self, info, id):
+        return optimize_queryset(Project.objects.filter(id=id), info).first()
+
+    def resolve_tasks(self, info, project_id, labels=None, label_match=None):
+        project = get_loader(info.context, 'project').load(project_id)
+        if project is None:
             return []
+        # Archived projects are read from the archive tables.
+        tasks = project.task_relation.all()
+        if labels:
+            tasks = filter_by_labels(tasks, labels, getattr(label_match, 'value', label_match) or LABEL_MATCH_ANY)
+        return optimize_queryset(tasks, info)
 
     def resolve_task(self, info, id):
-        return Task.objects.filter(id=id).first()
+        task = optimize_queryset(Task.objects.filter(id=id, project__deleting_at__isnull=True), info).first()
+        if task is None:
+            task = optimize_queryset(ArchivedTask.objects.filter(id=id, project__deleting_at__isnull=True), info).first()
+        return task
+
+    def resolve_board_column(self, info, project_id, status):
+        project = get_loader(info.context, 'project').load(project_id)
+        if project is None:
+            return []
+        if project.is_archived:
+            tasks = project.task_relation.filter(status=status).order_by('rank', 'id')
+        else:
+            tasks = column(project.id, status)
+        return optimize_queryset(tasks, info)
+
+    def resolve_blocked_tasks(self, info, project_id):
+        return dependency_graph_tasks(info, project_id, 'blocked')
+
+    def resolve_critical_path(self, info, project_id):
+        return dependency_graph_tasks(info, project_id, 'critical_path')
+
+    def resolve_tasks_by_assignee(self, info, email, organization_slug=None, first=None, after=None, **kwargs):
+        """An assignee's tasks across projects, newest first, paginated by (created_at, id)."""
+        page_size = clamp_page_size(first)
+        tasks = (
+            Task.objects.filter(assignee_email=email, project__deleting_at__isnull=True, project__is_template=False)
+            .select_related('project').order_by('-created_at', '-id')
+        )
+        if organization_slug:
+            try:
+                organization = get_organization_by_slug(organization_slug)
+            except Organization.DoesNotExist:
+                return build_connection(TaskConnection, [], page_size, task_cursor)
+            tasks = tasks.filter(project__organization_id=organization.id)
+        if after:
+            created_at, task_id = decode_cursor(after, 2)
+            tasks = tasks.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=task_id)
+            )
+        return build_connection(
+            TaskConnection,
+            tasks[:page_size + 1],
+            page_size,
+            task_cursor,
+            has_previous_page=bool(after),
+        )
 
     def resolve_organization_stats(self, info, organization_slug):
         try:
-            organization = Organization.objects.get(slug=organization_slug)
-            projects = Project.objects.filter(organization=organization)
-            
-            total_projects = projects.count()
-            active_projects = projects.filter(status='ACTIVE').count()
-            completed_projects = projects.filter(status='COMPLETED').count()
-            
-            total_tasks = sum(project.task_count for project in projects)
-            completed_tasks = sum(project.completed_task_count for project in projects)
-            
-            completion_rate = 0
-            if total_tasks > 0:
-                completion_rate = round((completed_tasks / total_tasks) * 100, 1)
-            
-            return {
-                'total_projects': total_projects,
-                'active_projects': active_projects,
-                'completed_projects': completed_projects,
-                'total_tasks': total_tasks,
-                'completed_tasks': completed_tasks,
-                'completion_rate': completion_rate
-            }
+            organization = get_organization_by_slug(organization_slug)
+            return compute_organization_stats(organization)
         except Organization.DoesNotExist:
             return {}
 
+    def resolve_assignee_workload(self, info, organization_slug):
+        try:
+            organization = get_organization_by_slug(organization_slug)
+            return compute_assignee_workload(organization)
+        except Organization.DoesNotExist:
+            return []
+
+    def resolve_changes_since(self, info, organization_slug, cursor=None, first=None):
+        """Changes after ``cursor``, oldest first; no cursor means resync."""
+        try:
+            organization = get_organization_by_slug(organization_slug)
+        except Organization.DoesNotExist:
+            return None
+        changes = changes_since(
+            organization.id,
+            decode_cursor(cursor, 1)[0] if cursor else None,
+            clamp_page_size(first, default=100),
+        )
+        upserts = changes['upserts']
+        return ChangesType(
+            organizations=upserts.get('Organization', []),
+            projects=upserts.get('Project', []),
+            tasks=upserts.get('Task', []),
+            comments=upserts.get('TaskComment', []),
+            deleted=[
+                DeletedRecordType(typename=CHANGE_TYPENAMES[model], id=object_id)
+                for model, object_id in changes['deletes']
+            ],
+            cursor=encode_cursor(changes['cursor']),
+            has_more=changes['has_more'],
+            resync_required=changes['resync_required'],
+        )
+
+    def resolve_job(self, info, id):
+        return Job.objects.filter(id=id).first()
+
+    def resolve_deletion(self, info, id):
+        return Deletion.objects.filter(id=id).first()
+
+
+def dependency_graph_tasks(info, project_id, key):
+    """The tasks listed under ``key`` of the project's dependency graph, in its order."""
+    project = get_loader(info.context, 'project').load(project_id)
+    if project is None:
+        return []
+    task_ids = project_graph(project)[key]
+    tasks = optimize_queryset(project.task_relation.filter(id__in=task_ids), info).in_bulk()
+    return [tasks[task_id] for task_id in task_ids if task_id in tasks]
+
 
 # Mutations
 class CreateOrganization(graphene.Mutation):
@@ -207,6 +553,39 @@ class UpdateOrganization(graphene.Mutation):
             )
 
 
+class DeleteOrganization(graphene.Mutation):
+    """Hide an organization now and delete its data in the background."""
+
+    class Arguments:
+        id = graphene.ID(required=True)
+
+    deletion = graphene.Field(DeletionType)
+    success = graphene.Boolean()
+    errors = graphene.List(graphene.String)
+
+    def mutate(self, info, id):
+        try:
+            organization = Organization.objects.get(id=id)
+            deletion = mark_organization_deleted(organization)
+            return DeleteOrganization(
+                deletion=deletion,
+                success=True,
+                errors=[]
+            )
+        except Organization.DoesNotExist:
+            return DeleteOrganization(
+                deletion=None,
+                success=False,
+                errors=["Organization not found"]
+            )
+        except Exception as e:
+            return DeleteOrganization(
+                deletion=None,
+                success=False,
+                errors=[str(e)]
+            )
+
+
 class CreateProject(graphene.Mutation):
     class Arguments:
         organization_slug = graphene.String(required=True)
@@ -221,7 +600,7 @@ class CreateProject(graphene.Mutation):
 
     def mutate(self, info, organization_slug, name, description="", status="ACTIVE", due_date=None):
         try:
-            organization = Organization.objects.get(slug=organization_slug)
+            organization = get_organization_by_slug(organization_slug)
             project = Project.objects.create(
                 organization=organization,
                 name=name,
@@ -248,6 +627,66 @@ class CreateProject(graphene.Mutation):
             )
 
 
+class CloneProject(graphene.Mutation):
+    """Copy a project (or template) with its tasks, server-side."""
+
+    class Arguments:
+        project_id = graphene.ID(required=True)
+        # Defaults to the source project's organization
+        target_organization_slug = graphene.String()
+        # Defaults to the source name; a taken name gets a " (2)" suffix
+        name = graphene.String()
+        include_comments = graphene.Boolean()
+        # Days added to the due dates of the project and its tasks
+        due_date_shift = graphene.Int()
+        # Save the copy as a template instead of a project
+        as_template = graphene.Boolean()
+
+    project = graphene.Field(ProjectType)
+    success = graphene.Boolean()
+    errors = graphene.List(graphene.String)
+
+    def mutate(self, info, project_id, target_organization_slug=None, name=None,
+               include_comments=False, due_date_shift=0, as_template=False):
+        try:
+            source = Project.objects.select_related('organization').get(id=project_id)
+            if target_organization_slug:
+                organization = get_organization_by_slug(target_organization_slug)
+            else:
+                organization = source.organization
+            project = clone_project(
+                source,
+                organization,
+                name=name,
+                include_comments=include_comments,
+                due_date_shift=due_date_shift,
+                as_template=as_template,
+            )
+            return CloneProject(
+                project=project,
+                success=True,
+                errors=[]
+            )
+        except Project.DoesNotExist:
+            return CloneProject(
+                project=None,
+                success=False,
+                errors=["Project not found"]
+            )
+        except Organization.DoesNotExist:
+            return CloneProject(
+                project=None,
+                success=False,
+                errors=["Organization not found"]
+            )
+        except Exception as e:
+            return CloneProject(
+                project=None,
+                success=False,
+                errors=[str(e)]
+            )
+
+
 class CreateTask(graphene.Mutation):
     class Arguments:
         project_id = graphene.ID(required=True)
@@ -264,6 +703,18 @@ class CreateTask(graphene.Mutation):
     def mutate(self, info, project_id, title, description="", status="TODO", assignee_email="", due_date=None):
         try:
             project = Project.objects.get(id=project_id)
+            if project.is_archived:
+                return CreateTask(
+                    task=None,
+                    success=False,
+                    errors=["Project is archived"]
+                )
+            if project.is_moving_tasks:
+                return CreateTask(
+                    task=None,
+                    success=False,
+                    errors=[str(ProjectArchiving())]
+                )
             task = Task.objects.create(
                 project=project,
                 title=title,
@@ -291,20 +742,53 @@ class CreateTask(graphene.Mutation):
             )
 
 
+class DeleteProject(graphene.Mutation):
+    """Hide a project now and delete its tasks and comments in the background."""
+
+    class Arguments:
+        id = graphene.ID(required=True)
+
+    deletion = graphene.Field(DeletionType)
+    success = graphene.Boolean()
+    errors = graphene.List(graphene.String)
+
+    def mutate(self, info, id):
+        try:
+            project = Project.objects.get(id=id)
+            deletion = mark_project_deleted(project)
+            return DeleteProject(
+                deletion=deletion,
+                success=True,
+                errors=[]
+            )
+        except Project.DoesNotExist:
+            return DeleteProject(
+                deletion=None,
+                success=False,
+                errors=["Project not found"]
+            )
+        except Exception as e:
+            return DeleteProject(
+                deletion=None,
+                success=False,
+                errors=[str(e)]
+            )
+
+
 class UpdateTaskStatus(graphene.Mutation):
     class Arguments:
         task_id = graphene.ID(required=True)
         status = graphene.String(required=True)
+        # The task version the client last read; omit to skip the check
+        expected_version = graphene.Int()
 
     task = graphene.Field(TaskType)
     success = graphene.Boolean()
     errors = graphene.List(graphene.String)
 
-    def mutate(self, info, task_id, status):
+    def mutate(self, info, task_id, status, expected_version=None):
         try:
-            task = Task.objects.get(id=task_id)
-            task.status = status
-            task.save()
+            task = update_task(task_id, expected_version, status=status)
             return UpdateTaskStatus(
                 task=task,
                 success=True,
@@ -316,6 +800,13 @@ class UpdateTaskStatus(graphene.Mutation):
                 success=False,
                 errors=["Task not found"]
             )
+        except TaskConflict as e:
+            # Return the current task so the client can refresh and retry.
+            return UpdateTaskStatus(
+                task=e.task,
+                success=False,
+                errors=[str(e)]
+            )
         except Exception as e:
             return UpdateTaskStatus(
                 task=None,
@@ -324,6 +815,203 @@ class UpdateTaskStatus(graphene.Mutation):
             )
 
 
+class MoveTask(graphene.Mutation):
+    class Arguments:
+        task_id = graphene.ID(required=True)
+        status = graphene.String(required=True)
+        # Tasks that end up right before (above) and after (below) the moved
+        # task; with neither it goes to the top of the column
+        before_id = graphene.ID()
+        after_id = graphene.ID()
+        expected_version = graphene.Int()
+
+    task = graphene.Field(TaskType)
+    success = graphene.Boolean()
+    errors = graphene.List(graphene.String)
+
+    def mutate(self, info, task_id, status, before_id=None, after_id=None, expected_version=None):
+        try:
+            task = move_task(task_id, status, before_id, after_id, expected_version)
+            return MoveTask(
+                task=task,
+                success=True,
+                errors=[]
+            )
+        except Task.DoesNotExist:
+            return MoveTask(
+                task=None,
+                success=False,
+                errors=["Task not found"]
+            )
+        except TaskConflict as e:
+            return MoveTask(
+                task=e.task,
+                success=False,
+                errors=[str(e)]
+            )
+        except Exception as e:
+            return MoveTask(
+                task=None,
+                success=False,
+                errors=[str(e)]
+            )
+
+
+class CreateLabel(graphene.Mutation):
+    class Arguments:
+        organization_slug = graphene.String(required=True)
+        name = graphene.String(required=True)
+        color = graphene.String()
+
+    label = graphene.Field(LabelType)
+    success = graphene.Boolean()
+    errors = graphene.List(graphene.String)
+
+    def mutate(self, info, organization_slug, name, color=""):
+        try:
+            organization = get_organization_by_slug(organization_slug)
+            label = Label.objects.create(
+                organization=organization,
+                name=name,
+                color=color
+            )
+            return CreateLabel(
+                label=label,
+                success=True,
+                errors=[]
+            )
+        except Organization.DoesNotExist:
+            return CreateLabel(
+                label=None,
+                success=False,
+                errors=["Organization not found"]
+            )
+        except Exception as e:
+            return CreateLabel(
+                label=None,
+                success=False,
+                errors=[str(e)]
+            )
+
+
+class SetTaskLabels(graphene.Mutation):
+    """Replace a task's labels."""
+
+    class Arguments:
+        task_id = graphene.ID(required=True)
+        label_ids = graphene.List(graphene.ID, required=True)
+        expected_version = graphene.Int()
+
+    task = graphene.Field(TaskType)
+    success = graphene.Boolean()
+    errors = graphene.List(graphene.String)
+
+    def mutate(self, info, task_id, label_ids, expected_version=None):
+        try:
+            task = set_task_labels(task_id, label_ids, expected_version)
+            return SetTaskLabels(
+                task=task,
+                success=True,
+                errors=[]
+            )
+        except Task.DoesNotExist:
+            return SetTaskLabels(
+                task=None,
+                success=False,
+                errors=["Task not found"]
+            )
+        except Label.DoesNotExist:
+            return SetTaskLabels(
+                task=None,
+                success=False,
+                errors=["Label not found"]
+            )
+        except TaskConflict as e:
+            return SetTaskLabels(
+                task=e.task,
+                success=False,
+                errors=[str(e)]
+            )
+        except Exception as e:
+            return SetTaskLabels(
+                task=None,
+                success=False,
+                errors=[str(e)]
+            )
+
+
+class AddDependency(graphene.Mutation):
+    """Make a task wait for another task of its project."""
+
+    class Arguments:
+        task_id = graphene.ID(required=True)
+        depends_on_id = graphene.ID(required=True)
+
+    task = graphene.Field(TaskType)
+    success = graphene.Boolean()
+    errors = graphene.List(graphene.String)
+
+    def mutate(self, info, task_id, depends_on_id):
+        try:
+            task = add_dependency(task_id, depends_on_id)
+            return AddDependency(
+                task=task,
+                success=True,
+                errors=[]
+            )
+        except Task.DoesNotExist:
+            return AddDependency(
+                task=None,
+                success=False,
+                errors=["Task not found"]
+            )
+        except DependencyCycle as e:
+            return AddDependency(
+                task=None,
+                success=False,
+                errors=[str(e)]
+            )
+        except Exception as e:
+            return AddDependency(
+                task=None,
+                success=False,
+                errors=[str(e)]
+            )
+
+
+class RemoveDependency(graphene.Mutation):
+    """Stop a task waiting for another."""
+
+    class Arguments:
+        task_id = graphene.ID(required=True)
+        depends_on_id = graphene.ID(required=True)
+
+    task = graphene.Field(TaskType)
+    success = graphene.Boolean()
+    errors = graphene.List(graphene.String)
+
+    def mutate(self, info, task_id, depends_on_id):
+        try:
+            task = remove_dependency(task_id, depends_on_id)
+            return RemoveDependency(
+                task=task,
+                success=True,
+                errors=[]
+            )
+        except Task.DoesNotExist:
+            return RemoveDependency(
+                task=None,
+                success=False,
+                errors=["Task not found"]
+            )
+        except Exception as e:
+            return RemoveDependency(
+                task=None,
+                success=False,
+                errors=[str(e)]
+            )
+
+
 class CreateTaskComment(graphene.Mutation):
     class Arguments:
         task_id = graphene.ID(required=True)
@@ -336,7 +1024,7 @@ class CreateTaskComment(graphene.Mutation):
 
     def mutate(self, info, task_id, content, author_email):
         try:
-            task = Task.objects.get(id=task_id)
+            task = get_writable_task(task_id)
             comment = TaskComment.objects.create(
                 task=task,
                 content=content,
@@ -361,15 +1049,62 @@ class CreateTaskComment(graphene.Mutation):
             )
 
 
+class RequestOrganizationStats(graphene.Mutation):
+    """Queue a background recomputation of an organization's statistics."""
+
+    class Arguments:
+        organization_slug = graphene.String(required=True)
+        priority = graphene.Int()
+
+    job = graphene.Field(JobType)
+    success = graphene.Boolean()
+    errors = graphene.List(graphene.String)
+
+    def mutate(self, info, organization_slug, priority=0):
+        try:
+            organization = get_organization_by_slug(organization_slug)
+            job = enqueue(
+                'organization_stats',
+                {'organization_id': organization.id},
+                priority=priority,
+            )
+            return RequestOrganizationStats(
+                job=job,
+                success=True,
+                errors=[]
+            )
+        except Organization.DoesNotExist:
+            return RequestOrganizationStats(
+                job=None,
+                success=False,
+                errors=["Organization not found"]
+            )
+        except Exception as e:
+            return RequestOrganizationStats(
+                job=None,
+                success=False,
+                errors=[str(e)]
+            )
+
+
 class Mutation(graphene.ObjectType):
     create_organization = CreateOrganization.Field()
     update_organization = UpdateOrganization.Field()
+    delete_organization = DeleteOrganization.Field()
     create_project = CreateProject.Field()
+    delete_project = DeleteProject.Field()
+    clone_project = CloneProject.Field()
     create_task = CreateTask.Field()
     update_task_status = UpdateTaskStatus.Field()
+    move_task = MoveTask.Field()
     create_task_comment = CreateTaskComment.Field()
+    create_label = CreateLabel.Field()
+    set_task_labels = SetTaskLabels.Field()
+    add_dependency = AddDependency.Field()
+    remove_dependency = RemoveDependency.Field()
+    request_organization_stats = RequestOrganizationStats.Field()
 
 
 # Create the schema
-schema = graphene.Schema(query=Query, mutation=Mutation)
+schema = graphene.Schema(query=Query, mutation=Mutation, directives=DIRECTIVES)
 
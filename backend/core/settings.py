@@ -34,6 +34,8 @@ INSTALLED_APPS = [
     'organizations',
     'projects',
     'tasks',
+    'jobs',
+    'core',
 ]
 
 MIDDLEWARE = [
@@ -45,6 +47,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.profiling.SamplingProfilerMiddleware',
+    'core.slowsql.SlowQueryMiddleware',
 ]
 
 ROOT_URLCONF = 'core.urls'
@@ -75,6 +79,105 @@ DATABASES = {
     }
 }
 
+# Cache
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Organization slug cache: per-process LRU in front of the cache backend
+ORGANIZATION_SLUG_CACHE_SIZE = 1024
+ORGANIZATION_SLUG_CACHE_LOCAL_TTL = 30  # seconds
+ORGANIZATION_SLUG_CACHE_TIMEOUT = 300  # seconds
+
+# Admin changelists switch to planner row estimates above this many rows
+ADMIN_ESTIMATED_COUNT_THRESHOLD = 100000
+
+# Background jobs: seconds a claimed job stays leased to its worker; a
+# running job renews its lease every third of this
+JOB_LEASE_SECONDS = 300
+
+# Due-date reminders (see tasks/reminders.py; run `manage.py scan_due_tasks`)
+TASK_REMINDERS = {
+    'LEAD_TIME_HOURS': 24,
+    'BATCH_SIZE': 500,
+    # tasks.reminders.EmailSender in production; FileSender writes FILE_PATH
+    'SENDER': 'tasks.reminders.ConsoleSender',
+    'FILE_PATH': BASE_DIR / 'reminders.jsonl',
+    # A drain stops after this long (below JOB_LEASE_SECONDS)
+    'TIME_BUDGET_SECONDS': 60,
+}
+
+# Change log behind the changesSince query (see organizations/changes.py;
+# run `manage.py compact_change_log` daily)
+CHANGE_LOG = {
+    # Cursors older than this get resyncRequired
+    'RETENTION_DAYS': 7,
+    # Entries younger than this are not served yet (seconds)
+    'SETTLE_SECONDS': 2,
+}
+
+# Background deletion of projects and organizations (see tasks/deletion.py)
+DELETION = {
+    # Rows per DELETE statement and transaction
+    'BATCH_SIZE': 1000,
+    # A purge job queues its continuation after this long (below JOB_LEASE_SECONDS)
+    'TIME_BUDGET_SECONDS': 60,
+}
+
+# Task dependency graphs (see tasks/dependencies.py), cached per data version
+TASK_DEPENDENCIES = {
+    # Seconds a computed graph stays in the cache backend
+    'CACHE_TIMEOUT': 300,
+}
+
+# Admission control for /graphql/ (see core/ratelimit.py). A query costs
+# the number of objects it may fetch; rates are in cost units per second
+# and bursts are the bucket sizes (the most one request may cost).
+GRAPHQL_RATE_LIMIT = {
+    'ENABLED': True,
+    'ORGANIZATION_RATE': 200,
+    'ORGANIZATION_BURST': 4000,
+    'IP_RATE': 100,
+    'IP_BURST': 2000,
+    'MAX_IN_FLIGHT_PER_ORGANIZATION': 8,
+    'LIST_COST_MULTIPLIER': 10,
+}
+
+# ETags for GraphQL GET queries (see core/conditional.py). With
+# VERSION_SHORT_CIRCUIT the data version is checked before executing; this
+# needs a cache backend shared by all processes and is off on LocMemCache.
+GRAPHQL_ETAG = {
+    'ENABLED': True,
+    'VERSION_SHORT_CIRCUIT': True,
+    # ETags of queries selecting isOverdue/assigneeWorkload expire this often
+    'TIME_BUCKET_SECONDS': 60,
+}
+
+# Batched GraphQL requests (a JSON array of operations, see core/views.py).
+# PARALLEL runs batches made only of queries on a thread pool.
+GRAPHQL_BATCH = {
+    'MAX_SIZE': 10,
+    'PARALLEL': False,
+    'MAX_WORKERS': 4,
+}
+
+# @defer / @stream incremental delivery (see core/incremental.py).
+# BATCH_SIZE is the number of deferred fragments or streamed items per part.
+GRAPHQL_INCREMENTAL = {
+    'ENABLED': True,
+    'BATCH_SIZE': 50,
+}
+
+# Introspection results kept in memory per schema (see core/introspection.py)
+GRAPHQL_INTROSPECTION_CACHE_SIZE = 16
+
+# GraphQL response encoding: 'auto' uses orjson when installed
+GRAPHQL_JSON_ENCODER = 'auto'
+# Responses at least this large are gzip/brotli compressed when accepted
+GRAPHQL_COMPRESSION_MIN_SIZE = 1024
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -103,12 +206,49 @@ STATIC_URL = 'static/'
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Slow SQL log and per-fingerprint statistics (off unless ENABLED). Rank
+# them with `manage.py sql_stats`.
+SLOW_SQL = {
+    'ENABLED': False,
+    # Statements at least this slow are logged with their EXPLAIN plan
+    'THRESHOLD_MS': 100,
+    'EXPLAIN': True,
+    'SAMPLES': 256,
+    'DIRECTORY': BASE_DIR / 'sqlstats',
+    'FLUSH_SECONDS': 10,
+}
+
 # GraphQL settings
 GRAPHENE = {
     'SCHEMA': 'core.schema.schema',
+    # The debug middleware wraps every resolver and records all SQL; it is
+    # only useful with a _debug field while developing.
     'MIDDLEWARE': [
         'graphene_django.debug.DjangoDebugMiddleware',
-    ]
+    ] if DEBUG else [],
+}
+if SLOW_SQL['ENABLED']:
+    # Attributes SQL to the GraphQL field that issued it.
+    GRAPHENE['MIDDLEWARE'].append('core.slowsql.ResolverPathMiddleware')
+
+# Identical concurrent queries share one execution (see core/singleflight.py).
+GRAPHQL_SINGLE_FLIGHT = {
+    'ENABLED': True,
+    'WAIT_TIMEOUT': 30,
+}
+
+# Sampling profiler for slow requests (off unless ENABLED). Captures are
+# collapsed-stack files; merge them with `manage.py merge_profiles`.
+REQUEST_PROFILER = {
+    'ENABLED': False,
+    'PATHS': ['/graphql/'],
+    # Keep the samples of requests at least this slow...
+    'THRESHOLD_MS': 500,
+    # ...and of this fraction of all other requests.
+    'SAMPLE_RATE': 0.0,
+    'INTERVAL_MS': 5,
+    'DIRECTORY': BASE_DIR / 'profiles',
+    'MAX_FILES': 500,
 }
 
 # CORS settings
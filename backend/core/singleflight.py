@@ -0,0 +1,110 @@
+"""
+Request coalescing ("single flight") for identical concurrent queries.
+
+When many people open the same dashboard at once, identical
+``organizationStats`` / ``projects`` queries arrive together. The first
+becomes the leader and executes; identical queries arriving while it runs
+wait for and share its result instead of hitting the database again.
+
+Queries are identical when their document, variables, operation name and
+data version (core.versioning, the same token the ETags use) match, so a
+write committed before a query arrives always gives it a new key.
+Mutations are never coalesced.
+
+A call is a ``concurrent.futures.Future`` that followers in other threads
+(WSGI workers, or the worker threads ASGI servers run the sync view in)
+wait on.
+"""
+
+import hashlib
+import json
+import threading
+from concurrent.futures import Future, TimeoutError
+
+from django.conf import settings
+
+from core import conditional, metrics
+
+
+DEFAULTS = {
+    'ENABLED': True,
+    # Followers run the query themselves if the leader takes longer (seconds)
+    'WAIT_TIMEOUT': 30,
+}
+
+metrics.describe('graphql_single_flight_total', 'Query executions by single-flight role (leader/collapsed/fallback).')
+
+
+def get_setting(name):
+    return getattr(settings, 'GRAPHQL_SINGLE_FLIGHT', {}).get(name, DEFAULTS[name])
+
+
+def request_key(query, variables, operation_name):
+    """Key shared by identical queries against the same data, or None for mutations."""
+    if not query:
+        return None
+    operation = conditional.query_operation(query, operation_name)
+    if operation is None:
+        return None
+    return hashlib.sha256('\x1f'.join((
+        conditional.data_version(operation, variables),
+        query,
+        json.dumps(variables or {}, sort_keys=True),
+        operation_name or '',
+    )).encode()).hexdigest()
+
+
+class LeaderAbandoned(Exception):
+    """The leader was interrupted (e.g. cancelled) rather than failing."""
+
+
+class Group:
+    """In-flight calls by key."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def _join(self, key):
+        """Return (future, is_leader)."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+            future = self._calls[key] = Future()
+            return future, True
+
+    def _finish(self, key, future, result=None, error=None):
+        with self._lock:
+            del self._calls[key]
+        if error is None:
+            future.set_result(result)
+        elif isinstance(error, Exception):
+            future.set_exception(error)
+        else:
+            # Don't propagate a cancellation or exit into the followers.
+            future.set_exception(LeaderAbandoned())
+
+    def do(self, key, function):
+        """Return ``function()``, sharing one execution between concurrent callers with ``key``."""
+        future, leader = self._join(key)
+        if not leader:
+            try:
+                result = future.result(timeout=get_setting('WAIT_TIMEOUT'))
+            except (TimeoutError, LeaderAbandoned):
+                metrics.increment('graphql_single_flight_total', role='fallback')
+                return function()
+            metrics.increment('graphql_single_flight_total', role='collapsed')
+            return result
+
+        metrics.increment('graphql_single_flight_total', role='leader')
+        try:
+            result = function()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result
+
+
+group = Group()
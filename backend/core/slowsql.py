@@ -0,0 +1,277 @@
+"""
+Slow SQL log and per-statement statistics.
+
+When SLOW_SQL['ENABLED'] is set, every database connection gets an
+execute wrapper that times each statement and aggregates it by
+fingerprint (the SQL with literals and IN lists normalized). Statements
+slower than THRESHOLD_MS are logged to the ``core.slowsql`` logger with
+the GraphQL operation and field path that issued them, and the backend's
+EXPLAIN plan.
+
+ResolverPathMiddleware (a graphene middleware) records which field is
+resolving; querysets returned by resolvers are evaluated inside it, so
+their SQL is attributed to the field rather than to its parent.
+
+Stats live in memory and are written every FLUSH_SECONDS to
+``<DIRECTORY>/<host>-<pid>.json``; ``manage.py sql_stats`` merges the files
+and ranks the fingerprints.
+"""
+
+import atexit
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import socket
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.models import QuerySet
+
+
+DEFAULTS = {
+    'ENABLED': False,
+    'THRESHOLD_MS': 100,
+    'EXPLAIN': True,
+    # Durations kept per fingerprint for percentiles
+    'SAMPLES': 256,
+    'DIRECTORY': 'sqlstats',
+    'FLUSH_SECONDS': 10,
+}
+
+EXPLAIN_PREFIXES = {
+    'postgresql': 'EXPLAIN ',
+    'sqlite': 'EXPLAIN QUERY PLAN ',
+    'mysql': 'EXPLAIN ',
+}
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+_stats = {}
+_stats_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+def get_setting(name):
+    return getattr(settings, 'SLOW_SQL', {}).get(name, DEFAULTS[name])
+
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*\?\s*,)*\s*\?\s*\)', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=4096)
+def normalize(sql):
+    """Replace literals and placeholders with ``?`` and collapse IN lists."""
+    sql = _STRING.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(sql):
+    normalized = normalize(sql)
+    return hashlib.sha1(normalized.encode()).hexdigest()[:12], normalized
+
+
+def current_location():
+    """(operation name, field path) of the resolver running on this thread."""
+    return getattr(_local, 'operation', None), getattr(_local, 'path', None)
+
+
+def _field_path(info):
+    # tasks.0.project and tasks.1.project are the same call site.
+    return '.'.join('*' if isinstance(key, int) else key for key in info.path.as_list())
+
+
+class ResolverPathMiddleware:
+    """Graphene middleware recording the field being resolved on this thread."""
+
+    def resolve(self, next, root, info, **args):
+        previous = current_location()
+        _local.operation = info.operation.name.value if info.operation.name else None
+        _local.path = _field_path(info)
+        try:
+            result = next(root, info, **args)
+            if isinstance(result, QuerySet):
+                result._fetch_all()
+            return result
+        finally:
+            _local.operation, _local.path = previous
+
+
+def explain(connection, sql, params):
+    prefix = EXPLAIN_PREFIXES.get(connection.vendor)
+    if prefix is None or sql.lstrip()[:6].upper() != 'SELECT':
+        return None
+    _local.explaining = True
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            return '\n'.join(' '.join(str(value) for value in row) for row in cursor.fetchall())
+    except Exception as e:
+        return f'EXPLAIN failed: {e}'
+    finally:
+        _local.explaining = False
+
+
+def _record(key, normalized, duration_ms, rows, operation, path):
+    sample_size = get_setting('SAMPLES')
+    with _stats_lock:
+        entry = _stats.get(key)
+        if entry is None:
+            entry = _stats[key] = {
+                'sql': normalized,
+                'count': 0,
+                'total_ms': 0.0,
+                'slow': 0,
+                'rows': 0,
+                'rows_known': 0,
+                'max_per_request': 0,
+                'samples': [],
+                'paths': Counter(),
+                'plan': None,
+            }
+        entry['count'] += 1
+        entry['total_ms'] += duration_ms
+        if rows is not None and rows >= 0:
+            entry['rows'] += rows
+            entry['rows_known'] += 1
+        samples = entry['samples']
+        if len(samples) < sample_size:
+            samples.append(duration_ms)
+        else:
+            # Reservoir sampling keeps a uniform sample of all durations.
+            index = random.randrange(entry['count'])
+            if index < sample_size:
+                samples[index] = duration_ms
+        entry['paths'][f"{operation or '-'} {path or '-'}"] += 1
+        return entry
+
+
+def record_statement(execute, sql, params, many, context):
+    """Execute wrapper (see ``connection.execute_wrapper``)."""
+    if getattr(_local, 'explaining', False):
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    result = execute(sql, params, many, context)
+    duration_ms = (time.perf_counter() - started) * 1000
+
+    key, normalized = fingerprint(sql)
+    operation, path = current_location()
+    entry = _record(key, normalized, duration_ms, context['cursor'].rowcount, operation, path)
+
+    per_request = getattr(_local, 'per_request', None)
+    if per_request is not None:
+        per_request[key] += 1
+
+    if duration_ms >= get_setting('THRESHOLD_MS'):
+        plan = None
+        if get_setting('EXPLAIN') and not many:
+            plan = explain(context['connection'], sql, params)
+        with _stats_lock:
+            entry['slow'] += 1
+            if plan is not None:
+                entry['plan'] = plan
+        logger.warning(
+            "Slow SQL %.1f ms [%s] operation=%s path=%s\n%s%s",
+            duration_ms, key, operation or '-', path or '-', sql,
+            f'\n{plan}' if plan else '',
+        )
+    return result
+
+
+def _install(sender=None, connection=None, **kwargs):
+    if record_statement not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_statement)
+
+
+def stats_path():
+    return Path(get_setting('DIRECTORY')) / f'{socket.gethostname()}-{os.getpid()}.json'
+
+
+def flush():
+    """Write this process's stats for ``manage.py sql_stats``."""
+    global _last_flush
+    with _stats_lock:
+        data = {
+            key: {**entry, 'samples': list(entry['samples']), 'paths': dict(entry['paths'])}
+            for key, entry in _stats.items()
+        }
+        _last_flush = time.monotonic()
+    if not data:
+        return
+    path = stats_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_suffix('.tmp')
+    with open(temporary, 'w') as output:
+        json.dump(data, output)
+    os.replace(temporary, path)
+
+
+def load_stats(directory):
+    """Merge every process's stats file into {fingerprint: entry}."""
+    merged = {}
+    for path in Path(directory).glob('*.json'):
+        with open(path) as stats_file:
+            data = json.load(stats_file)
+        for key, entry in data.items():
+            total = merged.get(key)
+            if total is None:
+                merged[key] = {**entry, 'paths': Counter(entry['paths'])}
+                continue
+            for field in ('count', 'total_ms', 'slow', 'rows', 'rows_known'):
+                total[field] += entry[field]
+            total['max_per_request'] = max(total['max_per_request'], entry['max_per_request'])
+            total['samples'].extend(entry['samples'])
+            total['paths'].update(entry['paths'])
+            total['plan'] = total['plan'] or entry['plan']
+    return merged
+
+
+def percentile(samples, fraction):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class SlowQueryMiddleware:
+    """Installs record_statement on every connection and flushes stats."""
+
+    def __init__(self, get_response):
+        if not get_setting('ENABLED'):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        connection_created.connect(_install)
+        for connection in connections.all(initialized_only=True):
+            _install(connection=connection)
+        atexit.register(flush)
+
+    def __call__(self, request):
+        _local.per_request = Counter()
+        try:
+            return self.get_response(request)
+        finally:
+            per_request, _local.per_request = _local.per_request, None
+            with _stats_lock:
+                for key, count in per_request.items():
+                    entry = _stats[key]
+                    entry['max_per_request'] = max(entry['max_per_request'], count)
+            if time.monotonic() - _last_flush >= get_setting('FLUSH_SECONDS'):
+                flush()
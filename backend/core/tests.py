@@ -0,0 +1,769 @@
+import gzip
+import json
+import tempfile
+import threading
+import time
+import unittest
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.admin.sites import site
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core import (
+    compression, conditional, encoding, incremental, introspection, profiling, ratelimit, singleflight, slowsql,
+)
+from core.paginator import EstimatedCountPaginator
+from core.schema import schema
+from core.versioning import bump_organization_version
+from jobs.models import Job
+from organizations.models import Organization
+from organizations.cache import local_cache
+from projects.models import Project
+from tasks.archive import archive_project
+from tasks.deletion import mark_project_deleted
+from tasks.models import Task, TaskComment
+
+
+NESTED_QUERY = '{ organizations { projects { tasks { comments { content } } } } }'
+
+
+class QueryTooCostlyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_admit_rejects_cost_above_burst_without_charging(self):
+        request = RequestFactory().post('/graphql/')
+        cost = ratelimit.query_cost(schema.graphql_schema, NESTED_QUERY)
+        self.assertGreater(cost, ratelimit.get_setting('IP_BURST'))
+        with self.assertRaises(ratelimit.QueryTooCostly) as raised:
+            ratelimit.admit(request, schema.graphql_schema, [(NESTED_QUERY, None, None)])
+        self.assertEqual(raised.exception.cost, cost)
+        self.assertEqual(raised.exception.limit, 'ip')
+        # Nothing was charged, so a cheap query is still admitted.
+        ratelimit.admit(request, schema.graphql_schema, [('{ organizations { name } }', None, None)]).release()
+
+    def test_view_answers_400_without_retry_after(self):
+        response = self.client.post(
+            '/graphql/', json.dumps({'query': NESTED_QUERY}), content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertNotIn('Retry-After', response)
+        error = response.json()['errors'][0]
+        self.assertEqual(error['extensions']['code'], 'QUERY_TOO_COSTLY')
+        self.assertEqual(error['extensions']['maxCost'], ratelimit.get_setting('IP_BURST'))
+
+
+class TimeDependentETagTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def etag_at(self, query, now):
+        with mock.patch('core.conditional.time.time', return_value=now):
+            return conditional.version_etag(query, None, None)
+
+    def test_overdue_fields_change_with_time(self):
+        for query in (
+            '{ projects(organizationSlug: "acme") { tasks { isOverdue } } }',
+            '{ assigneeWorkload(organizationSlug: "acme") { total } }',
+            'query { projects(organizationSlug: "acme") { ...Due } } fragment Due on ProjectType { isOverdue }',
+        ):
+            self.assertEqual(self.etag_at(query, 1000), self.etag_at(query, 1001))
+            self.assertNotEqual(self.etag_at(query, 1000), self.etag_at(query, 1000 + 3600))
+
+    def test_other_fields_keep_their_etag(self):
+        query = '{ projects(organizationSlug: "acme") { name } }'
+        self.assertEqual(self.etag_at(query, 1000), self.etag_at(query, 1000 + 3600))
+
+
+class UnversionedFieldTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_job_polls_are_not_version_tagged(self):
+        self.assertIsNone(conditional.version_etag('query($id: ID!) { job(id: $id) { status } }', {'id': 1}, None))
+
+    def test_job_poll_sees_the_worker_finish(self):
+        job = Job.objects.create(name='tests.noop', run_at=timezone.now(), status='RUNNING')
+        query = '{ job(id: "%d") { status } }' % job.id
+        first = self.client.get('/graphql/', {'query': query})
+        self.assertEqual(first.json()['data']['job']['status'], 'RUNNING')
+        Job.objects.filter(id=job.id).update(status='SUCCEEDED')
+        second = self.client.get('/graphql/', {'query': query}, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.json()['data']['job']['status'], 'SUCCEEDED')
+
+
+class VersionShortCircuitTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_off_on_process_local_caches(self):
+        self.assertFalse(conditional.version_short_circuit())
+        shared = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache'}}
+        with override_settings(CACHES=shared):
+            self.assertTrue(conditional.version_short_circuit())
+            with override_settings(GRAPHQL_ETAG={'VERSION_SHORT_CIRCUIT': False}):
+                self.assertFalse(conditional.version_short_circuit())
+
+    def test_write_in_another_process_is_not_hidden(self):
+        organization = Organization.objects.create(name="Acme", slug="acme", contact_email="ops@acme.test")
+        project = Project.objects.create(organization=organization, name="Launch")
+        query = '{ projects(organizationSlug: "acme") { name } }'
+        first = self.client.get('/graphql/', {'query': query})
+        self.assertEqual(first.status_code, 200)
+        revalidated = self.client.get('/graphql/', {'query': query}, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+        # A write whose version bump this process never sees.
+        Project.objects.filter(id=project.id).update(name="Relaunch")
+        second = self.client.get('/graphql/', {'query': query}, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.json()['data']['projects'], [{'name': "Relaunch"}])
+
+
+class QueryCostTests(TestCase):
+    def cost(self, query, variables=None):
+        return ratelimit.query_cost(schema.graphql_schema, query, variables=variables)
+
+    def test_counts_objects_not_scalars(self):
+        self.assertEqual(self.cost('{ organizations { id name slug } }'), 10)
+        self.assertEqual(self.cost('{ organizations { name projects { name } } }'), 10 * (1 + 10))
+
+    def test_three_levels_of_lists_are_admitted(self):
+        query = '{ projects(organizationSlug: "acme") { name tasks { title comments { content } } } }'
+        self.assertLessEqual(self.cost(query), ratelimit.get_setting('IP_BURST'))
+
+    def test_size_arguments_set_the_list_length(self):
+        self.assertEqual(self.cost('{ task(id: 1) { recentComments { content } } }'), 1 + 5)
+        self.assertEqual(self.cost('{ task(id: 1) { recentComments(limit: 2) { content } } }'), 1 + 2)
+        query = 'query($n: Int) { tasksByAssignee(email: "a@acme.test", first: $n) { edges { node { title } } } }'
+        self.assertEqual(self.cost(query, {'n': 50}), 1 + 50 * 2)
+
+
+class InFlightLimiterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_release_after_expiry_does_not_loosen_the_cap(self):
+        limiter = ratelimit.InFlightLimiter(1)
+        self.assertTrue(limiter.acquire('acme'))
+        # The counter lapses while the request runs, and a new one starts.
+        cache.delete(limiter._key('acme'))
+        self.assertTrue(limiter.acquire('acme'))
+        limiter.release('acme')
+        limiter.release('acme')
+        self.assertEqual(cache.get(limiter._key('acme')), 0)
+        self.assertTrue(limiter.acquire('acme'))
+        self.assertFalse(limiter.acquire('acme'))
+
+    def test_acquire_refreshes_the_expiry(self):
+        limiter = ratelimit.InFlightLimiter(2)
+        limiter.acquire('acme')
+        with mock.patch.object(cache, 'touch') as touch:
+            limiter.acquire('acme')
+        touch.assert_called_once_with(limiter._key('acme'), limiter.timeout)
+
+
+class ProfileCaptureNameTests(TestCase):
+    def test_client_names_stay_inside_the_directory(self):
+        capture = profiling.Capture(0, None)
+        capture.stacks['main (views.py:1)'] = 3
+        with tempfile.TemporaryDirectory() as root:
+            directory = Path(root) / 'profiles'
+            with override_settings(REQUEST_PROFILER={'DIRECTORY': str(directory), 'MAX_FILES': 10}):
+                for operation, organization in (('..', '.'), ('../../etc', '../x'), ('.', '..'), ('', '')):
+                    path = profiling.write_capture(capture, 600, {'operation': operation, 'organization': organization})
+                    self.assertEqual(path.resolve().parent.parent, directory.resolve())
+            self.assertEqual(list(Path(root).iterdir()), [directory])
+        self.assertEqual(profiling.safe_name('..'), 'unnamed')
+        self.assertEqual(profiling.safe_name('GetTasks+GetTask'), 'GetTasks_GetTask')
+
+
+class AcceptEncodingTests(TestCase):
+    def accepted(self, header):
+        return compression._accepted_encodings(RequestFactory().get('/', HTTP_ACCEPT_ENCODING=header))
+
+    def test_quality_values(self):
+        self.assertEqual(self.accepted('gzip, br;q=0.5, deflate;q=0'), {'gzip', 'br'})
+        self.assertEqual(self.accepted('gzip;q=1.000, br; q = 0.001'), {'gzip', 'br'})
+
+    def test_malformed_quality_values_are_ignored(self):
+        self.assertEqual(self.accepted('gzip;q=., br;q=1.2.3, deflate;q=2, identity'), {'identity'})
+
+    def test_view_survives_a_malformed_header(self):
+        response = self.client.get('/graphql/', {'query': '{ organizations { id } }'}, HTTP_ACCEPT_ENCODING='gzip;q=.')
+        self.assertEqual(response.status_code, 200)
+
+
+class QuerysetOptimizerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        organization = Organization.objects.create(name="Acme", contact_email="ops@acme.test")
+        for number in range(3):
+            project = Project.objects.create(organization=organization, name=f"Project {number}")
+            for title in ("First", "Second"):
+                task = Task.objects.create(project=project, title=title, description="Long text")
+                TaskComment.objects.create(task=task, content="Hi", author_email="a@acme.test")
+        cls.task = task
+
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+
+    def execute(self, query):
+        with CaptureQueriesContext(connection) as queries:
+            result = schema.execute(query)
+        self.assertIsNone(result.errors)
+        return result.data, [query['sql'] for query in queries.captured_queries]
+
+    def test_nested_lists_take_one_query_per_level(self):
+        data, queries = self.execute(
+            '{ projects(organizationSlug: "acme") { name tasks { title comments { content } } } }'
+        )
+        # The organization, then projects, tasks and comments.
+        self.assertEqual(len(queries), 4)
+        self.assertEqual(len(data['projects']), 3)
+        self.assertEqual(data['projects'][0]['tasks'][0]['comments'], [{'content': "Hi"}])
+
+    def test_only_requested_columns_are_read(self):
+        _, queries = self.execute('{ tasks(projectId: "%d") { title } }' % self.task.project_id)
+        self.assertIn('"tasks_task"."title"', queries[-1])
+        self.assertNotIn('"tasks_task"."description"', queries[-1])
+
+    def test_forward_relations_are_joined(self):
+        data, queries = self.execute(
+            '{ task(id: "%d") { title project { name organization { name } } } }' % self.task.id
+        )
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(data['task']['project']['organization']['name'], "Acme")
+
+
+class RecentCommentsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        organization = Organization.objects.create(name="Acme", contact_email="ops@acme.test")
+        cls.project = Project.objects.create(organization=organization, name="Launch")
+        cls.comments = {}
+        for title in ("First", "Second", "Third"):
+            task = Task.objects.create(project=cls.project, title=title)
+            cls.comments[title] = [
+                TaskComment.objects.create(task=task, content=f"{title} {number}", author_email="a@acme.test")
+                for number in range(4)
+            ]
+
+    def test_newest_comments_of_every_task_in_one_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            result = schema.execute(
+                '{ tasks(projectId: "%d") { title recentComments(limit: 2) { content } } }' % self.project.id
+            )
+        self.assertIsNone(result.errors)
+        # The project, its tasks, and one windowed query for all comments.
+        self.assertEqual(len(queries.captured_queries), 3)
+        self.assertIn('ROW_NUMBER()', queries.captured_queries[-1]['sql'])
+        for task in result.data['tasks']:
+            self.assertEqual(
+                [comment['content'] for comment in task['recentComments']],
+                [f"{task['title']} 3", f"{task['title']} 2"],
+            )
+
+    def test_comment_history_pages_newest_first(self):
+        task_id = self.comments['First'][0].task_id
+        query = 'query($after: String) { task(id: "%d") { commentHistory(first: 3, after: $after) ' \
+            '{ edges { node { content } } pageInfo { hasNextPage endCursor } } } }' % task_id
+        first = schema.execute(query).data['task']['commentHistory']
+        self.assertEqual([edge['node']['content'] for edge in first['edges']], ["First 3", "First 2", "First 1"])
+        self.assertTrue(first['pageInfo']['hasNextPage'])
+        second = schema.execute(
+            query, variable_values={'after': first['pageInfo']['endCursor']}
+        ).data['task']['commentHistory']
+        self.assertEqual([edge['node']['content'] for edge in second['edges']], ["First 0"])
+        self.assertFalse(second['pageInfo']['hasNextPage'])
+
+
+class AdminChangelistTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(name="Acme", contact_email="ops@acme.test")
+        cls.user = User.objects.create_superuser('admin', 'admin@acme.test', 'secret')
+        live = Project.objects.create(organization=cls.organization, name="Live")
+        Task.objects.create(project=live, title="Open")
+        Task.objects.create(project=live, title="Done", status='DONE')
+        shipped = Project.objects.create(organization=cls.organization, name="Shipped", status='COMPLETED')
+        Task.objects.create(project=shipped, title="Done", status='DONE')
+        archive_project(shipped)
+        Project.objects.create(organization=cls.organization, name="Empty", status='ON_HOLD')
+        Project.objects.create(organization=cls.organization, name="Template", is_template=True)
+        mark_project_deleted(Project.objects.create(organization=cls.organization, name="Gone"))
+
+    def model_admin(self, model):
+        return site._registry[model]
+
+    def test_annotations_match_the_model_properties(self):
+        request = RequestFactory().get('/admin/')
+        request.user = self.user
+        project_admin = self.model_admin(Project)
+        for project in project_admin.get_queryset(request):
+            self.assertEqual(project_admin.task_count(project), project.task_count, project.name)
+            self.assertEqual(project_admin.completion_rate(project), project.completion_rate, project.name)
+        organization_admin = self.model_admin(Organization)
+        organization = organization_admin.get_queryset(request).get(id=self.organization.id)
+        self.assertEqual(organization_admin.project_count(organization), organization.project_count)
+        self.assertEqual(organization_admin.active_project_count(organization), organization.active_project_count)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        self.client.force_login(self.user)
+
+        def changelist_queries():
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.client.get('/admin/projects/project/').status_code, 200)
+            return len(queries.captured_queries)
+
+        before = changelist_queries()
+        for number in range(5):
+            project = Project.objects.create(organization=self.organization, name=f"More {number}")
+            Task.objects.create(project=project, title="Open")
+        self.assertEqual(changelist_queries(), before)
+
+    def test_paginator_uses_estimates_above_the_threshold(self):
+        with override_settings(ADMIN_ESTIMATED_COUNT_THRESHOLD=1000):
+            with mock.patch('core.paginator.estimate_table_rows', return_value=5000):
+                self.assertEqual(EstimatedCountPaginator(Project.all_objects.order_by('id'), 10).count, 5000)
+            with mock.patch('core.paginator.estimate_table_rows', return_value=10):
+                exact = Project.all_objects.count()
+                self.assertEqual(EstimatedCountPaginator(Project.all_objects.order_by('id'), 10).count, exact)
+
+
+class ResponseEncodingTests(TestCase):
+    data = {
+        'when': datetime(2026, 1, 2, 3, 4, 5, tzinfo=dt_timezone.utc),
+        'day': date(2026, 1, 2),
+        'amount': Decimal('1.50'),
+        'items': [1, 'two', None],
+    }
+
+    def test_encoders_agree(self):
+        stdlib = json.loads(encoding.get_encoder('stdlib').encode(self.data))
+        self.assertEqual(stdlib['day'], '2026-01-02')
+        self.assertEqual(stdlib['amount'], '1.50')
+        if encoding.orjson is not None:
+            self.assertEqual(json.loads(encoding.get_encoder('orjson').encode(self.data)), stdlib)
+
+    def test_pretty_output_is_sorted_and_indented(self):
+        text = encoding.get_encoder('stdlib').encode({'b': 1, 'a': 2}, pretty=True).decode()
+        self.assertEqual(text, '{\n  "a": 2,\n  "b": 1\n}')
+
+    def test_unknown_encoder(self):
+        with self.assertRaises(ImproperlyConfigured):
+            encoding.get_encoder('yaml')
+
+
+@override_settings(GRAPHQL_COMPRESSION_MIN_SIZE=100)
+class ResponseCompressionTests(TestCase):
+    query = '{ organizations { id name slug contactEmail createdAt updatedAt } }'
+
+    @classmethod
+    def setUpTestData(cls):
+        for number in range(5):
+            Organization.objects.create(name=f"Organization {number}", contact_email="ops@acme.test")
+
+    def setUp(self):
+        cache.clear()
+
+    def test_large_responses_are_gzipped(self):
+        response = self.client.get('/graphql/', {'query': self.query}, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertTrue(response['ETag'].startswith('W/'))
+        body = json.loads(gzip.decompress(response.content))
+        self.assertEqual(len(body['data']['organizations']), 5)
+
+    @unittest.skipIf(compression.brotli is None, "brotli is not installed")
+    def test_brotli_is_preferred(self):
+        response = self.client.get('/graphql/', {'query': self.query}, HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        body = json.loads(compression.brotli.decompress(response.content))
+        self.assertEqual(len(body['data']['organizations']), 5)
+
+    def test_small_or_unaccepted_responses_are_sent_as_is(self):
+        small = self.client.get('/graphql/', {'query': '{ organizations { id } }'}, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(small.has_header('Content-Encoding'))
+        plain = self.client.get('/graphql/', {'query': self.query})
+        self.assertFalse(plain.has_header('Content-Encoding'))
+        self.assertEqual(len(plain.json()['data']['organizations']), 5)
+
+
+class BatchedRequestTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        organization = Organization.objects.create(name="Acme", contact_email="ops@acme.test")
+        cls.project = Project.objects.create(organization=organization, name="Launch")
+        Task.objects.create(project=cls.project, title="Write copy", status='TODO')
+
+    def setUp(self):
+        cache.clear()
+
+    def post_batch(self, operations):
+        return self.client.post('/graphql/', json.dumps(operations), content_type='application/json')
+
+    def test_operations_share_the_project_loader(self):
+        project_id = str(self.project.id)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post_batch([
+                {'query': 'query ($id: ID!) { tasks(projectId: $id) { title } }', 'variables': {'id': project_id}},
+                {
+                    'query': 'query ($id: ID!) { boardColumn(projectId: $id, status: "TODO") { title } }',
+                    'variables': {'id': project_id},
+                },
+            ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([result['data'] for result in response.json()], [
+            {'tasks': [{'title': "Write copy"}]},
+            {'boardColumn': [{'title': "Write copy"}]},
+        ])
+        project_lookups = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('SELECT') and 'FROM "projects_project"' in query['sql']
+        ]
+        self.assertEqual(len(project_lookups), 1)
+
+    def test_queries_after_a_mutation_see_its_writes(self):
+        project_id = str(self.project.id)
+        response = self.post_batch([
+            {'query': 'query ($id: ID!) { tasks(projectId: $id) { title } }', 'variables': {'id': project_id}},
+            {
+                'query': 'mutation ($id: ID!) { createTask(projectId: $id, title: "Review") { success } }',
+                'variables': {'id': project_id},
+            },
+            {'query': 'query ($id: ID!) { tasks(projectId: $id) { title } }', 'variables': {'id': project_id}},
+        ])
+        first, created, last = response.json()
+        self.assertEqual(len(first['data']['tasks']), 1)
+        self.assertTrue(created['data']['createTask']['success'])
+        self.assertEqual(sorted(task['title'] for task in last['data']['tasks']), ["Review", "Write copy"])
+
+    def test_errors_are_reported_per_operation(self):
+        response = self.post_batch([{'query': '{ organizations { id } }'}, {'query': '{ nope }'}])
+        self.assertEqual(response.status_code, 200)
+        ok, failed = response.json()
+        self.assertEqual(len(ok['data']['organizations']), 1)
+        self.assertIn('errors', failed)
+
+    @override_settings(GRAPHQL_BATCH={'MAX_SIZE': 2})
+    def test_batch_size_is_limited(self):
+        response = self.post_batch([{'query': '{ organizations { id } }'}] * 3)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.post_batch([]).status_code, 400)
+
+
+class IncrementalDeliveryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        organization = Organization.objects.create(name="Acme", contact_email="ops@acme.test")
+        cls.project = Project.objects.create(organization=organization, name="Launch", description="Spring launch")
+        for number in range(3):
+            Task.objects.create(project=cls.project, title=f"Task {number}")
+
+    def setUp(self):
+        cache.clear()
+
+    def get_parts(self, query, variables):
+        response = self.client.get(
+            '/graphql/',
+            {'query': query, 'variables': json.dumps(variables)},
+            HTTP_ACCEPT='multipart/mixed; deferSpec=20220824, application/json',
+        )
+        self.assertEqual(response['Content-Type'], incremental.CONTENT_TYPE)
+        body = b''.join(response.streaming_content)
+        self.assertTrue(body.endswith(b'\r\n-----\r\n'))
+        parts = body[:-len(b'\r\n-----\r\n')].split(b'\r\n---\r\n')[1:]
+        return [json.loads(part.split(b'\r\n\r\n', 1)[1]) for part in parts]
+
+    def test_deferred_fragment_arrives_later(self):
+        initial, deferred = self.get_parts(
+            'query ($id: ID!) { project(id: $id) { name ... @defer { description } } }',
+            {'id': str(self.project.id)},
+        )
+        self.assertEqual(initial, {'data': {'project': {'name': "Launch"}}, 'hasNext': True})
+        self.assertEqual(deferred, {
+            'incremental': [{'data': {'description': "Spring launch"}, 'path': ['project']}],
+            'hasNext': False,
+        })
+
+    def test_streamed_list_sends_the_initial_items_first(self):
+        parts = self.get_parts(
+            'query ($id: ID!) { tasks(projectId: $id) @stream(initialCount: 1) { title } }',
+            {'id': str(self.project.id)},
+        )
+        # Newest first, the model's default ordering.
+        self.assertEqual(parts[0], {'data': {'tasks': [{'title': "Task 2"}]}, 'hasNext': True})
+        streamed = [
+            item for part in parts[1:] for payload in part['incremental'] for item in payload['items']
+        ]
+        self.assertEqual(streamed, [{'title': "Task 1"}, {'title': "Task 0"}])
+        self.assertEqual(parts[1]['incremental'][0]['path'], ['tasks', 1])
+        self.assertFalse(parts[-1]['hasNext'])
+
+    def test_clients_without_multipart_get_a_single_response(self):
+        response = self.client.get('/graphql/', {
+            'query': 'query ($id: ID!) { project(id: $id) { name ... @defer { description } } }',
+            'variables': json.dumps({'id': str(self.project.id)}),
+        })
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(response.json()['data'], {'project': {'name': "Launch", 'description': "Spring launch"}})
+
+
+class IntrospectionCacheTests(TestCase):
+    query = '{ __schema { queryType { name } } }'
+
+    def setUp(self):
+        cache.clear()
+        introspection._results.clear()
+
+    def test_only_pure_introspection_queries_are_cached(self):
+        self.assertTrue(introspection.is_introspection(self.query, None))
+        self.assertTrue(introspection.is_introspection('query Q { __type(name: "TaskType") { name } }', 'Q'))
+        self.assertFalse(introspection.is_introspection('{ __typename organizations { id } }', None))
+        self.assertFalse(introspection.is_introspection('mutation { __typename }', None))
+        self.assertFalse(introspection.is_introspection('{ __schema', None))
+
+    def test_repeated_introspection_is_served_from_memory(self):
+        first = self.client.get('/graphql/', {'query': self.query})
+        self.assertEqual(first.json()['data'], {'__schema': {'queryType': {'name': 'Query'}}})
+        key = introspection.cache_key(schema.graphql_schema, self.query, None, None)
+        self.assertEqual(introspection._results[key], first.json()['data'])
+        # Whatever is cached is what the next request gets.
+        introspection.put(key, {'__schema': {'queryType': {'name': 'Cached'}}})
+        second = self.client.get('/graphql/', {'query': self.query})
+        self.assertEqual(second.json()['data'], {'__schema': {'queryType': {'name': 'Cached'}}})
+
+    def test_cache_is_a_bounded_lru(self):
+        with override_settings(GRAPHQL_INTROSPECTION_CACHE_SIZE=2):
+            introspection.put('a', {})
+            introspection.put('b', {})
+            introspection.get('a')
+            introspection.put('c', {})
+        self.assertEqual(list(introspection._results), ['a', 'c'])
+        with override_settings(GRAPHQL_INTROSPECTION_CACHE_SIZE=0):
+            self.assertIsNone(introspection.cache_key(schema.graphql_schema, self.query, None, None))
+
+
+def slow_view(request):
+    time.sleep(0.05)
+    return HttpResponse()
+
+
+class RequestProfilerTests(TestCase):
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.root.cleanup)
+        self.directory = Path(self.root.name) / 'profiles'
+
+    def profiler_settings(self, **options):
+        return override_settings(REQUEST_PROFILER={
+            'ENABLED': True, 'DIRECTORY': str(self.directory), 'INTERVAL_MS': 1, **options,
+        })
+
+    def profile(self, organization='acme'):
+        request = RequestFactory().post('/graphql/')
+        profiling.tag_request(request, 'GetTasks', organization)
+        return profiling.SamplingProfilerMiddleware(slow_view)(request)
+
+    def test_slow_requests_are_captured(self):
+        with self.profiler_settings(THRESHOLD_MS=10):
+            self.profile()
+        [path] = self.directory.glob(f'GetTasks/*-acme{profiling.SUFFIX}')
+        stacks = profiling.read_capture(path)
+        self.assertTrue(any('slow_view' in stack for stack in stacks))
+
+    def test_fast_requests_are_not_captured(self):
+        with self.profiler_settings(THRESHOLD_MS=60_000):
+            self.profile()
+        self.assertFalse(self.directory.exists())
+
+    def test_disabled_by_default(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            profiling.SamplingProfilerMiddleware(slow_view)
+
+    def test_merge_profiles(self):
+        with self.profiler_settings(THRESHOLD_MS=0):
+            self.profile('acme')
+            self.profile('globex')
+            merged = profiling.merge_captures(self.directory)
+            self.assertEqual(list(merged), ['GetTasks'])
+            self.assertEqual(merged['GetTasks'][0], 2)
+            self.assertEqual(profiling.merge_captures(self.directory, organization='globex')['GetTasks'][0], 1)
+            self.assertEqual(profiling.merge_captures(self.directory, operation='GetTask'), {})
+            output = StringIO()
+            call_command('merge_profiles', stdout=output)
+        self.assertIn("GetTasks: 2 capture(s)", output.getvalue())
+        merged_file = Path(self.root.name) / 'profiles-merged' / f'GetTasks{profiling.SUFFIX}'
+        self.assertEqual(profiling.read_capture(merged_file), profiling.merge_captures(self.directory)['GetTasks'][1])
+
+
+class SlowSQLTests(TestCase):
+    def setUp(self):
+        slowsql._stats.clear()
+        self.addCleanup(slowsql._stats.clear)
+        Organization.objects.create(name="Acme", contact_email="ops@acme.test")
+
+    def test_fingerprints_ignore_literals(self):
+        self.assertEqual(
+            slowsql.normalize("SELECT * FROM t WHERE a = 'x' AND b IN (%s, %s, %s) AND c > 10"),
+            "SELECT * FROM t WHERE a = ? AND b IN (...) AND c > ?",
+        )
+        self.assertEqual(
+            slowsql.fingerprint("SELECT 1 FROM t WHERE id IN (%s)")[0],
+            slowsql.fingerprint("SELECT 2 FROM t WHERE id IN (%s, %s)")[0],
+        )
+
+    def test_slow_statements_are_logged_with_their_plan_and_field(self):
+        with override_settings(SLOW_SQL={'THRESHOLD_MS': 0}), \
+                connection.execute_wrapper(slowsql.record_statement), \
+                self.assertLogs('core.slowsql', 'WARNING') as logs:
+            result = schema.execute(
+                'query Orgs { organizations { name } }', middleware=[slowsql.ResolverPathMiddleware()]
+            )
+        self.assertIsNone(result.errors)
+        self.assertIn('operation=Orgs path=organizations', logs.output[0])
+        [entry] = [entry for entry in slowsql._stats.values() if 'organizations_organization' in entry['sql']]
+        self.assertEqual((entry['count'], entry['slow']), (1, 1))
+        self.assertEqual(dict(entry['paths']), {'Orgs organizations': 1})
+        self.assertIn('SCAN', entry['plan'])
+
+    def test_sql_stats_ranks_the_flushed_statements(self):
+        with tempfile.TemporaryDirectory() as directory, \
+                override_settings(SLOW_SQL={'DIRECTORY': directory, 'THRESHOLD_MS': 60_000}):
+            with connection.execute_wrapper(slowsql.record_statement):
+                for _ in range(3):
+                    list(Organization.objects.filter(name="Acme"))
+            slowsql.flush()
+            stats = slowsql.load_stats(directory)
+            [(key, entry)] = [
+                (key, entry) for key, entry in stats.items() if 'organizations_organization' in entry['sql']
+            ]
+            self.assertEqual((entry['count'], entry['slow']), (3, 0))
+            output = StringIO()
+            call_command('sql_stats', sort='count', stdout=output)
+        self.assertTrue(output.getvalue().splitlines()[1].startswith(f'{key}        3 '))
+
+
+class LoadTestTests(TestCase):
+    def test_settings_disable_admission_control_and_use_their_own_database(self):
+        from core import loadtest_settings
+
+        self.assertFalse(loadtest_settings.GRAPHQL_RATE_LIMIT['ENABLED'])
+        self.assertEqual(loadtest_settings.DATABASES['default']['NAME'].name, 'loadtest.sqlite3')
+
+    def test_replayed_operations_succeed_on_the_seeded_data(self):
+        import loadtest
+        from core import loadtest_settings
+
+        operations = loadtest.load_operations()
+        replayed = [name for name, weight in loadtest.WEIGHTS.items() if weight]
+        self.assertLessEqual(set(replayed), set(operations))
+        seed = loadtest.seed_data(2, 8)
+        self.assertEqual((len(seed['projects']), len(seed['tasks'])), (2, 16))
+        # Seeding again reuses the organization.
+        self.assertEqual(loadtest.seed_data(2, 8), seed)
+        with override_settings(GRAPHQL_RATE_LIMIT=loadtest_settings.GRAPHQL_RATE_LIMIT):
+            for name in replayed:
+                kind, document = operations[name]
+                response = self.client.post('/graphql/', json.dumps({
+                    'query': document, 'operationName': name, 'variables': loadtest.VARIABLES[name](seed),
+                }), content_type='application/json')
+                self.assertIsNone(loadtest.classify(response.status_code, response.content, kind), name)
+
+    def test_saturation_is_the_last_stage_that_still_scaled(self):
+        import loadtest
+
+        stages = [
+            {'concurrency': concurrency, 'throughput_rps': rps, 'latency': {'p99_ms': p99}}
+            for concurrency, rps, p99 in ((1, 100, 10), (2, 190, 11), (4, 200, 20), (8, 150, 60))
+        ]
+        self.assertEqual(
+            loadtest.find_saturation(stages), {'concurrency': 2, 'throughput_rps': 190, 'p99_ms': 11}
+        )
+        self.assertIsNone(loadtest.find_saturation(stages[:2]))
+
+
+class SingleFlightTests(TestCase):
+    query = 'query ($slug: String!) { projects(organizationSlug: $slug) { name } }'
+
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+        self.organization = Organization.objects.create(name="Acme", contact_email="ops@acme.test")
+
+    def test_keys_change_with_the_data_version(self):
+        key = singleflight.request_key(self.query, {'slug': 'acme'}, None)
+        self.assertEqual(singleflight.request_key(self.query, {'slug': 'acme'}, None), key)
+        self.assertNotEqual(singleflight.request_key(self.query, {'slug': 'other'}, None), key)
+        bump_organization_version(self.organization.id)
+        self.assertNotEqual(singleflight.request_key(self.query, {'slug': 'acme'}, None), key)
+        self.assertIsNone(singleflight.request_key('mutation { deleteProject(id: "1") { success } }', None, None))
+        self.assertIsNone(singleflight.request_key('', None, None))
+
+    def run_concurrently(self, group, function, callers=4):
+        """Call ``group.do('key', function)`` from ``callers`` threads, the first being the leader."""
+        results = [None] * callers
+
+        def call(index):
+            try:
+                results[index] = group.do('key', function)
+            except Exception as e:
+                results[index] = e
+
+        threads = [threading.Thread(target=call, args=(index,)) for index in range(callers)]
+        threads[0].start()
+        self.started.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        # Let the followers join the leader's call.
+        time.sleep(0.1)
+        self.release.set()
+        for thread in threads:
+            thread.join(5)
+        return results
+
+    def leader_function(self, result):
+        self.started, self.release = threading.Event(), threading.Event()
+        calls = []
+
+        def function():
+            calls.append(1)
+            if len(calls) == 1:
+                self.started.set()
+                self.release.wait(5)
+            if isinstance(result, BaseException):
+                raise result
+            return result
+
+        return function, calls
+
+    def test_concurrent_callers_share_one_execution(self):
+        function, calls = self.leader_function('result')
+        self.assertEqual(self.run_concurrently(singleflight.Group(), function), ['result'] * 4)
+        self.assertEqual(len(calls), 1)
+
+    def test_followers_share_the_leaders_error(self):
+        error = ValueError("boom")
+        function, calls = self.leader_function(error)
+        self.assertEqual(self.run_concurrently(singleflight.Group(), function), [error] * 4)
+        self.assertEqual(len(calls), 1)
+
+    @override_settings(GRAPHQL_SINGLE_FLIGHT={'WAIT_TIMEOUT': 0.01})
+    def test_followers_run_the_query_themselves_after_the_timeout(self):
+        function, calls = self.leader_function('result')
+        self.assertEqual(self.run_concurrently(singleflight.Group(), function), ['result'] * 4)
+        self.assertEqual(len(calls), 4)
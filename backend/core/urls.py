@@ -3,12 +3,14 @@ URL configuration for project management system.
 """
 from django.contrib import admin
 from django.urls import path, include
-from graphene_django.views import GraphQLView
 from django.views.decorators.csrf import csrf_exempt
+from core.metrics import metrics_view
+from core.views import GraphQLView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('graphql/', csrf_exempt(GraphQLView.as_view(graphiql=True))),
     path('api/', include('rest_framework.urls')),
+    path('metrics/', metrics_view),
 ]
 
@@ -0,0 +1,50 @@
+"""
+Data version tokens used to validate HTTP caches (ETags).
+
+Each organization has an opaque version token in the cache backend that
+changes whenever any of its projects, tasks or comments change; a global
+token changes on every write. A token missing from the cache (evicted or
+never set) is simply regenerated, which can only invalidate ETags, never
+validate a stale one.
+"""
+
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+GLOBAL_VERSION_KEY = 'data-version:global'
+VERSION_TIMEOUT = 60 * 60 * 24
+
+
+def _organization_key(organization_id):
+    return f'data-version:organization:{organization_id}'
+
+
+def _get(key):
+    return cache.get_or_set(key, lambda: uuid.uuid4().hex, VERSION_TIMEOUT)
+
+
+def get_global_version():
+    return _get(GLOBAL_VERSION_KEY)
+
+
+def get_organization_version(organization_id):
+    return _get(_organization_key(organization_id))
+
+
+def bump_organization_version(organization_id):
+    """Record that an organization's data (and therefore global data) changed."""
+    updates = {GLOBAL_VERSION_KEY: uuid.uuid4().hex}
+    if organization_id is not None:
+        updates[_organization_key(organization_id)] = uuid.uuid4().hex
+    cache.set_many(updates, VERSION_TIMEOUT)
+
+
+def bump_organization_version_on_commit(organization_id):
+    """
+    Bump after the surrounding transaction commits. Bumping earlier would
+    let a reader tag pre-commit data with the new version.
+    """
+    transaction.on_commit(lambda: bump_organization_version(organization_id))
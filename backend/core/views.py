@@ -0,0 +1,302 @@
+"""
+GraphQL view used for /graphql/.
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseNotModified, StreamingHttpResponse
+from graphene_django.views import GraphQLView as BaseGraphQLView, HttpError
+from graphql import ExecutionResult
+
+from core import conditional, incremental, introspection, profiling, ratelimit, singleflight
+from core.compression import compress_response
+from core.encoding import get_encoder
+from core.loaders import clear_loaders
+from core.ratelimit import parse_query
+
+
+BATCH_DEFAULTS = {
+    'MAX_SIZE': 10,
+    'PARALLEL': False,
+    'MAX_WORKERS': 4,
+}
+
+
+def get_batch_setting(name):
+    return getattr(settings, 'GRAPHQL_BATCH', {}).get(name, BATCH_DEFAULTS[name])
+
+
+def _release_after(chunks, admission):
+    try:
+        yield from chunks
+    finally:
+        admission.release()
+
+
+class GraphQLView(BaseGraphQLView):
+    """
+    graphene-django's GraphQLView with:
+
+    - per-organization and per-IP admission control (core.ratelimit),
+    - ETag / If-None-Match support for GET queries (core.conditional),
+    - a pluggable fast JSON encoder (core.encoding) and negotiated
+      gzip/brotli compression of large responses (core.compression),
+    - batched requests: a POSTed JSON array of operations (as sent by
+      Apollo's BatchHttpLink) is answered with an array of results. The
+      operations share the request, and with it the request-scoped
+      loaders (core.loaders),
+    - @defer / @stream for clients accepting multipart/mixed
+      (core.incremental),
+    - introspection results served from memory (core.introspection).
+    """
+
+    def json_encode(self, request, d, pretty=False):
+        pretty = self.pretty or pretty or bool(request.GET.get('pretty'))
+        return get_encoder().encode(d, pretty=pretty)
+
+    def execute_graphql_request(self, request, data, query, variables, operation_name, show_graphiql=False):
+        key = introspection.cache_key(self.schema.graphql_schema, query, variables, operation_name)
+        if key is None:
+            return self.execute_coalesced(request, data, query, variables, operation_name, show_graphiql)
+        cached = introspection.get(key)
+        if cached is not None:
+            return ExecutionResult(data=cached)
+        result = super().execute_graphql_request(
+            request, data, query, variables, operation_name, show_graphiql
+        )
+        if result is not None and not result.errors:
+            introspection.put(key, result.data)
+        return result
+
+    def execute_coalesced(self, request, data, query, variables, operation_name, show_graphiql):
+        """Execute, sharing the result with identical concurrent queries (core.singleflight)."""
+        def execute():
+            return super(GraphQLView, self).execute_graphql_request(
+                request, data, query, variables, operation_name, show_graphiql
+            )
+
+        key = None
+        if singleflight.get_setting('ENABLED') and not show_graphiql:
+            key = singleflight.request_key(query, variables, operation_name)
+        if key is None:
+            return execute()
+        return singleflight.group.do(key, execute)
+
+    def parse_body(self, request):
+        if self.get_content_type(request) == 'application/json' and request.body.lstrip()[:1] == b'[':
+            try:
+                data = json.loads(request.body.decode('utf-8'))
+            except (TypeError, ValueError):
+                raise HttpError(HttpResponseBadRequest("POST body sent invalid JSON."))
+            if not data:
+                raise HttpError(HttpResponseBadRequest("Received an empty list in the batch request."))
+            max_size = get_batch_setting('MAX_SIZE')
+            if len(data) > max_size:
+                raise HttpError(HttpResponseBadRequest(f"Batch requests are limited to {max_size} operations."))
+            if not all(isinstance(entry, dict) for entry in data):
+                raise HttpError(HttpResponseBadRequest("The received data is not a valid JSON query."))
+            return data
+        return super().parse_body(request)
+
+    def get_operations(self, request, data):
+        """Return [(query, variables, operation_name)] for the request body."""
+        entries = data if isinstance(data, list) else [data]
+        operations = []
+        for entry in entries:
+            query, variables, operation_name, _ = self.get_graphql_params(request, entry)
+            operations.append((query, variables, operation_name))
+        return operations
+
+    def get_batch_entry_response(self, request, entry):
+        """Encoded result of one operation of a batch."""
+        try:
+            result, _ = self.get_response(request, entry)
+        except HttpError as error:
+            result = self.json_encode(request, {'errors': [self.format_error(error)]})
+        return result
+
+    def get_batch_entry_response_in_thread(self, request, entry):
+        try:
+            return self.get_batch_entry_response(request, entry)
+        finally:
+            # Worker threads open their own connections; don't leak them.
+            connection.close()
+
+    def get_batch_response(self, request, data, operations):
+        """
+        Execute every operation of a batch and answer with a JSON array.
+
+        Queries may run in parallel (GRAPHQL_BATCH['PARALLEL']); a batch
+        containing a mutation always runs in order, and loaders are
+        cleared after each mutation so later operations see its writes.
+        """
+        is_query = [
+            bool(query) and conditional.query_operation(query, operation_name) is not None
+            for query, _, operation_name in operations
+        ]
+        workers = min(len(data), get_batch_setting('MAX_WORKERS'))
+        if get_batch_setting('PARALLEL') and all(is_query) and workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(
+                    lambda entry: self.get_batch_entry_response_in_thread(request, entry), data
+                ))
+        else:
+            results = []
+            for entry, query in zip(data, is_query):
+                results.append(self.get_batch_entry_response(request, entry))
+                if not query:
+                    clear_loaders(request)
+        # Per-operation errors are reported in each result, as Apollo's
+        # BatchHttpLink expects, so the batch itself succeeds.
+        return HttpResponse(
+            status=200,
+            content=b'[' + b','.join(results) + b']',
+            content_type='application/json',
+        )
+
+    def wants_incremental_delivery(self, request, operation):
+        query, _, operation_name = operation
+        if (
+            not query
+            or not incremental.get_setting('ENABLED')
+            or not incremental.accepts_multipart(request)
+            or conditional.query_operation(query, operation_name) is None
+        ):
+            return False
+        return incremental.uses_incremental_delivery(parse_query(query))
+
+    def get_incremental_response(self, request, operation):
+        """Streamed multipart/mixed response, or None to execute normally."""
+        query, variables, operation_name = operation
+        payloads = incremental.execute_incrementally(
+            self.schema.graphql_schema,
+            parse_query(query),
+            self.format_error,
+            root_value=self.get_root_value(request),
+            context_value=self.get_context(request),
+            raw_variable_values=variables,
+            operation_name=operation_name,
+            middleware=self.get_middleware(request),
+        )
+        if payloads is None:
+            return None
+        response = StreamingHttpResponse(
+            incremental.multipart_chunks(payloads, lambda payload: self.json_encode(request, payload)),
+            content_type=incremental.CONTENT_TYPE,
+        )
+        response['Cache-Control'] = 'no-cache'
+        return response
+
+    def rate_limited_response(self, request, error):
+        response = HttpResponse(
+            status=429,
+            content=self.json_encode(request, {'errors': [self.format_error(error.as_graphql_error())]}),
+            content_type='application/json',
+        )
+        response['Retry-After'] = str(error.retry_after)
+        return response
+
+    def too_costly_response(self, request, error):
+        # 400 without Retry-After: the same query will never be admitted.
+        return HttpResponse(
+            status=400,
+            content=self.json_encode(request, {'errors': [self.format_error(error.as_graphql_error())]}),
+            content_type='application/json',
+        )
+
+    def not_modified_response(self, etag):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    def get_version_etag(self, request, operations):
+        """Version-based ETag for a single GET query, checked before execution."""
+        if (
+            request.method.lower() != 'get'
+            or len(operations) != 1
+            or not conditional.get_setting('ENABLED')
+            or not conditional.version_short_circuit()
+        ):
+            return None
+        query, variables, operation_name = operations[0]
+        if not query:
+            return None
+        return conditional.version_etag(query, variables, operation_name)
+
+    def finalize_response(self, request, response, etag):
+        """Attach ETags to successful GET responses (or 304 them) and compress."""
+        response = self.apply_etag(request, response, etag)
+        if response.status_code == 200:
+            response = compress_response(request, response)
+        return response
+
+    def apply_etag(self, request, response, etag):
+        if (
+            request.method.lower() != 'get'
+            or response.streaming
+            or response.status_code != 200
+            or not conditional.get_setting('ENABLED')
+            or response.get('Content-Type', '').split(';')[0] != 'application/json'
+        ):
+            return response
+        if etag is None:
+            etag = conditional.body_etag(response.content)
+            if conditional.etag_matches(request, etag):
+                return self.not_modified_response(etag)
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method.lower() not in ('get', 'post'):
+            return super().dispatch(request, *args, **kwargs)
+
+        try:
+            data = self.parse_body(request)
+            if self.graphiql and self.can_display_graphiql(request, data):
+                return super().dispatch(request, *args, **kwargs)
+            operations = self.get_operations(request, data)
+        except HttpError:
+            # Let the base view report malformed requests.
+            return super().dispatch(request, *args, **kwargs)
+        profiling.tag_request(
+            request,
+            '+'.join(name or 'anonymous' for _, _, name in operations),
+            ratelimit.organization_key(request, operations),
+        )
+
+        etag = self.get_version_etag(request, operations)
+        if etag is not None and conditional.etag_matches(request, etag):
+            return self.not_modified_response(etag)
+
+        admission = None
+        if ratelimit.get_setting('ENABLED'):
+            try:
+                admission = ratelimit.admit(request, self.schema.graphql_schema, operations)
+            except ratelimit.QueryTooCostly as error:
+                return self.too_costly_response(request, error)
+            except ratelimit.RateLimited as error:
+                return self.rate_limited_response(request, error)
+        try:
+            response = None
+            if isinstance(data, list):
+                response = self.get_batch_response(request, data, operations)
+            elif self.wants_incremental_delivery(request, operations[0]):
+                response = self.get_incremental_response(request, operations[0])
+            if response is None:
+                response = super().dispatch(request, *args, **kwargs)
+        except BaseException:
+            if admission is not None:
+                admission.release()
+            raise
+        if admission is not None:
+            if response.streaming:
+                # Deferred work runs while the response is consumed.
+                response.streaming_content = _release_after(response.streaming_content, admission)
+            else:
+                admission.release()
+        return self.finalize_response(request, response, etag)
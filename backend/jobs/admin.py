@@ -0,0 +1,26 @@
+from django.contrib import admin
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['name', 'status', 'priority', 'attempts', 'run_at', 'locked_by', 'created_at', 'finished_at']
+    list_filter = ['status']
+    search_fields = ['name', 'last_error']
+    readonly_fields = ['created_at', 'updated_at', 'finished_at', 'locked_by', 'locked_until']
+
+    fieldsets = (
+        ('Job', {
+            'fields': ('name', 'payload', 'status', 'priority')
+        }),
+        ('Execution', {
+            'fields': ('attempts', 'max_attempts', 'run_at', 'locked_by', 'locked_until')
+        }),
+        ('Outcome', {
+            'fields': ('result', 'last_error', 'finished_at')
+        }),
+        ('Timestamps', {
+            'fields': ('created_at', 'updated_at'),
+            'classes': ('collapse',)
+        }),
+    )
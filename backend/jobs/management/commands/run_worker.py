@@ -0,0 +1,75 @@
+import multiprocessing
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs.worker import work
+
+
+def _run_in_thread(stop_event, poll_interval, once):
+    try:
+        work(stop_event=stop_event, poll_interval=poll_interval, once=once)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "Run background job workers."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=1,
+            help="Number of jobs to run in parallel.",
+        )
+        parser.add_argument(
+            '--processes',
+            action='store_true',
+            help="Run each worker in its own process instead of a thread.",
+        )
+        parser.add_argument('--poll-interval', type=float, default=1.0)
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help="Exit once the queue is drained.",
+        )
+
+    def handle(self, *args, **options):
+        concurrency = max(1, options['concurrency'])
+        if options['processes']:
+            # Forked children must not share the parent's DB connection.
+            connections.close_all()
+            context = multiprocessing.get_context('fork')
+            stop_event = context.Event()
+            workers = [
+                context.Process(
+                    target=_run_in_thread,
+                    args=(stop_event, options['poll_interval'], options['once']),
+                )
+                for _ in range(concurrency)
+            ]
+        else:
+            stop_event = threading.Event()
+            workers = [
+                threading.Thread(
+                    target=_run_in_thread,
+                    args=(stop_event, options['poll_interval'], options['once']),
+                )
+                for _ in range(concurrency)
+            ]
+
+        self.stdout.write(
+            f"Starting {concurrency} {'process' if options['processes'] else 'thread'} worker(s)"
+        )
+        for worker in workers:
+            worker.start()
+        try:
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping workers after their current job...")
+            stop_event.set()
+            for worker in workers:
+                worker.join()
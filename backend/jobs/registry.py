@@ -0,0 +1,51 @@
+"""
+Registering job handlers and enqueueing jobs.
+
+Apps declare handlers in a ``jobs.py`` module (autodiscovered by the jobs
+app), e.g.::
+
+    from jobs.registry import job
+
+    @job('organization_stats')
+    def organization_stats(payload):
+        ...
+        return result  # stored on Job.result, must be JSON serializable
+"""
+
+from django.utils import timezone
+
+from .models import Job
+
+
+_handlers = {}
+
+
+def job(name):
+    """Decorator registering ``func(payload)`` as the handler for ``name``."""
+    def decorator(func):
+        _handlers[name] = func
+        return func
+    return decorator
+
+
+def get_handler(name):
+    return _handlers.get(name)
+
+
+def enqueue(name, payload=None, priority=0, run_at=None, max_attempts=3):
+    """
+    Queue a job and return it.
+
+    The row is written in the caller's transaction, so a job enqueued by a
+    mutation only becomes visible to workers once that mutation commits,
+    and disappears with it on rollback.
+    """
+    if name not in _handlers:
+        raise ValueError(f"Unknown job: {name}")
+    return Job.objects.create(
+        name=name,
+        payload=payload or {},
+        priority=priority,
+        run_at=run_at or timezone.now(),
+        max_attempts=max_attempts,
+    )
@@ -0,0 +1,60 @@
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .models import Job
+from .registry import job
+from .worker import claim_job, renew_lease, run_job
+
+
+@job('tests.sleep')
+def sleep(payload):
+    time.sleep(payload['seconds'])
+
+
+class ExpiredLeaseTests(TestCase):
+    def expired(self, attempts):
+        now = timezone.now()
+        return Job.objects.create(
+            name='tests.sleep', payload={'seconds': 0}, status='RUNNING', attempts=attempts,
+            max_attempts=3, run_at=now, locked_by='dead', locked_until=now - timedelta(seconds=1),
+        )
+
+    def test_last_attempt_is_failed_not_reclaimed(self):
+        exhausted = self.expired(attempts=3)
+        self.assertIsNone(claim_job('worker'))
+        exhausted.refresh_from_db()
+        self.assertEqual((exhausted.status, exhausted.locked_by), ('FAILED', ''))
+        self.assertIn('Lease expired', exhausted.last_error)
+        self.assertIsNotNone(exhausted.finished_at)
+
+    def test_earlier_attempt_is_reclaimed(self):
+        retried = self.expired(attempts=2)
+        claimed = claim_job('worker')
+        self.assertEqual(claimed.id, retried.id)
+        self.assertEqual((claimed.attempts, claimed.locked_by), (3, 'worker'))
+
+
+class LeaseRenewalTests(TestCase):
+    def setUp(self):
+        Job.objects.create(name='tests.sleep', payload={'seconds': 0.2}, run_at=timezone.now())
+        self.job = claim_job('worker')
+
+    def test_renew_lease_extends_only_the_holders_lease(self):
+        Job.objects.filter(id=self.job.id).update(locked_until=timezone.now())
+        self.assertTrue(renew_lease(self.job))
+        self.job.refresh_from_db()
+        self.assertGreater(self.job.locked_until, timezone.now() + timedelta(seconds=60))
+        self.job.locked_by = 'someone else'
+        self.assertFalse(renew_lease(self.job))
+
+    @override_settings(JOB_LEASE_SECONDS=0.15)
+    def test_long_handler_renews_its_lease(self):
+        with mock.patch('jobs.worker.renew_lease', return_value=True) as renew:
+            self.assertTrue(run_job(self.job))
+        self.assertGreaterEqual(renew.call_count, 2)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, 'SUCCEEDED')
@@ -0,0 +1,201 @@
+"""
+Claiming and running jobs.
+
+On PostgreSQL a worker claims the next job with
+``SELECT ... FOR UPDATE SKIP LOCKED``, so concurrent workers never block
+on or double-claim a row. SQLite has no row locks; there a worker picks a
+candidate and claims it with a conditional UPDATE (compare-and-set on the
+status/lease), retrying with the next candidate if another worker won.
+
+Claims are leases: a RUNNING job whose ``locked_until`` has passed (its
+worker died) becomes claimable again, and counts as an attempt; one that
+expires on its last attempt is failed instead, so a job that kills its
+worker every time is not retried forever. While a handler runs, a
+heartbeat thread renews the lease every third of JOB_LEASE_SECONDS, so a
+long job keeps it for as long as its worker is alive.
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job
+from .registry import get_handler
+
+
+logger = logging.getLogger(__name__)
+
+
+def _lease_seconds():
+    return getattr(settings, 'JOB_LEASE_SECONDS', 300)
+
+
+def worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+def _claimable(now):
+    return Job.objects.filter(
+        Q(status='QUEUED', run_at__lte=now)
+        | Q(status='RUNNING', locked_until__lt=now, attempts__lt=F('max_attempts'))
+    ).order_by('-priority', 'run_at', 'id')
+
+
+def fail_expired_jobs(now=None):
+    """Fail RUNNING jobs whose lease expired on their last attempt. Returns how many."""
+    now = now or timezone.now()
+    return Job.objects.filter(
+        status='RUNNING', locked_until__lt=now, attempts__gte=F('max_attempts')
+    ).update(
+        status='FAILED',
+        last_error="Lease expired on the last attempt; the worker died or hung",
+        locked_by='',
+        locked_until=None,
+        finished_at=now,
+        updated_at=now,
+    )
+
+
+def _claim_skip_locked(worker, now, lease_until):
+    with transaction.atomic():
+        job = (
+            _claimable(now)
+            .select_for_update(skip_locked=True)
+            .first()
+        )
+        if job is None:
+            return None
+        Job.objects.filter(id=job.id).update(
+            status='RUNNING',
+            locked_by=worker,
+            locked_until=lease_until,
+            attempts=F('attempts') + 1,
+            updated_at=now,
+        )
+    job.refresh_from_db()
+    return job
+
+
+def _claim_with_lease(worker, now, lease_until, candidates=5):
+    for candidate in _claimable(now).values('id', 'status', 'locked_until')[:candidates]:
+        claimed = Job.objects.filter(
+            id=candidate['id'],
+            status=candidate['status'],
+            locked_until=candidate['locked_until'],
+        ).update(
+            status='RUNNING',
+            locked_by=worker,
+            locked_until=lease_until,
+            attempts=F('attempts') + 1,
+            updated_at=now,
+        )
+        if claimed:
+            return Job.objects.get(id=candidate['id'])
+    return None
+
+
+def claim_job(worker):
+    """Claim the next runnable job for ``worker``, or return None."""
+    now = timezone.now()
+    lease_until = now + timedelta(seconds=_lease_seconds())
+    fail_expired_jobs(now)
+    if connection.features.has_select_for_update_skip_locked:
+        return _claim_skip_locked(worker, now, lease_until)
+    return _claim_with_lease(worker, now, lease_until)
+
+
+def renew_lease(job):
+    """Extend a claimed job's lease; False if its worker no longer holds it."""
+    now = timezone.now()
+    return bool(Job.objects.filter(id=job.id, status='RUNNING', locked_by=job.locked_by).update(
+        locked_until=now + timedelta(seconds=_lease_seconds()),
+        updated_at=now,
+    ))
+
+
+def _heartbeat(job, stop_event):
+    try:
+        while not stop_event.wait(_lease_seconds() / 3):
+            try:
+                if not renew_lease(job):
+                    logger.warning("Job %s lost its lease", job)
+                    return
+            except Exception:
+                # E.g. a locked SQLite database; the next beat retries.
+                logger.exception("Renewing the lease of job %s failed", job)
+    finally:
+        # The thread's own database connection.
+        connection.close()
+
+
+def run_job(job):
+    """Run a claimed job and record its outcome, rescheduling failures."""
+    handler = get_handler(job.name)
+    stop_heartbeat = threading.Event()
+    heartbeat = threading.Thread(target=_heartbeat, args=(job, stop_heartbeat), daemon=True)
+    heartbeat.start()
+    try:
+        if handler is None:
+            raise LookupError(f"No handler registered for job {job.name!r}")
+        result = handler(job.payload)
+    except Exception:
+        stop_heartbeat.set()
+        heartbeat.join()
+        now = timezone.now()
+        error = traceback.format_exc()
+        logger.exception("Job %s failed (attempt %s)", job, job.attempts)
+        updates = {'last_error': error, 'locked_by': '', 'locked_until': None, 'updated_at': now}
+        if handler is not None and job.attempts < job.max_attempts:
+            # Exponential backoff: 2, 4, 8 ... seconds.
+            updates.update(status='QUEUED', run_at=now + timedelta(seconds=2 ** job.attempts))
+        else:
+            updates.update(status='FAILED', finished_at=now)
+        Job.objects.filter(id=job.id, locked_by=job.locked_by).update(**updates)
+        return False
+    except BaseException:
+        stop_heartbeat.set()
+        raise
+
+    stop_heartbeat.set()
+    heartbeat.join()
+    now = timezone.now()
+    Job.objects.filter(id=job.id, locked_by=job.locked_by).update(
+        status='SUCCEEDED',
+        result=result,
+        last_error='',
+        locked_by='',
+        locked_until=None,
+        finished_at=now,
+        updated_at=now,
+    )
+    return True
+
+
+def work(stop_event=None, poll_interval=1.0, once=False):
+    """
+    Claim and run jobs until ``stop_event`` is set.
+
+    With ``once`` the loop returns as soon as the queue is empty.
+    """
+    worker = worker_id()
+    while stop_event is None or not stop_event.is_set():
+        close_old_connections()
+        job = claim_job(worker)
+        if job is None:
+            if once:
+                return
+            if stop_event is not None:
+                stop_event.wait(poll_interval)
+            else:
+                time.sleep(poll_interval)
+            continue
+        run_job(job)
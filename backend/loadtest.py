@@ -0,0 +1,449 @@
+#!/usr/bin/env python
+"""
+Load test for the GraphQL endpoint.
+This script replays the frontend's operations (frontend/src/graphql) with a
+read/write mix against a locally started server on seeded data, ramping
+concurrency and reporting throughput, latency percentiles per operation,
+error rates and the saturation point.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from collections import Counter, defaultdict
+from pathlib import Path
+from urllib.parse import urlsplit
+
+BASE_DIR = Path(__file__).parent
+GRAPHQL_DIR = BASE_DIR.parent / 'frontend' / 'src' / 'graphql'
+
+# Add the current directory to Python path
+sys.path.append(str(BASE_DIR))
+
+SEED_SLUG = 'load-test'
+STATUSES = ['TODO', 'IN_PROGRESS', 'REVIEW', 'DONE']
+
+# A stage whose throughput is less than this much above the previous
+# stage's means the server is saturated.
+SATURATION_GAIN = 0.10
+
+# Relative frequency of each operation within reads and within writes.
+WEIGHTS = {
+    'GetOrganizations': 2,
+    'GetOrganization': 2,
+    'GetProjects': 4,
+    'GetProject': 2,
+    'GetTasks': 8,
+    'GetTask': 4,
+    'GetOrganizationStats': 1,
+    'UpdateTaskStatus': 6,
+    'CreateTaskComment': 4,
+    'CreateTask': 2,
+    'CreateProject': 1,
+    'UpdateOrganization': 1,
+    'CreateOrganization': 0,
+}
+
+VARIABLES = {
+    'GetOrganizations': lambda seed: {},
+    'GetOrganization': lambda seed: {'slug': seed['slug']},
+    'GetProjects': lambda seed: {'organizationSlug': seed['slug']},
+    'GetProject': lambda seed: {'id': random.choice(seed['projects'])},
+    'GetTasks': lambda seed: {'projectId': random.choice(seed['projects'])},
+    'GetTask': lambda seed: {'id': random.choice(seed['tasks'])},
+    'GetOrganizationStats': lambda seed: {'organizationSlug': seed['slug']},
+    'UpdateTaskStatus': lambda seed: {'taskId': random.choice(seed['tasks']), 'status': random.choice(STATUSES)},
+    'CreateTaskComment': lambda seed: {
+        'taskId': random.choice(seed['tasks']),
+        'content': 'Load test comment',
+        'authorEmail': 'loadtest@example.com',
+    },
+    'CreateTask': lambda seed: {
+        'projectId': random.choice(seed['projects']),
+        'title': f'Load test task {uuid.uuid4().hex[:8]}',
+        'assigneeEmail': f'user{random.randrange(10)}@example.com',
+    },
+    'CreateProject': lambda seed: {
+        'organizationSlug': seed['slug'],
+        'name': f'Load test project {uuid.uuid4().hex[:8]}',
+    },
+    'UpdateOrganization': lambda seed: {
+        'id': seed['organization'],
+        'name': 'Load Test',
+        'contactEmail': 'loadtest@example.com',
+    },
+    'CreateOrganization': lambda seed: {
+        'name': f'Load test {uuid.uuid4().hex[:8]}',
+        'contactEmail': 'loadtest@example.com',
+    },
+}
+
+
+def load_operations():
+    """Return {operation name: (kind, document)} from the frontend's gql tags."""
+    operations = {}
+    for path in sorted(GRAPHQL_DIR.glob('*.ts')):
+        for document in re.findall(r'gql`(.*?)`', path.read_text(), re.DOTALL):
+            match = re.search(r'\b(query|mutation)\s+(\w+)', document)
+            if match:
+                operations.setdefault(match.group(2), (match.group(1), document.strip()))
+    return operations
+
+
+def seed_data(projects, tasks_per_project):
+    """Create (or reuse) the load-test organization and return its ids."""
+    import django
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+
+    from core.versioning import bump_organization_version_on_commit
+    from organizations.models import Organization
+    from projects.models import Project
+    from tasks.models import Task
+    from tasks.ranking import spread_ranks
+
+    organization, _ = Organization.objects.get_or_create(
+        slug=SEED_SLUG, defaults={'name': 'Load Test', 'contact_email': 'loadtest@example.com'}
+    )
+    for index in range(organization.projects.count(), projects):
+        project = Project.objects.create(organization=organization, name=f'Load test project {index}')
+        ranks = spread_ranks(tasks_per_project)
+        Task.objects.bulk_create([
+            Task(
+                project=project,
+                title=f'Task {number}',
+                description='Seeded by loadtest.py',
+                status=STATUSES[number % len(STATUSES)],
+                assignee_email=f'user{number % 10}@example.com',
+                rank=ranks[number],
+            )
+            for number in range(tasks_per_project)
+        ])
+        bump_organization_version_on_commit(organization.id)
+    project_ids = [str(pk) for pk in organization.projects.values_list('id', flat=True)]
+    task_ids = [str(pk) for pk in Task.objects.filter(project__organization=organization).values_list('id', flat=True)]
+    return {'organization': str(organization.id), 'slug': organization.slug, 'projects': project_ids, 'tasks': task_ids}
+
+
+def server_command(server, address, workers):
+    host, port = address
+    if server == 'runserver':
+        return [sys.executable, 'manage.py', 'runserver', '--noreload', f'{host}:{port}']
+    if server == 'gunicorn':
+        return [
+            sys.executable, '-m', 'gunicorn', 'core.wsgi:application',
+            '--bind', f'{host}:{port}', '--workers', str(workers), '--worker-class', 'gthread', '--threads', '4',
+        ]
+    if server == 'uvicorn':
+        return [
+            sys.executable, '-m', 'uvicorn', 'core.asgi:application',
+            '--host', host, '--port', str(port), '--workers', str(workers), '--log-level', 'warning',
+        ]
+    raise ValueError(server)
+
+
+def start_server(command, address, settings_module, timeout=30):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings_module)
+    process = subprocess.Popen(command, cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited: {process.stderr.read().decode()[-2000:]}")
+        try:
+            socket.create_connection(address, timeout=1).close()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"Server did not start listening on {address[0]}:{address[1]}")
+
+
+class Connection:
+    """Minimal keep-alive HTTP/1.1 client for JSON POSTs."""
+
+    def __init__(self, host, port, path):
+        self.host = host
+        self.port = port
+        self.path = path
+        self.reader = None
+        self.writer = None
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+    async def post(self, payload):
+        body = json.dumps(payload).encode()
+        request = (
+            f'POST {self.path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n'
+            f'Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n'
+        ).encode() + body
+        for attempt in range(2):
+            if self.writer is None:
+                self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+            try:
+                self.writer.write(request)
+                await self.writer.drain()
+                return await self.read_response()
+            except (ConnectionError, asyncio.IncompleteReadError):
+                # The server closed an idle keep-alive connection; reconnect once.
+                await self.close()
+                if attempt:
+                    raise
+
+    async def read_response(self):
+        status_line = await self.reader.readuntil(b'\r\n')
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readuntil(b'\r\n')
+            if line == b'\r\n':
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        if 'content-length' in headers:
+            body = await self.reader.readexactly(int(headers['content-length']))
+        elif headers.get('transfer-encoding') == 'chunked':
+            body = b''
+            while True:
+                size = int((await self.reader.readuntil(b'\r\n')).split(b';')[0], 16)
+                chunk = await self.reader.readexactly(size + 2)
+                if not size:
+                    break
+                body += chunk[:-2]
+        else:
+            body = await self.reader.read()
+            headers['connection'] = 'close'
+        if headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return status, body
+
+
+def classify(status, body, kind):
+    """Return None for a successful response, otherwise a short error kind."""
+    if status != 200:
+        return f'HTTP {status}'
+    try:
+        result = json.loads(body)
+    except ValueError:
+        return 'invalid JSON'
+    if result.get('errors'):
+        return 'GraphQL error'
+    if kind == 'mutation':
+        for payload in (result.get('data') or {}).values():
+            if isinstance(payload, dict) and payload.get('success') is False:
+                return 'success=false'
+    return None
+
+
+def percentile(samples, fraction):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def latency_summary(samples):
+    return {
+        'p50_ms': round(percentile(samples, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(samples, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(samples, 0.99) * 1000, 2),
+    }
+
+
+async def virtual_user(url, operations, reads, writes, write_ratio, seed, deadline, samples, errors):
+    parts = urlsplit(url)
+    connection = Connection(parts.hostname, parts.port or 80, parts.path or '/graphql/')
+    try:
+        while time.monotonic() < deadline:
+            names, weights = writes if writes[0] and random.random() < write_ratio else reads
+            name = random.choices(names, weights)[0]
+            kind, document = operations[name]
+            payload = {'query': document, 'operationName': name, 'variables': VARIABLES[name](seed)}
+            started = time.perf_counter()
+            try:
+                status, body = await connection.post(payload)
+                error = classify(status, body, kind)
+            except (OSError, asyncio.IncompleteReadError) as e:
+                await connection.close()
+                error = type(e).__name__
+            samples[name].append(time.perf_counter() - started)
+            if error:
+                errors[name][error] += 1
+    finally:
+        await connection.close()
+
+
+async def run_stage(url, operations, reads, writes, write_ratio, seed, concurrency, duration):
+    samples = defaultdict(list)
+    errors = defaultdict(Counter)
+    started = time.monotonic()
+    deadline = started + duration
+    await asyncio.gather(*(
+        virtual_user(url, operations, reads, writes, write_ratio, seed, deadline, samples, errors)
+        for _ in range(concurrency)
+    ))
+    elapsed = time.monotonic() - started
+
+    all_samples = [sample for durations in samples.values() for sample in durations]
+    error_kinds = Counter()
+    for kinds in errors.values():
+        error_kinds.update(kinds)
+    total_errors = sum(error_kinds.values())
+    return {
+        'concurrency': concurrency,
+        'duration_s': round(elapsed, 2),
+        'requests': len(all_samples),
+        'throughput_rps': round(len(all_samples) / elapsed, 1),
+        'errors': total_errors,
+        'error_rate': round(total_errors / len(all_samples), 4) if all_samples else 0.0,
+        'error_kinds': dict(error_kinds),
+        'latency': latency_summary(all_samples),
+        'operations': {
+            name: {
+                'requests': len(durations),
+                'errors': sum(errors[name].values()),
+                **latency_summary(durations),
+            }
+            for name, durations in sorted(samples.items())
+        },
+    }
+
+
+def find_saturation(stages):
+    """The last stage before throughput stopped growing by SATURATION_GAIN, or None."""
+    for previous, stage in zip(stages, stages[1:]):
+        if stage['throughput_rps'] < previous['throughput_rps'] * (1 + SATURATION_GAIN):
+            return {
+                'concurrency': previous['concurrency'],
+                'throughput_rps': previous['throughput_rps'],
+                'p99_ms': previous['latency']['p99_ms'],
+            }
+    return None
+
+
+def print_stage(stage):
+    latency = stage['latency']
+    print(
+        f"{stage['concurrency']:>5} users {stage['throughput_rps']:>9.1f} req/s "
+        f"p50 {latency['p50_ms']:>8.1f} ms  p95 {latency['p95_ms']:>8.1f} ms  p99 {latency['p99_ms']:>8.1f} ms  "
+        f"errors {stage['error_rate']:.1%}"
+    )
+
+
+def print_report(report):
+    print("\n📋 Per operation at the highest concurrency")
+    print("=" * 60)
+    last = report['stages'][-1]
+    for name, operation in last['operations'].items():
+        print(
+            f"{name:24} {operation['requests']:>7} req  p50 {operation['p50_ms']:>8.1f}  "
+            f"p95 {operation['p95_ms']:>8.1f}  p99 {operation['p99_ms']:>8.1f} ms  errors {operation['errors']}"
+        )
+    for stage in report['stages']:
+        if stage['error_kinds']:
+            print(f"errors at {stage['concurrency']} users: {stage['error_kinds']}")
+
+    print("\n📈 Saturation")
+    print("=" * 60)
+    saturation = report['saturation']
+    if saturation is None:
+        print("Throughput was still growing at the highest concurrency; add stages.")
+    else:
+        print(
+            f"Throughput levels off after {saturation['concurrency']} concurrent users "
+            f"({saturation['throughput_rps']} req/s, p99 {saturation['p99_ms']} ms)"
+        )
+
+
+async def run(args, operations, seed):
+    def mix(kind):
+        names = [
+            name for name, (operation_kind, _) in operations.items()
+            if operation_kind == kind and name in VARIABLES and WEIGHTS.get(name, 0) > 0
+            and (not args.operations or name in args.operations)
+        ]
+        return names, [WEIGHTS[name] for name in names]
+
+    reads, writes = mix('query'), mix('mutation')
+    print(f"🚦 {len(reads[0])} queries, {len(writes[0])} mutations, {args.write_ratio:.0%} writes -> {args.url}")
+    print("=" * 60)
+    stages = []
+    for concurrency in args.stages:
+        stage = await run_stage(
+            args.url, operations, reads, writes, args.write_ratio, seed, concurrency, args.duration
+        )
+        print_stage(stage)
+        stages.append(stage)
+    return stages
+
+
+def main():
+    """Main load test function."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--server',
+        choices=['runserver', 'gunicorn', 'uvicorn', 'none'],
+        default='runserver',
+        help="Server to start (gunicorn is WSGI, uvicorn is ASGI); none tests --url as is.",
+    )
+    parser.add_argument('--url', default='http://127.0.0.1:8765/graphql/')
+    parser.add_argument('--workers', type=int, default=2, help="gunicorn/uvicorn worker processes")
+    parser.add_argument(
+        '--settings',
+        default='core.loadtest_settings',
+        help="Settings for the seed and the server; the default disables admission control and uses loadtest.sqlite3.",
+    )
+    parser.add_argument('--stages', type=lambda value: [int(n) for n in value.split(',')], default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds per stage")
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    parser.add_argument('--operations', nargs='*', help="only replay these operations")
+    parser.add_argument('--projects', type=int, default=5)
+    parser.add_argument('--tasks', type=int, default=200, help="tasks per seeded project")
+    parser.add_argument('--json', help="write the report to this file")
+    args = parser.parse_args()
+
+    os.environ['DJANGO_SETTINGS_MODULE'] = args.settings
+    operations = load_operations()
+    seed = seed_data(args.projects, args.tasks)
+
+    server = None
+    if args.server != 'none':
+        parts = urlsplit(args.url)
+        address = (parts.hostname, parts.port or 80)
+        server = start_server(server_command(args.server, address, args.workers), address, args.settings)
+    try:
+        stages = asyncio.run(run(args, operations, seed))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    report = {
+        'server': args.server,
+        'settings': args.settings,
+        'workers': args.workers,
+        'write_ratio': args.write_ratio,
+        'stages': stages,
+        'saturation': find_saturation(stages),
+    }
+    print_report(report)
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2))
+        print(f"\nReport written to {args.json}")
+    return True
+
+
+if __name__ == '__main__':
+    main()
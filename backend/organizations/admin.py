@@ -1,4 +1,6 @@
 from django.contrib import admin
+from django.db.models import Count, Q
+from core.paginator import EstimatedCountPaginator
 from .models import Organization
 
 
@@ -9,6 +11,8 @@ class OrganizationAdmin(admin.ModelAdmin):
     search_fields = ['name', 'contact_email']
     prepopulated_fields = {'slug': ('name',)}
     readonly_fields = ['created_at', 'updated_at']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
     fieldsets = (
         ('Basic Information', {
@@ -20,3 +24,24 @@ class OrganizationAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_queryset(self, request):
+        """Annotate project counts so the changelist needs no per-row COUNTs."""
+        # The same projects as Organization.project_count: no templates, and
+        # none pending deletion (hidden by Project's default manager).
+        counted = Q(projects__is_template=False, projects__deleting_at__isnull=True)
+        return super().get_queryset(request).annotate(
+            _project_count=Count('projects', filter=counted),
+            _active_project_count=Count('projects', filter=counted & Q(projects__status='ACTIVE')),
+        )
+
+    @admin.display(description='Project count', ordering='_project_count')
+    def project_count(self, obj):
+        if hasattr(obj, '_project_count'):
+            return obj._project_count
+        return obj.project_count
+
+    @admin.display(description='Active project count', ordering='_active_project_count')
+    def active_project_count(self, obj):
+        if hasattr(obj, '_active_project_count'):
+            return obj._active_project_count
+        return obj.active_project_count
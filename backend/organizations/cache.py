@@ -0,0 +1,112 @@
+"""
+Two-level cache for resolving organizations by slug.
+
+Level one is a small per-process LRU, level two is the configured Django
+cache backend. Entries are invalidated from the Organization save/delete
+signals, so renames and deletes are picked up by every caller.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Organization
+
+
+CACHE_KEY_PREFIX = 'organization-slug'
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class LocalSlugCache:
+    """
+    Thread-safe LRU of slug -> Organization with a short time-to-live.
+
+    The TTL bounds how long another process can keep serving an entry
+    that was invalidated elsewhere, since only the shared cache is
+    cleared across processes.
+    """
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, slug):
+        with self._lock:
+            entry = self._entries.get(slug)
+            if entry is None:
+                return None
+            organization, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[slug]
+                return None
+            self._entries.move_to_end(slug)
+        # Hand out copies so per-request state (e.g. prefetch caches) set on
+        # one instance never leaks into another request.
+        return copy.copy(organization)
+
+    def set(self, slug, organization):
+        with self._lock:
+            self._entries[slug] = (organization, time.monotonic() + self.ttl)
+            self._entries.move_to_end(slug)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, slug):
+        with self._lock:
+            self._entries.pop(slug, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+local_cache = LocalSlugCache(
+    max_size=_setting('ORGANIZATION_SLUG_CACHE_SIZE', 1024),
+    ttl=_setting('ORGANIZATION_SLUG_CACHE_LOCAL_TTL', 30),
+)
+
+
+def _cache_key(slug):
+    return f'{CACHE_KEY_PREFIX}:{slug}'
+
+
+def get_organization_by_slug(slug):
+    """
+    Return the Organization for a slug, consulting both cache levels first.
+
+    Raises Organization.DoesNotExist like Organization.objects.get(), so
+    callers can keep their existing error handling.
+    """
+    organization = local_cache.get(slug)
+    if organization is not None:
+        return organization
+
+    organization = cache.get(_cache_key(slug))
+    if organization is None:
+        organization = Organization.objects.get(slug=slug)
+        cache.set(
+            _cache_key(slug),
+            organization,
+            _setting('ORGANIZATION_SLUG_CACHE_TIMEOUT', 300),
+        )
+
+    local_cache.set(slug, organization)
+    return organization
+
+
+def invalidate_organization_slug(*slugs):
+    """Drop the given slugs from both cache levels."""
+    slugs = [slug for slug in slugs if slug]
+    for slug in slugs:
+        local_cache.delete(slug)
+    if slugs:
+        cache.delete_many([_cache_key(slug) for slug in slugs])
@@ -0,0 +1,160 @@
+"""
+Change log behind the ``changesSince`` delta-sync query.
+
+Every write to an organization, its projects, tasks or comments appends a
+ChangeLogEntry in the writing transaction: signals cover save()/delete(),
+and the writes that bypass them (tasks.updates, tasks.board) call
+record_changes() next to their version bump. Entry ids are the sequence
+clients page through.
+
+Ids are allocated at insert rather than at commit, so a transaction that
+commits late could publish an entry below one a reader has already
+passed. A page therefore stops at the first entry younger than
+SETTLE_SECONDS; writes here are short transactions.
+
+compact() deletes entries older than RETENTION_DAYS and records how far it
+got. A cursor from before that point can no longer be served and gets
+``resyncRequired``: the client refetches and continues from the returned
+cursor.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ChangeLogCompaction, ChangeLogEntry
+
+
+DEFAULTS = {
+    'RETENTION_DAYS': 7,
+    'SETTLE_SECONDS': 2,
+}
+
+COMPACT_JOB = 'compact_change_log'
+
+
+def get_setting(name):
+    return getattr(settings, 'CHANGE_LOG', {}).get(name, DEFAULTS[name])
+
+
+def record_changes(organization_id, model, object_ids, deleted=False):
+    """Log writes to ``object_ids`` of the model named ``model``."""
+    if organization_id is None:
+        return
+    operation = 'DELETE' if deleted else 'UPSERT'
+    ChangeLogEntry.objects.bulk_create([
+        ChangeLogEntry(organization_id=organization_id, model=model, object_id=object_id, operation=operation)
+        for object_id in object_ids
+    ])
+
+
+def record_change(organization_id, instance, deleted=False):
+    record_changes(organization_id, type(instance).__name__, [instance.pk], deleted)
+
+
+def _settled_before():
+    return timezone.now() - timedelta(seconds=get_setting('SETTLE_SECONDS'))
+
+
+def settled_head():
+    """Id of the newest entry old enough to serve; where a resynced client continues."""
+    return (
+        ChangeLogEntry.objects.filter(created_at__lte=_settled_before())
+        .order_by('-id').values_list('id', flat=True).first()
+    ) or compacted_through()
+
+
+def compacted_through():
+    return ChangeLogCompaction.objects.values_list('compacted_through', flat=True).first() or 0
+
+
+def _models():
+    from projects.models import Project
+    from tasks.models import ArchivedTask, ArchivedTaskComment, Task, TaskComment
+    from .models import Organization
+
+    # Model name -> (live model, archive model or None)
+    return {
+        'Organization': (Organization, None),
+        'Project': (Project, None),
+        'Task': (Task, ArchivedTask),
+        'TaskComment': (TaskComment, ArchivedTaskComment),
+    }
+
+
+def _load(model_name, ids):
+    model, archive_model = _models()[model_name]
+    objects = model.objects.in_bulk(ids)
+    missing = [object_id for object_id in ids if object_id not in objects]
+    if missing and archive_model is not None:
+        # Archived tasks and comments are still served, from the archive.
+        objects.update(archive_model.objects.in_bulk(missing))
+    return objects
+
+
+def changes_since(organization_id, cursor, page_size):
+    """
+    Return the organization's changes after ``cursor`` (an entry id, or
+    None for a client without one) as a dict of ``upserts`` ({model name:
+    [objects]}), ``deletes`` ([(model name, id)]), the next ``cursor``,
+    ``has_more`` and ``resync_required``.
+    """
+    result = {'upserts': {}, 'deletes': [], 'has_more': False, 'resync_required': False}
+    if cursor is None or cursor < compacted_through():
+        result.update(cursor=settled_head(), resync_required=True)
+        return result
+
+    settled_before = _settled_before()
+    fetched = ChangeLogEntry.objects.filter(organization_id=organization_id, id__gt=cursor).order_by('id')
+    page = []
+    unsettled = False
+    for entry in fetched[:page_size + 1]:
+        if entry.created_at > settled_before:
+            unsettled = True
+            break
+        page.append(entry)
+    result['has_more'] = len(page) > page_size
+    page = page[:page_size]
+
+    if page:
+        result['cursor'] = page[-1].id
+    elif not unsettled:
+        # Nothing pending for this organization: move up to the head so a
+        # quiet organization's cursor does not fall behind compaction.
+        result['cursor'] = max(cursor, settled_head())
+    else:
+        result['cursor'] = cursor
+
+    # Only the last write to each object matters.
+    latest = {}
+    for entry in page:
+        latest[(entry.model, entry.object_id)] = entry.operation
+    upsert_ids = {}
+    for (model_name, object_id), operation in latest.items():
+        if operation == 'DELETE':
+            result['deletes'].append((model_name, object_id))
+        else:
+            upsert_ids.setdefault(model_name, []).append(object_id)
+    for model_name, ids in upsert_ids.items():
+        objects = _load(model_name, ids)
+        result['upserts'][model_name] = [objects[object_id] for object_id in ids if object_id in objects]
+        # Written and then deleted before this page was read.
+        result['deletes'].extend((model_name, object_id) for object_id in ids if object_id not in objects)
+    return result
+
+
+def compact(older_than=None):
+    """Delete entries created before ``older_than`` (default: RETENTION_DAYS ago). Returns how many."""
+    older_than = older_than or timezone.now() - timedelta(days=get_setting('RETENTION_DAYS'))
+    with transaction.atomic():
+        through = (
+            ChangeLogEntry.objects.filter(created_at__lt=older_than)
+            .order_by('-id').values_list('id', flat=True).first()
+        )
+        if through is None:
+            return 0
+        deleted, _ = ChangeLogEntry.objects.filter(id__lte=through).delete()
+        ChangeLogCompaction.objects.create(compacted_through=through)
+    return deleted
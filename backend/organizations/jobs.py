@@ -0,0 +1,18 @@
+from jobs.registry import job
+
+from .changes import COMPACT_JOB, compact
+from .models import Organization
+from .stats import compute_organization_stats
+
+
+@job('organization_stats')
+def organization_stats(payload):
+    """Recompute an organization's dashboard statistics off the request path."""
+    organization = Organization.objects.get(id=payload['organization_id'])
+    return compute_organization_stats(organization)
+
+
+@job(COMPACT_JOB)
+def compact_change_log(payload):
+    """Delete change log entries past their retention."""
+    return {'deleted': compact()}
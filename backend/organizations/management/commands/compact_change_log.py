@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from organizations.changes import compact
+
+
+class Command(BaseCommand):
+    help = "Delete change log entries older than CHANGE_LOG['RETENTION_DAYS']."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=float,
+            help="Retention overriding CHANGE_LOG['RETENTION_DAYS'].",
+        )
+
+    def handle(self, *args, **options):
+        older_than = timezone.now() - timedelta(days=options['days']) if options['days'] is not None else None
+        deleted = compact(older_than)
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} change log entries"))
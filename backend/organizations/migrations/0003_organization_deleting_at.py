@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("organizations", "0002_change_log"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="organization",
+            name="deleting_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -2,6 +2,17 @@ from django.db import models
 from django.utils.text import slugify
 
 
+class VisibleManager(models.Manager):
+    """
+    Default manager hiding rows marked for deletion (``deleting_at`` set),
+    whose descendants are being removed in the background by
+    tasks.deletion. ``all_objects`` still sees them.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleting_at__isnull=True)
+
+
 class Organization(models.Model):
     """
     Organization model for multi-tenancy.
@@ -10,27 +21,91 @@ class Organization(models.Model):
     name = models.CharField(max_length=100, unique=True)
     slug = models.SlugField(unique=True, blank=True)
     contact_email = models.EmailField()
+    # Set by deleteOrganization; the row goes once its projects are gone.
+    deleting_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = VisibleManager()
+    all_objects = models.Manager()
+
     class Meta:
         ordering = ['name']
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the persisted name/slug so save() can detect renames
+        # and the slug cache can invalidate the previous slug.
+        instance._loaded_name = instance.__dict__.get('name')
+        instance._loaded_slug = instance.__dict__.get('slug')
+        return instance
+
     def save(self, *args, **kwargs):
-        if not self.slug:
+        loaded_name = getattr(self, '_loaded_name', None)
+        loaded_slug = getattr(self, '_loaded_slug', None)
+        renamed = loaded_name is not None and loaded_name != self.name
+        # Regenerate the slug when the name changes, unless the slug was
+        # edited explicitly alongside the rename.
+        if not self.slug or (renamed and self.slug == loaded_slug):
             self.slug = slugify(self.name)
+        self._previous_slug = loaded_slug
         super().save(*args, **kwargs)
+        self._loaded_name = self.name
+        self._loaded_slug = self.slug
 
     @property
     def project_count(self):
         """Return the number of projects in this organization."""
-        return self.projects.count()
+        return self.projects.filter(is_template=False).count()
 
     @property
     def active_project_count(self):
         """Return the number of active projects in this organization."""
-        return self.projects.filter(status='ACTIVE').count()
+        return self.projects.filter(status='ACTIVE', is_template=False).count()
+
+
+class ChangeLogEntry(models.Model):
+    """
+    One write to an organization's data, in commit sequence (``id``).
+    Read by the ``changesSince`` query; see organizations.changes.
+    """
+    OPERATION_CHOICES = [
+        ('UPSERT', 'Upsert'),
+        ('DELETE', 'Delete'),
+    ]
+
+    # Not a foreign key: the log outlives deleted organizations.
+    organization_id = models.BigIntegerField()
+    model = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    operation = models.CharField(max_length=10, choices=OPERATION_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['organization_id', 'id'], name='changelog_feed_idx'),
+            models.Index(fields=['created_at'], name='changelog_compaction_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.id} {self.operation} {self.model} {self.object_id}"
+
+
+class ChangeLogCompaction(models.Model):
+    """
+    A compaction of the change log: entries up to ``compacted_through``
+    are gone, so older cursors must resync.
+    """
+    compacted_through = models.BigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-id']
+
+    def __str__(self):
+        return f"Compacted through #{self.compacted_through}"
@@ -0,0 +1,32 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.versioning import bump_organization_version_on_commit
+
+from .cache import invalidate_organization_slug
+from .changes import record_change
+from .models import Organization
+
+
+def _invalidate_after_commit(*slugs):
+    # Invalidate now and again after commit, so a concurrent reader cannot
+    # repopulate the cache with the pre-commit row in between.
+    invalidate_organization_slug(*slugs)
+    transaction.on_commit(lambda: invalidate_organization_slug(*slugs))
+
+
+@receiver(post_save, sender=Organization)
+def invalidate_slug_on_save(sender, instance, **kwargs):
+    """Drop both the previous and the current slug after an update or rename."""
+    _invalidate_after_commit(getattr(instance, '_previous_slug', None), instance.slug)
+    bump_organization_version_on_commit(instance.id)
+    record_change(instance.id, instance)
+
+
+@receiver(post_delete, sender=Organization)
+def invalidate_slug_on_delete(sender, instance, **kwargs):
+    """Drop the slug of a deleted organization."""
+    _invalidate_after_commit(instance.slug)
+    bump_organization_version_on_commit(instance.id)
+    record_change(instance.id, instance, deleted=True)
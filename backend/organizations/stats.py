@@ -0,0 +1,71 @@
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+
+from projects.models import Project
+from tasks.models import ArchivedTask, Task
+
+
+def compute_organization_stats(organization):
+    """
+    Return the project/task statistics shown on an organization dashboard,
+    in three aggregate queries whatever the number of projects.
+    """
+    projects = Project.objects.filter(organization=organization, is_template=False)
+    project_counts = projects.aggregate(
+        total=Count('id'),
+        active=Count('id', filter=Q(status='ACTIVE')),
+        completed=Count('id', filter=Q(status='COMPLETED')),
+    )
+    total_projects = project_counts['total']
+    active_projects = project_counts['active']
+    completed_projects = project_counts['completed']
+
+    # Like Project.task_relation: archived projects' tasks are in the archive.
+    total_tasks = completed_tasks = 0
+    for model, archived in ((Task, False), (ArchivedTask, True)):
+        task_counts = model.objects.filter(project__in=projects.filter(archived_at__isnull=not archived)).aggregate(
+            total=Count('id'),
+            completed=Count('id', filter=Q(status='DONE')),
+        )
+        total_tasks += task_counts['total']
+        completed_tasks += task_counts['completed']
+
+    completion_rate = 0
+    if total_tasks > 0:
+        completion_rate = round((completed_tasks / total_tasks) * 100, 1)
+
+    return {
+        'total_projects': total_projects,
+        'active_projects': active_projects,
+        'completed_projects': completed_projects,
+        'total_tasks': total_tasks,
+        'completed_tasks': completed_tasks,
+        'completion_rate': completion_rate
+    }
+
+
+def compute_assignee_workload(organization):
+    """
+    Per-assignee task counts by status, open overdue tasks and next due
+    date for an organization, from a single GROUP BY assignee_email.
+    """
+    now = timezone.now()
+    open_tasks = ~Q(status='DONE')
+    status_counts = {
+        status.lower(): Count('id', filter=Q(status=status))
+        for status, _ in Task.TASK_STATUS_CHOICES
+    }
+    return list(
+        Task.objects.filter(
+            project__organization=organization, project__deleting_at__isnull=True, project__is_template=False
+        )
+        .exclude(assignee_email='')
+        .values('assignee_email')
+        .annotate(
+            total=Count('id'),
+            overdue=Count('id', filter=open_tasks & Q(due_date__lt=now)),
+            next_due_date=Min('due_date', filter=open_tasks & Q(due_date__gte=now)),
+            **status_counts,
+        )
+        .order_by('assignee_email')
+    )
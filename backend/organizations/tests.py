@@ -0,0 +1,218 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.schema import schema
+from projects.models import Project
+from tasks.archive import archive_project
+from tasks.models import Task, TaskComment
+from tasks.updates import update_task
+from .cache import LocalSlugCache, get_organization_by_slug, local_cache
+from .changes import compact
+from .models import Organization
+from .stats import compute_assignee_workload, compute_organization_stats
+
+
+class OrganizationSlugCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+        self.organization = Organization.objects.create(name="Acme", contact_email="ops@acme.test")
+
+    def test_lookups_hit_the_local_then_the_shared_cache(self):
+        with self.assertNumQueries(1):
+            first = get_organization_by_slug('acme')
+        with self.assertNumQueries(0):
+            second = get_organization_by_slug('acme')
+        self.assertEqual(second.id, self.organization.id)
+        # Each caller gets its own instance.
+        self.assertIsNot(first, second)
+        local_cache.clear()
+        with self.assertNumQueries(0):
+            get_organization_by_slug('acme')
+
+    def test_rename_invalidates_the_old_and_new_slug(self):
+        get_organization_by_slug('acme')
+        organization = Organization.objects.get(id=self.organization.id)
+        organization.name = "Acme Inc"
+        organization.save()
+        with self.assertRaises(Organization.DoesNotExist):
+            get_organization_by_slug('acme')
+        self.assertEqual(get_organization_by_slug('acme-inc').name, "Acme Inc")
+
+    def test_delete_invalidates_the_slug(self):
+        get_organization_by_slug('acme')
+        Organization.objects.get(id=self.organization.id).delete()
+        with self.assertRaises(Organization.DoesNotExist):
+            get_organization_by_slug('acme')
+
+    def test_local_cache_is_a_bounded_lru_with_a_ttl(self):
+        lru = LocalSlugCache(max_size=2, ttl=30)
+        lru.set('a', self.organization)
+        lru.set('b', self.organization)
+        lru.get('a')
+        lru.set('c', self.organization)
+        self.assertIsNone(lru.get('b'))
+        self.assertIsNotNone(lru.get('a'))
+        expired = LocalSlugCache(max_size=2, ttl=-1)
+        expired.set('a', self.organization)
+        self.assertIsNone(expired.get('a'))
+
+
+class OrganizationStatsTests(TestCase):
+    def setUp(self):
+        self.organization = Organization.objects.create(name="Acme", contact_email="ops@acme.test")
+        for number in range(5):
+            project = Project.objects.create(organization=self.organization, name=f"Project {number}")
+            Task.objects.create(project=project, title="Open")
+            Task.objects.create(project=project, title="Done", status='DONE')
+        done = Project.objects.create(organization=self.organization, name="Shipped", status='COMPLETED')
+        Task.objects.create(project=done, title="Done", status='DONE')
+        archive_project(done)
+        template = Project.objects.create(organization=self.organization, name="Template", is_template=True)
+        Task.objects.create(project=template, title="Step")
+
+    def test_counts_in_constant_queries(self):
+        with self.assertNumQueries(3):
+            stats = compute_organization_stats(self.organization)
+        self.assertEqual(stats, {
+            'total_projects': 6,
+            'active_projects': 5,
+            'completed_projects': 1,
+            'total_tasks': 11,
+            'completed_tasks': 6,
+            'completion_rate': 54.5,
+        })
+
+
+class AssigneeWorkloadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+        self.organization = Organization.objects.create(name="Acme", contact_email="ops@acme.test")
+        project = Project.objects.create(organization=self.organization, name="Launch")
+        now = timezone.now()
+        self.next_due = now + timedelta(days=2)
+        for title, status, due_date in (
+            ("Late", 'TODO', now - timedelta(days=1)),
+            ("Soon", 'REVIEW', self.next_due),
+            ("Later", 'TODO', now + timedelta(days=9)),
+            ("Done", 'DONE', now - timedelta(days=3)),
+        ):
+            Task.objects.create(
+                project=project, title=title, status=status, due_date=due_date, assignee_email="ann@acme.test"
+            )
+        Task.objects.create(project=project, title="Review", assignee_email="bob@acme.test", status='IN_PROGRESS')
+        Task.objects.create(project=project, title="Unassigned")
+        template = Project.objects.create(organization=self.organization, name="Template", is_template=True)
+        Task.objects.create(project=template, title="Step", assignee_email="ann@acme.test")
+        other = Organization.objects.create(name="Other", contact_email="ops@other.test")
+        theirs = Project.objects.create(organization=other, name="Theirs")
+        Task.objects.create(project=theirs, title="Theirs", assignee_email="ann@acme.test")
+
+    def test_workload_in_one_query(self):
+        with self.assertNumQueries(1):
+            workload = compute_assignee_workload(self.organization)
+        self.assertEqual(workload, [
+            {
+                'assignee_email': "ann@acme.test", 'total': 4, 'todo': 2, 'in_progress': 0, 'review': 1, 'done': 1,
+                'overdue': 1, 'next_due_date': self.next_due,
+            },
+            {
+                'assignee_email': "bob@acme.test", 'total': 1, 'todo': 0, 'in_progress': 1, 'review': 0, 'done': 0,
+                'overdue': 0, 'next_due_date': None,
+            },
+        ])
+
+    def test_tasks_by_assignee_pages_without_gaps(self):
+        query = (
+            'query($after: String) { tasksByAssignee(email: "ann@acme.test", organizationSlug: "acme", '
+            'first: 3, after: $after) { edges { node { title } } pageInfo { hasNextPage endCursor } } }'
+        )
+        first = schema.execute(query).data['tasksByAssignee']
+        self.assertTrue(first['pageInfo']['hasNextPage'])
+        after = first['pageInfo']['endCursor']
+        second = schema.execute(query, variable_values={'after': after}).data['tasksByAssignee']
+        self.assertFalse(second['pageInfo']['hasNextPage'])
+        titles = [edge['node']['title'] for page in (first, second) for edge in page['edges']]
+        # Newest first; templates and other organizations are left out.
+        self.assertEqual(titles, ["Done", "Later", "Soon", "Late"])
+
+
+@override_settings(CHANGE_LOG={'SETTLE_SECONDS': 0})
+class ChangesSinceTests(TestCase):
+    query = (
+        'query($cursor: String, $first: Int) { changesSince(organizationSlug: "acme", cursor: $cursor, first: $first) '
+        '{ projects { name } tasks { title status } comments { content } deleted { typename id } '
+        'cursor hasMore resyncRequired } }'
+    )
+
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+        self.organization = Organization.objects.create(name="Acme", contact_email="ops@acme.test")
+        self.project = Project.objects.create(organization=self.organization, name="Launch")
+        self.task = Task.objects.create(project=self.project, title="Ship")
+
+    def changes(self, cursor=None, first=None):
+        result = schema.execute(self.query, variable_values={'cursor': cursor, 'first': first})
+        self.assertIsNone(result.errors)
+        return result.data['changesSince']
+
+    def test_clients_without_a_cursor_resync_from_the_head(self):
+        changes = self.changes()
+        self.assertTrue(changes['resyncRequired'])
+        self.assertEqual(self.changes(changes['cursor']), {
+            'projects': [], 'tasks': [], 'comments': [], 'deleted': [],
+            'cursor': changes['cursor'], 'hasMore': False, 'resyncRequired': False,
+        })
+
+    def test_only_the_latest_write_to_each_record_is_returned(self):
+        cursor = self.changes()['cursor']
+        update_task(self.task.id, status='IN_PROGRESS')
+        update_task(self.task.id, status='DONE')
+        TaskComment.objects.create(task=self.task, content="Shipped", author_email="a@acme.test")
+        gone = Task.objects.create(project=self.project, title="Gone")
+        gone_id = gone.id
+        gone.delete()
+        # Writes to other organizations are not included.
+        other = Organization.objects.create(name="Other", contact_email="ops@other.test")
+        Project.objects.create(organization=other, name="Theirs")
+
+        changes = self.changes(cursor)
+        self.assertEqual(changes['tasks'], [{'title': "Ship", 'status': 'DONE'}])
+        self.assertEqual(changes['comments'], [{'content': "Shipped"}])
+        self.assertEqual(changes['deleted'], [{'typename': 'TaskType', 'id': str(gone_id)}])
+        self.assertFalse(changes['hasMore'])
+        self.assertEqual(self.changes(changes['cursor'])['tasks'], [])
+
+    def test_pages_through_the_log(self):
+        cursor = self.changes()['cursor']
+        for title in ("A", "B", "C"):
+            Task.objects.create(project=self.project, title=title)
+        titles = []
+        while True:
+            changes = self.changes(cursor, first=2)
+            titles += [task['title'] for task in changes['tasks']]
+            cursor = changes['cursor']
+            if not changes['hasMore']:
+                break
+        self.assertEqual(titles, ["A", "B", "C"])
+
+    def test_unsettled_entries_wait(self):
+        cursor = self.changes()['cursor']
+        Task.objects.create(project=self.project, title="Fresh")
+        with override_settings(CHANGE_LOG={'SETTLE_SECONDS': 60}):
+            changes = self.changes(cursor)
+        self.assertEqual((changes['tasks'], changes['cursor']), ([], cursor))
+        self.assertEqual(self.changes(cursor)['tasks'], [{'title': "Fresh", 'status': 'TODO'}])
+
+    def test_compacted_cursors_must_resync(self):
+        cursor = self.changes()['cursor']
+        Task.objects.create(project=self.project, title="Fresh")
+        self.assertGreater(compact(timezone.now() + timedelta(seconds=1)), 0)
+        changes = self.changes(cursor)
+        self.assertTrue(changes['resyncRequired'])
+        self.assertFalse(self.changes(changes['cursor'])['resyncRequired'])
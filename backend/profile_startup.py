@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+"""
+Startup profile for the Django process.
+This script measures cold start in a fresh interpreter: settings,
+django.setup() per app, the URLconf, building the GraphQL schema and the
+first introspection query, plus import time per package and module.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent
+
+# Runs in the child interpreter started with -X importtime. Timings go to
+# stdout as JSON; the import log goes to stderr.
+CHILD = r'''
+import json, time
+from collections import defaultdict
+
+phases = []
+app_times = defaultdict(float)
+start = time.perf_counter()
+
+def phase(name, since):
+    now = time.perf_counter()
+    phases.append((name, now - since))
+    return now
+
+t = time.perf_counter()
+import django
+from django.conf import settings
+settings.INSTALLED_APPS
+t = phase('settings', t)
+
+from django.apps import config
+
+original_create = config.AppConfig.create.__func__
+
+def create(cls, entry):
+    began = time.perf_counter()
+    app_config = original_create(cls, entry)
+    app_times[f'{app_config.name} (import)'] += time.perf_counter() - began
+    for method in ('import_models', 'ready'):
+        bound = getattr(app_config, method)
+
+        def timed(bound=bound, key=f'{app_config.name} ({method})'):
+            began = time.perf_counter()
+            bound()
+            app_times[key] += time.perf_counter() - began
+
+        setattr(app_config, method, timed)
+    return app_config
+
+config.AppConfig.create = classmethod(create)
+django.setup()
+t = phase('django.setup()', t)
+
+from django.urls import get_resolver
+get_resolver().url_patterns
+t = phase('URLconf', t)
+
+from graphene_django.settings import graphene_settings
+schema = graphene_settings.SCHEMA
+t = phase('GraphQL schema', t)
+
+from graphql import get_introspection_query
+schema.execute(get_introspection_query())
+t = phase('first introspection', t)
+
+phases.append(('total', time.perf_counter() - start))
+print(json.dumps({'phases': phases, 'apps': sorted(app_times.items(), key=lambda item: -item[1])}))
+'''
+
+
+def parse_importtime(log):
+    """Return [(module, self_us, cumulative_us, depth)] from -X importtime output."""
+    modules = []
+    for line in log.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_part, cumulative_part, name = line.split('|', 2)
+        self_us = int(self_part.split(':')[1])
+        cumulative_us = int(cumulative_part)
+        name = name[1:]
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append((name.strip(), self_us, cumulative_us, depth))
+    return modules
+
+
+def run_child(settings_module):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings_module)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD],
+        cwd=BASE_DIR, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        print(result.stderr[-2000:])
+        sys.exit(result.returncode)
+    return json.loads(result.stdout.strip().splitlines()[-1]), parse_importtime(result.stderr)
+
+
+def main():
+    """Main profiling function."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--settings', default='core.settings')
+    parser.add_argument('--limit', type=int, default=15, help='rows per table')
+    args = parser.parse_args()
+
+    timings, modules = run_child(args.settings)
+
+    print("🚀 Startup phases")
+    print("=" * 60)
+    for name, seconds in timings['phases']:
+        print(f"{name:40} {seconds * 1000:8.1f} ms")
+
+    print("\n📦 django.setup() per app")
+    print("=" * 60)
+    for name, seconds in timings['apps'][:args.limit]:
+        print(f"{name:40} {seconds * 1000:8.1f} ms")
+
+    packages = defaultdict(int)
+    for name, self_us, _, _ in modules:
+        packages[name.split('.')[0]] += self_us
+    print("\n📚 Import time per top-level package (self time)")
+    print("=" * 60)
+    for name, micros in sorted(packages.items(), key=lambda item: -item[1])[:args.limit]:
+        print(f"{name:40} {micros / 1000:8.1f} ms")
+
+    print("\n🐢 Slowest imports (cumulative, outermost first)")
+    print("=" * 60)
+    for name, _, cumulative_us, depth in sorted(modules, key=lambda item: -item[2])[:args.limit]:
+        print(f"{'  ' * min(depth, 4) + name:50} {cumulative_us / 1000:8.1f} ms")
+
+    return True
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,24 @@
 from django.contrib import admin
+from django.db.models import Case, Count, ExpressionWrapper, F, FloatField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from core.paginator import EstimatedCountPaginator
+from tasks.models import ArchivedTask, Task
 from .models import Project
 
 
+def _task_count(**filters):
+    """Count of the project's tasks, read from the table Project.task_relation reads."""
+    def count(task_model):
+        return Coalesce(Subquery(
+            task_model.objects.filter(project=OuterRef('pk'), **filters)
+            .order_by().values('project').annotate(count=Count('id')).values('count')
+        ), 0)
+    return Case(
+        When(archived_at__isnull=True, then=count(Task)),
+        default=count(ArchivedTask),
+    )
+
+
 @admin.register(Project)
 class ProjectAdmin(admin.ModelAdmin):
     list_display = [
@@ -12,6 +29,8 @@ class ProjectAdmin(admin.ModelAdmin):
     search_fields = ['name', 'description', 'organization__name']
     list_select_related = ['organization']
     readonly_fields = ['created_at', 'updated_at', 'task_count', 'completion_rate']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
     fieldsets = (
         ('Basic Information', {
@@ -30,3 +49,30 @@ class ProjectAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_queryset(self, request):
+        """Annotate task statistics so the changelist needs no per-row COUNTs."""
+        return super().get_queryset(request).annotate(
+            _task_count=_task_count(),
+            _completed_task_count=_task_count(status='DONE'),
+        ).annotate(
+            _completion_rate=Case(
+                When(_task_count=0, then=Value(0.0)),
+                default=ExpressionWrapper(
+                    100.0 * F('_completed_task_count') / F('_task_count'),
+                    output_field=FloatField(),
+                ),
+                output_field=FloatField(),
+            )
+        )
+
+    @admin.display(description='Task count', ordering='_task_count')
+    def task_count(self, obj):
+        if hasattr(obj, '_task_count'):
+            return obj._task_count
+        return obj.task_count
+
+    @admin.display(description='Completion rate', ordering='_completion_rate')
+    def completion_rate(self, obj):
+        if hasattr(obj, '_completion_rate'):
+            return round(obj._completion_rate, 1)
+        return obj.completion_rate
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="project",
+            name="archived_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0003_project_deleting_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="project",
+            name="is_template",
+            field=models.BooleanField(default=False),
+        ),
+    ]
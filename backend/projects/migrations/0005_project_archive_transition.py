@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0004_project_is_template"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="project",
+            name="archive_transition",
+            field=models.CharField(
+                blank=True,
+                choices=[("ARCHIVING", "Archiving"), ("RESTORING", "Restoring")],
+                default="",
+                max_length=20,
+            ),
+        ),
+    ]
@@ -1,5 +1,5 @@
 from django.db import models
-from organizations.models import Organization
+from organizations.models import Organization, VisibleManager
 
 
 class Project(models.Model):
@@ -12,6 +12,10 @@ class Project(models.Model):
         ('ON_HOLD', 'On Hold'),
         ('CANCELLED', 'Cancelled'),
     ]
+    ARCHIVE_TRANSITION_CHOICES = [
+        ('ARCHIVING', 'Archiving'),
+        ('RESTORING', 'Restoring'),
+    ]
 
     organization = models.ForeignKey(
         Organization, 
@@ -26,9 +30,25 @@ class Project(models.Model):
         default='ACTIVE'
     )
     due_date = models.DateField(null=True, blank=True)
+    archived_at = models.DateTimeField(null=True, blank=True)
+    # Set while tasks.archive moves the tasks between the live and archive
+    # tables, batch by batch; task writes are refused meanwhile.
+    archive_transition = models.CharField(
+        max_length=20,
+        choices=ARCHIVE_TRANSITION_CHOICES,
+        blank=True,
+        default=''
+    )
+    # Templates are only listed by projectTemplates and copied by cloneProject.
+    is_template = models.BooleanField(default=False)
+    # Set by deleteProject/deleteOrganization; see tasks.deletion.
+    deleting_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = VisibleManager()
+    all_objects = models.Manager()
+
     class Meta:
         ordering = ['-created_at']
         unique_together = ['organization', 'name']
@@ -36,15 +56,30 @@ class Project(models.Model):
     def __str__(self):
         return f"{self.name} - {self.organization.name}"
 
+    @property
+    def is_archived(self):
+        """Whether this project's tasks live in the archive tables."""
+        return self.archived_at is not None
+
+    @property
+    def is_moving_tasks(self):
+        """Whether tasks.archive is moving this project's tasks between tables."""
+        return bool(self.archive_transition)
+
+    @property
+    def task_relation(self):
+        """Return the manager for this project's tasks, live or archived."""
+        return self.archived_tasks if self.is_archived else self.tasks
+
     @property
     def task_count(self):
         """Return the number of tasks in this project."""
-        return self.tasks.count()
+        return self.task_relation.count()
 
     @property
     def completed_task_count(self):
         """Return the number of completed tasks in this project."""
-        return self.tasks.filter(status='DONE').count()
+        return self.task_relation.filter(status='DONE').count()
 
     @property
     def completion_rate(self):
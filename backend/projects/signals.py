@@ -0,0 +1,15 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.versioning import bump_organization_version_on_commit
+from organizations.changes import record_change
+
+from .models import Project
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def bump_version_on_project_change(sender, instance, signal, **kwargs):
+    """Invalidate cached responses of the project's organization and log the change."""
+    bump_organization_version_on_commit(instance.organization_id)
+    record_change(instance.organization_id, instance, deleted=signal is post_delete)
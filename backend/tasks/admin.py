@@ -1,4 +1,6 @@
 from django.contrib import admin
+from django.db.models import Count
+from core.paginator import EstimatedCountPaginator
 from .models import Task, TaskComment
 
 
@@ -12,6 +14,8 @@ class TaskAdmin(admin.ModelAdmin):
     search_fields = ['title', 'description', 'assignee_email', 'project__name']
     list_select_related = ['project', 'project__organization']
     readonly_fields = ['created_at', 'updated_at', 'comment_count']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
     fieldsets = (
         ('Basic Information', {
@@ -30,6 +34,16 @@ class TaskAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_queryset(self, request):
+        """Annotate comment counts so the changelist needs no per-row COUNTs."""
+        return super().get_queryset(request).annotate(_comment_count=Count('comments'))
+
+    @admin.display(description='Comment count', ordering='_comment_count')
+    def comment_count(self, obj):
+        if hasattr(obj, '_comment_count'):
+            return obj._comment_count
+        return obj.comment_count
+
 
 @admin.register(TaskComment)
 class TaskCommentAdmin(admin.ModelAdmin):
@@ -38,6 +52,8 @@ class TaskCommentAdmin(admin.ModelAdmin):
     search_fields = ['content', 'author_email', 'task__title']
     list_select_related = ['task', 'task__project', 'task__project__organization']
     readonly_fields = ['timestamp']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
     fieldsets = (
         ('Comment Information', {
@@ -0,0 +1,179 @@
+"""
+Moving tasks of finished projects between the live and archive tables.
+
+Rows are copied with ``INSERT ... SELECT`` (keeping their ids, and the
+tasks' labels) and then deleted from the source table, one batch of tasks
+per transaction, so locks are held only briefly and the hot tables stay
+sized to active work. While the batches move, the project's
+``archive_transition`` is set and task writes are refused, so none lands in
+the table being emptied. Dependencies link tasks of different batches, so a
+project's dependencies move all at once: into the archive with the first
+batch, back out with the last.
+"""
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.versioning import bump_organization_version_on_commit
+from organizations.changes import record_changes
+from projects.models import Project
+from .dependencies import dependency_model
+from .labels import link_model
+from .models import ArchivedTask, ArchivedTaskComment, Task, TaskComment, TaskReminder
+
+
+ARCHIVABLE_STATUSES = ('COMPLETED', 'CANCELLED')
+DEFAULT_BATCH_SIZE = 500
+
+
+def _columns(model):
+    return ', '.join(
+        connection.ops.quote_name(field.column) for field in model._meta.concrete_fields
+    )
+
+
+def _move_batch(project_id, task_model, comment_model, target_task_model,
+                target_comment_model, batch_size):
+    """Move one batch of a project's tasks and their comments. Returns the task count."""
+    quote = connection.ops.quote_name
+    task_ids = list(
+        task_model.objects.filter(project_id=project_id)
+        .order_by('id')
+        .values_list('id', flat=True)[:batch_size]
+    )
+    if not task_ids:
+        return 0
+
+    placeholders = ', '.join(['%s'] * len(task_ids))
+    task_columns = _columns(task_model)
+    comment_columns = _columns(comment_model)
+    label_table = quote(link_model(task_model)._meta.db_table)
+    target_label_table = quote(link_model(target_task_model)._meta.db_table)
+    label_columns = f'{quote("task_id")}, {quote("label_id")}'
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {quote(target_task_model._meta.db_table)} ({task_columns}) '
+            f'SELECT {task_columns} FROM {quote(task_model._meta.db_table)} '
+            f'WHERE {quote("id")} IN ({placeholders})',
+            task_ids,
+        )
+        cursor.execute(
+            f'INSERT INTO {quote(target_comment_model._meta.db_table)} ({comment_columns}) '
+            f'SELECT {comment_columns} FROM {quote(comment_model._meta.db_table)} '
+            f'WHERE {quote("task_id")} IN ({placeholders})',
+            task_ids,
+        )
+        cursor.execute(
+            f'DELETE FROM {quote(comment_model._meta.db_table)} '
+            f'WHERE {quote("task_id")} IN ({placeholders})',
+            task_ids,
+        )
+        cursor.execute(
+            f'INSERT INTO {target_label_table} ({label_columns}) '
+            f'SELECT {label_columns} FROM {label_table} '
+            f'WHERE {quote("task_id")} IN ({placeholders})',
+            task_ids,
+        )
+        cursor.execute(
+            f'DELETE FROM {label_table} WHERE {quote("task_id")} IN ({placeholders})',
+            task_ids,
+        )
+        if task_model is Task:
+            # Reminders are not archived; the tasks are no longer due.
+            cursor.execute(
+                f'DELETE FROM {quote(TaskReminder._meta.db_table)} '
+                f'WHERE {quote("task_id")} IN ({placeholders})',
+                task_ids,
+            )
+        cursor.execute(
+            f'DELETE FROM {quote(task_model._meta.db_table)} '
+            f'WHERE {quote("id")} IN ({placeholders})',
+            task_ids,
+        )
+    return len(task_ids)
+
+
+def _move_dependencies(project_id, source_model, target_model):
+    """Move all dependencies of a project's tasks, which must be in the live table."""
+    quote = connection.ops.quote_name
+    source_table = quote(source_model._meta.db_table)
+    columns = f'{quote("task_id")}, {quote("depends_on_id")}'
+    # Both ends are tasks of the project, so selecting by one end is enough.
+    condition = (
+        f'{quote("task_id")} IN (SELECT {quote("id")} FROM {quote(Task._meta.db_table)} '
+        f'WHERE {quote("project_id")} = %s)'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {quote(target_model._meta.db_table)} ({columns}) '
+            f'SELECT {columns} FROM {source_table} WHERE {condition}',
+            [project_id],
+        )
+        cursor.execute(f'DELETE FROM {source_table} WHERE {condition}', [project_id])
+
+
+def archive_project(project, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Move a project's tasks and comments into the archive tables.
+
+    The project is flagged archived in the same transaction as the last
+    batch, after which resolvers read it from the archive.
+    """
+    Project.objects.filter(id=project.id).update(archive_transition='ARCHIVING')
+    project.archive_transition = 'ARCHIVING'
+    moved = 0
+    while True:
+        with transaction.atomic():
+            if not moved:
+                _move_dependencies(project.id, dependency_model(Task), dependency_model(ArchivedTask))
+            count = _move_batch(
+                project.id, Task, TaskComment, ArchivedTask, ArchivedTaskComment, batch_size
+            )
+            moved += count
+            if count < batch_size:
+                project.archived_at, project.archive_transition = timezone.now(), ''
+                Project.objects.filter(id=project.id).update(archived_at=project.archived_at, archive_transition='')
+                bump_organization_version_on_commit(project.organization_id)
+                record_changes(project.organization_id, 'Project', [project.id])
+                return moved
+
+
+def unarchive_project(project, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Move an archived project's tasks and comments back into the live tables.
+
+    The project is flagged live before the first batch so readers see its
+    tasks reappear in the hot tables; task writes are refused until the
+    last batch.
+    """
+    with transaction.atomic():
+        Project.objects.filter(id=project.id).update(archived_at=None, archive_transition='RESTORING')
+        record_changes(project.organization_id, 'Project', [project.id])
+    project.archived_at, project.archive_transition = None, 'RESTORING'
+    moved = 0
+    while True:
+        with transaction.atomic():
+            count = _move_batch(
+                project.id, ArchivedTask, ArchivedTaskComment, Task, TaskComment, batch_size
+            )
+            if count < batch_size:
+                _move_dependencies(project.id, dependency_model(ArchivedTask), dependency_model(Task))
+                Project.objects.filter(id=project.id).update(archive_transition='')
+                project.archive_transition = ''
+                bump_organization_version_on_commit(project.organization_id)
+        moved += count
+        if count < batch_size:
+            return moved
+
+
+def archivable_projects(older_than):
+    """
+    Live projects finished (completed/cancelled) and untouched since
+    ``older_than``, including any whose archiving was interrupted.
+    """
+    return Project.objects.filter(
+        status__in=ARCHIVABLE_STATUSES,
+        archived_at__isnull=True,
+        archive_transition__in=['', 'ARCHIVING'],
+        updated_at__lt=older_than,
+    )
@@ -0,0 +1,114 @@
+"""
+Kanban board ordering.
+
+Tasks are ordered within their (project, status) column by ``rank``
+(tasks/ranking.py). Moving a task computes a rank between its new
+neighbours and updates that one row. When keys grow long, after moves or
+after many tasks were added to the top of a column (tasks.signals), a
+background job renumbers the column.
+"""
+
+from django.db import transaction
+
+from core.versioning import bump_organization_version_on_commit
+from jobs.models import Job
+from jobs.registry import enqueue
+from organizations.changes import record_changes
+from .models import Task
+from .ranking import rank_between, spread_ranks
+from .signals import organization_id_for_project
+from .updates import update_task
+
+
+# Columns get renumbered once a rank grows beyond this many digits
+MAX_RANK_LENGTH = 24
+REBALANCE_JOB = 'rebalance_task_ranks'
+
+
+class InvalidMove(Exception):
+    pass
+
+
+def column(project_id, status):
+    """Tasks of one board column, in board order."""
+    return Task.objects.filter(project_id=project_id, status=status).order_by('rank', 'id')
+
+
+def _neighbour_rank(project_id, status, task_id, rank, below):
+    """Rank of the task next to ``rank`` in a column (ignoring the moved task)."""
+    tasks = column(project_id, status).exclude(id=task_id)
+    if below:
+        tasks = tasks.filter(rank__gt=rank) if rank else tasks
+    else:
+        tasks = tasks.filter(rank__lt=rank).reverse()
+    return tasks.values_list('rank', flat=True).first()
+
+
+def move_task(task_id, status, before_id=None, after_id=None, expected_version=None):
+    """
+    Move a task into ``status`` between two tasks of that column and
+    return it. ``before_id`` is the task that should come right before
+    (above) it and ``after_id`` the one right after (below); with neither
+    the task goes to the top. Raises Task.DoesNotExist, InvalidMove or
+    tasks.updates.TaskConflict.
+    """
+    task_id = Task._meta.pk.to_python(task_id)
+    ids = {task_id}
+    for neighbour_id in (before_id, after_id):
+        if neighbour_id is not None:
+            ids.add(Task._meta.pk.to_python(neighbour_id))
+    rows = {
+        row[0]: row
+        for row in Task.objects.filter(id__in=ids).values_list('id', 'project_id', 'status', 'rank')
+    }
+    if task_id not in rows:
+        raise Task.DoesNotExist("Task not found")
+    project_id = rows[task_id][1]
+
+    def neighbour(neighbour_id):
+        if neighbour_id is None:
+            return None
+        row = rows.get(Task._meta.pk.to_python(neighbour_id))
+        if row is None or row[1] != project_id or row[2] != status or row[0] == task_id:
+            raise InvalidMove(f"Task {neighbour_id} is not in the {status} column")
+        return row[3]
+
+    lower = neighbour(before_id)
+    upper = neighbour(after_id)
+    if after_id is None:
+        upper = _neighbour_rank(project_id, status, task_id, lower, below=True)
+    elif before_id is None:
+        lower = _neighbour_rank(project_id, status, task_id, upper, below=False)
+
+    if lower is not None and upper is not None and lower > upper:
+        raise InvalidMove(f"Task {before_id} does not come before task {after_id}")
+    if lower is not None and lower == upper:
+        # Concurrent moves gave both neighbours the same rank.
+        schedule_rebalance(project_id, status)
+        raise InvalidMove("The column is being reordered, please retry")
+    rank = rank_between(lower, upper)
+
+    task = update_task(task_id, expected_version, status=status, rank=rank)
+    if len(rank) > MAX_RANK_LENGTH:
+        schedule_rebalance(project_id, status)
+    return task
+
+
+def schedule_rebalance(project_id, status):
+    payload = {'project_id': project_id, 'status': status}
+    if not Job.objects.filter(name=REBALANCE_JOB, status='QUEUED', payload=payload).exists():
+        enqueue(REBALANCE_JOB, payload)
+
+
+def rebalance_column(project_id, status):
+    """Give a column short, evenly spaced ranks, keeping its order."""
+    with transaction.atomic():
+        tasks = list(column(project_id, status).select_for_update().only('id', 'rank'))
+        for task, rank in zip(tasks, spread_ranks(len(tasks))):
+            task.rank = rank
+        Task.objects.bulk_update(tasks, ['rank'], batch_size=500)
+        # bulk_update() bypasses post_save.
+        organization_id = organization_id_for_project(project_id)
+        bump_organization_version_on_commit(organization_id)
+        record_changes(organization_id, 'Task', [task.id for task in tasks])
+    return len(tasks)
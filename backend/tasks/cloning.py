@@ -0,0 +1,172 @@
+"""
+Copying a project with its tasks and, optionally, their comments.
+
+Teams start projects from a standard checklist of hundreds of tasks, so a
+copy is a few set-based ``INSERT ... SELECT`` statements in one
+transaction instead of a save() per row. The SELECTs are built with the
+ORM, so expressions such as the due-date shift compile for each backend.
+Copied comments, labels and dependencies find their new tasks by title,
+which ``unique_together`` makes unique within a project. Labels belong to an
+organization, so a copy into another one uses its labels of the same
+names, creating those it lacks.
+
+Project templates are projects flagged ``is_template``: cloning with
+``as_template`` saves one, and cloning a template starts a project from it.
+"""
+
+import re
+from datetime import timedelta
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import DateTimeField, F, OuterRef, Subquery, Value
+from django.utils import timezone
+
+from organizations.models import ChangeLogEntry
+from projects.models import Project
+from .dependencies import dependency_model
+from .labels import link_model
+from .models import Label, Task, TaskComment, TaskDependency, TaskLabel
+from .updates import ProjectArchiving
+
+
+# Attempts at a free name when concurrent clones take the same one
+NAME_ATTEMPTS = 5
+
+# " (2)" etc. appended to a taken name
+NAME_SUFFIX = re.compile(r' \(\d+\)$')
+
+
+def _insert_select(model, queryset, values):
+    """
+    Insert one ``model`` row per row of ``queryset``, with ``values``
+    mapping ``model`` field names to expressions over the queryset.
+    Returns the number of rows inserted.
+    """
+    quote = connection.ops.quote_name
+    aliases = {f'copy_{name}': expression for name, expression in values.items()}
+    sql, params = (
+        queryset.order_by().annotate(**aliases).values_list(*aliases).query.sql_with_params()
+    )
+    columns = ', '.join(quote(model._meta.get_field(name).column) for name in values)
+    with connection.cursor() as cursor:
+        cursor.execute(f'INSERT INTO {quote(model._meta.db_table)} ({columns}) {sql}', params)
+        return cursor.rowcount
+
+
+def _log_inserted(organization_id, model_name, queryset, now):
+    # The rows bypassed save(), so log them as the signals would.
+    _insert_select(ChangeLogEntry, queryset, {
+        'organization_id': Value(organization_id),
+        'model': Value(model_name),
+        'object_id': F('id'),
+        'operation': Value('UPSERT'),
+        'created_at': Value(now, output_field=DateTimeField()),
+    })
+
+
+def available_name(organization_id, name):
+    """``name``, or the first of ``name (2)``, ``name (3)`` ... free in the organization."""
+    max_length = Project._meta.get_field('name').max_length
+    # Every row counts for unique_together, templates and pending deletes too.
+    taken = set(
+        Project.all_objects.filter(organization_id=organization_id, name__startswith=name[:max_length - 10])
+        .values_list('name', flat=True)
+    )
+    candidate, number = name[:max_length], 1
+    while candidate in taken:
+        number += 1
+        suffix = f' ({number})'
+        candidate = name[:max_length - len(suffix)] + suffix
+    return candidate
+
+
+def clone_project(source, organization, name=None, include_comments=False, due_date_shift=0, as_template=False):
+    """
+    Copy ``source`` into ``organization`` and return the new, active
+    project. Due dates move by ``due_date_shift`` days; a taken name gets
+    the first free numbered suffix. Raises ProjectArchiving while the
+    source's tasks are half moved to or from the archive.
+    """
+    if source.is_moving_tasks:
+        raise ProjectArchiving
+    shift = timedelta(days=due_date_shift or 0)
+    now = timezone.now()
+    name = name or NAME_SUFFIX.sub('', source.name)
+    task_model = source.task_relation.model
+    comment_model = task_model._meta.get_field('comments').related_model
+
+    with transaction.atomic():
+        for attempt in range(NAME_ATTEMPTS):
+            try:
+                with transaction.atomic():
+                    project = Project.objects.create(
+                        organization=organization,
+                        name=available_name(organization.id, name),
+                        description=source.description,
+                        due_date=source.due_date + shift if source.due_date else None,
+                        is_template=as_template,
+                    )
+                break
+            except IntegrityError:
+                # A concurrent clone took the name; look again.
+                if attempt == NAME_ATTEMPTS - 1:
+                    raise
+
+        _insert_select(Task, task_model.objects.filter(project_id=source.id), {
+            'project': Value(project.id),
+            'title': F('title'),
+            'description': F('description'),
+            'status': F('status'),
+            'assignee_email': F('assignee_email'),
+            'due_date': F('due_date') + Value(shift) if shift else F('due_date'),
+            'created_at': Value(now, output_field=DateTimeField()),
+            'updated_at': Value(now, output_field=DateTimeField()),
+            'version': Value(1),
+            'rank': F('rank'),
+        })
+        _log_inserted(organization.id, 'Task', Task.objects.filter(project_id=project.id), now)
+
+        copied_task = (
+            Task.objects.filter(project_id=project.id, title=OuterRef('task__title'))
+            .order_by().values('id')
+        )
+        source_links = link_model(task_model).objects.filter(task__project_id=source.id)
+        if organization.id != source.organization_id:
+            _insert_select(
+                Label,
+                Label.objects.filter(id__in=source_links.values('label_id'))
+                .exclude(name__in=Label.objects.filter(organization=organization).values('name')),
+                {
+                    'organization': Value(organization.id),
+                    'name': F('name'),
+                    'color': F('color'),
+                    'created_at': Value(now, output_field=DateTimeField()),
+                },
+            )
+        _insert_select(TaskLabel, source_links, {
+            'task': Subquery(copied_task),
+            'label': Subquery(
+                Label.objects.filter(organization=organization, name=OuterRef('label__name'))
+                .order_by().values('id')
+            ),
+        })
+
+        _insert_select(TaskDependency, dependency_model(task_model).objects.filter(task__project_id=source.id), {
+            'task': Subquery(copied_task),
+            'depends_on': Subquery(
+                Task.objects.filter(project_id=project.id, title=OuterRef('depends_on__title'))
+                .order_by().values('id')
+            ),
+        })
+
+        if include_comments:
+            _insert_select(TaskComment, comment_model.objects.filter(task__project_id=source.id), {
+                'task': Subquery(copied_task),
+                'content': F('content'),
+                'author_email': F('author_email'),
+                'timestamp': F('timestamp'),
+            })
+            _log_inserted(
+                organization.id, 'TaskComment', TaskComment.objects.filter(task__project_id=project.id), now
+            )
+    return project
@@ -0,0 +1,197 @@
+"""
+Deleting projects and organizations in the background.
+
+Left to ``on_delete=CASCADE``, deleting a big organization makes Django's
+collector load every project, task and comment into memory and delete
+them in one long transaction. Instead mark_project_deleted() and
+mark_organization_deleted() only flag the root (``deleting_at``), which
+hides it from every resolver at once, and record a Deletion. The purge job
+then empties the tables bottom-up, comments before tasks before projects,
+with ``DELETE ... WHERE id IN (SELECT id ... LIMIT n)`` batches of one
+short transaction each.
+
+A purge run stops after DELETION['TIME_BUDGET_SECONDS'] and queues its own
+continuation, so no job outlives its lease. Batches are idempotent: a
+worker that dies mid-way leaves the next run a little more to do.
+
+Marking records the root's DELETE in the change log (organizations.changes);
+each batch records DELETEs for the projects, tasks and comments it removes,
+so delta-synced clients drop them too.
+"""
+
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.versioning import bump_organization_version_on_commit
+from jobs.registry import enqueue
+from organizations.cache import invalidate_organization_slug
+from organizations.changes import record_changes
+from organizations.models import Organization
+from projects.models import Project
+from .models import (
+    ArchivedTask, ArchivedTaskComment, ArchivedTaskDependency, ArchivedTaskLabel, Deletion, Label, Task,
+    TaskComment, TaskDependency, TaskLabel, TaskReminder,
+)
+
+
+DEFAULTS = {
+    'BATCH_SIZE': 1000,
+    'TIME_BUDGET_SECONDS': 60,
+}
+
+PURGE_JOB = 'purge_deletion'
+
+# Tables under the deleted root, children first: rows of ``model`` go when
+# ``column`` references a deleted row of ``parent``. Entries whose parent is
+# not under the root (labels, for a project) are skipped. Dependencies link
+# tasks of one project, so their ``task_id`` finds them all.
+CHILD_TABLES = [
+    (TaskReminder, 'task_id', Task),
+    (TaskLabel, 'task_id', Task),
+    (TaskDependency, 'task_id', Task),
+    (TaskComment, 'task_id', Task),
+    (Task, 'project_id', Project),
+    (ArchivedTaskLabel, 'task_id', ArchivedTask),
+    (ArchivedTaskDependency, 'task_id', ArchivedTask),
+    (ArchivedTaskComment, 'task_id', ArchivedTask),
+    (ArchivedTask, 'project_id', Project),
+    (Project, 'organization_id', Organization),
+    (TaskLabel, 'label_id', Label),
+    (ArchivedTaskLabel, 'label_id', Label),
+    (Label, 'organization_id', Organization),
+]
+
+
+# Change log names of the purged rows delta-synced clients hold.
+LOGGED_MODELS = {
+    Project: 'Project',
+    Task: 'Task',
+    ArchivedTask: 'Task',
+    TaskComment: 'TaskComment',
+    ArchivedTaskComment: 'TaskComment',
+}
+
+
+def get_setting(name):
+    return getattr(settings, 'DELETION', {}).get(name, DEFAULTS[name])
+
+
+def mark_project_deleted(project):
+    """Hide ``project`` and queue the removal of its rows. Returns the Deletion."""
+    with transaction.atomic():
+        # Only the first of concurrent requests marks it.
+        if not Project.objects.filter(id=project.id).update(deleting_at=timezone.now()):
+            raise Project.DoesNotExist
+        deletion = Deletion.objects.create(organization_id=project.organization_id, project_id=project.id)
+        enqueue(PURGE_JOB, {'deletion_id': deletion.id})
+        bump_organization_version_on_commit(project.organization_id)
+        record_changes(project.organization_id, 'Project', [project.id], deleted=True)
+    return deletion
+
+
+def mark_organization_deleted(organization):
+    """Hide ``organization`` and queue the removal of its rows. Returns the Deletion."""
+    now = timezone.now()
+    with transaction.atomic():
+        if not Organization.objects.filter(id=organization.id).update(deleting_at=now):
+            raise Organization.DoesNotExist
+        # Projects are flagged too, so readers of a project only check its own flag.
+        Project.objects.filter(organization_id=organization.id).update(deleting_at=now)
+        deletion = Deletion.objects.create(organization_id=organization.id)
+        enqueue(PURGE_JOB, {'deletion_id': deletion.id})
+        bump_organization_version_on_commit(organization.id)
+        record_changes(organization.id, 'Organization', [organization.id], deleted=True)
+        transaction.on_commit(lambda: invalidate_organization_slug(organization.slug))
+    return deletion
+
+
+def _plan(deletion):
+    """Return [(model, WHERE condition)] to empty in order; conditions take the root id."""
+    quote = connection.ops.quote_name
+    root = Organization if deletion.project_id is None else Project
+    # WHERE condition selecting the deleted rows of each parent table
+    conditions = {root: f'{quote("id")} = %s'}
+
+    def condition(model):
+        if model not in conditions:
+            parents = [(column, parent) for child, column, parent in CHILD_TABLES if child is model]
+            if len(parents) != 1:
+                # Not under the root (or not a parent table).
+                return None
+            column, parent = parents[0]
+            parent_condition = condition(parent)
+            conditions[model] = parent_condition and _in(column, parent, parent_condition)
+        return conditions[model]
+
+    plan = [
+        (model, _in(column, parent, condition(parent)))
+        for model, column, parent in CHILD_TABLES
+        if condition(parent) is not None
+    ]
+    plan.append((root, conditions[root]))
+    return plan
+
+
+def _in(column, parent, condition):
+    quote = connection.ops.quote_name
+    return (
+        f'{quote(column)} IN (SELECT {quote("id")} FROM {quote(parent._meta.db_table)} '
+        f'WHERE {condition})'
+    )
+
+
+def _delete_batch(model, condition, root_id, batch_size):
+    """Delete the first ``batch_size`` rows by id and return their ids."""
+    quote = connection.ops.quote_name
+    table, id_column = quote(model._meta.db_table), quote('id')
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT {id_column} FROM {table} WHERE {condition} ORDER BY {id_column} LIMIT %s',
+            [root_id, batch_size],
+        )
+        ids = [row[0] for row in cursor.fetchall()]
+        if ids:
+            # Nothing is written under a deleted root, so these are all the
+            # matching rows up to the last id.
+            cursor.execute(f'DELETE FROM {table} WHERE {condition} AND {id_column} <= %s', [root_id, ids[-1]])
+    return ids
+
+
+def purge(deletion_id, time_budget=None, batch_size=None):
+    """
+    Delete batches of a Deletion's rows until it is finished or
+    ``time_budget`` seconds have passed. Returns the Deletion.
+    """
+    deadline = time.monotonic() + (time_budget or get_setting('TIME_BUDGET_SECONDS'))
+    batch_size = batch_size or get_setting('BATCH_SIZE')
+    deletion = Deletion.objects.get(id=deletion_id)
+    if deletion.is_finished:
+        return deletion
+    root_id = deletion.organization_id if deletion.project_id is None else deletion.project_id
+
+    plan = _plan(deletion)
+    root_model = plan[-1][0]
+    for model, condition in plan:
+        table = model._meta.db_table
+        # The root's DELETE was logged when it was marked.
+        logged_as = LOGGED_MODELS.get(model) if model is not root_model else None
+        while True:
+            if time.monotonic() > deadline:
+                return deletion
+            with transaction.atomic():
+                ids = _delete_batch(model, condition, root_id, batch_size)
+                count = len(ids)
+                if count:
+                    if logged_as is not None:
+                        record_changes(deletion.organization_id, logged_as, ids, deleted=True)
+                    deletion.deleted_rows[table] = deletion.deleted_rows.get(table, 0) + count
+                    deletion.save(update_fields=['deleted_rows'])
+            if count < batch_size:
+                break
+
+    deletion.finished_at = timezone.now()
+    deletion.save(update_fields=['finished_at'])
+    return deletion
@@ -0,0 +1,193 @@
+"""
+Blocking relationships between the tasks of a project.
+
+A TaskDependency says a task waits for another. add_dependency() keeps the
+graph acyclic by asking the database whether the new blocker already
+(transitively) waits for the task, with one ``WITH RECURSIVE`` query that
+walks the (task, depends_on) index; writers of a project are serialized
+on its row so two concurrent edges cannot close a cycle between them.
+
+project_graph() loads a project's tasks and edges in one query and works
+out, in O(V + E) over the unfinished tasks, a topological order, the
+blocked tasks and the critical path: the longest chain of unfinished
+tasks, each waiting for the previous one. The result is cached under the
+organization's data version (core.versioning), which every write to the
+project's tasks or dependencies changes.
+"""
+
+from collections import deque
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from core.versioning import bump_organization_version_on_commit, get_organization_version
+from organizations.changes import record_changes
+from projects.models import Project
+from .models import Task
+from .updates import ProjectArchiving
+
+
+DEFAULTS = {
+    'CACHE_TIMEOUT': 300,
+}
+
+
+class DependencyCycle(Exception):
+    """The dependency would make a task (transitively) wait for itself."""
+
+    def __init__(self):
+        super().__init__("Dependency would create a cycle")
+
+
+def get_setting(name):
+    return getattr(settings, 'TASK_DEPENDENCIES', {}).get(name, DEFAULTS[name])
+
+
+def dependency_model(task_model):
+    """The TaskDependency-like through model of ``task_model``."""
+    return task_model._meta.get_field('depends_on').remote_field.through
+
+
+def creates_cycle(task_id, depends_on_id):
+    """Whether ``depends_on_id`` already waits, directly or not, for ``task_id``."""
+    quote = connection.ops.quote_name
+    table = quote(dependency_model(Task)._meta.db_table)
+    task_column, depends_on_column = quote('task_id'), quote('depends_on_id')
+    with connection.cursor() as cursor:
+        # The seed is read from the tasks table rather than a bare parameter:
+        # PostgreSQL types ``SELECT %s`` as integer, which the recursive
+        # term's bigint column would not match. UNION (not UNION ALL) drops
+        # tasks already reached, so the walk ends.
+        cursor.execute(
+            f'WITH RECURSIVE reachable (id) AS ('
+            f'SELECT {quote("id")} FROM {quote(Task._meta.db_table)} WHERE {quote("id")} = %s '
+            f'UNION SELECT link.{depends_on_column} FROM {table} link '
+            f'INNER JOIN reachable ON link.{task_column} = reachable.id'
+            f') SELECT 1 FROM reachable WHERE id = %s',
+            [depends_on_id, task_id],
+        )
+        return cursor.fetchone() is not None
+
+
+def _tasks(task_id, depends_on_id):
+    tasks = (
+        Task.objects.filter(
+            id__in=[task_id, depends_on_id],
+            project__deleting_at__isnull=True,
+            project__organization__deleting_at__isnull=True,
+        )
+        .select_related('project').in_bulk()
+    )
+    if task_id not in tasks or depends_on_id not in tasks:
+        raise Task.DoesNotExist("Task not found")
+    task, depends_on = tasks[task_id], tasks[depends_on_id]
+    if task.project_id != depends_on.project_id:
+        raise ValueError("Tasks must be in the same project")
+    if task.project.is_moving_tasks:
+        raise ProjectArchiving
+    return task, depends_on
+
+
+def _changed(task):
+    organization_id = Project.objects.filter(id=task.project_id).values_list('organization_id', flat=True).first()
+    bump_organization_version_on_commit(organization_id)
+    record_changes(organization_id, 'Task', [task.id])
+
+
+def add_dependency(task_id, depends_on_id):
+    """
+    Make a task wait for another of its project and return the task.
+    Raises Task.DoesNotExist, ValueError for tasks of different projects,
+    ProjectArchiving and DependencyCycle.
+    """
+    task_id, depends_on_id = Task._meta.pk.to_python(task_id), Task._meta.pk.to_python(depends_on_id)
+    with transaction.atomic():
+        task, depends_on = _tasks(task_id, depends_on_id)
+        # One writer per project at a time.
+        Project.all_objects.select_for_update().only('id').get(id=task.project_id)
+        if creates_cycle(task.id, depends_on.id):
+            raise DependencyCycle
+        links = dependency_model(Task).objects
+        if not links.filter(task_id=task.id, depends_on_id=depends_on.id).exists():
+            links.create(task_id=task.id, depends_on_id=depends_on.id)
+            _changed(task)
+    return task
+
+
+def remove_dependency(task_id, depends_on_id):
+    """Stop a task waiting for another and return the task. Raises Task.DoesNotExist."""
+    task_id, depends_on_id = Task._meta.pk.to_python(task_id), Task._meta.pk.to_python(depends_on_id)
+    with transaction.atomic():
+        task, depends_on = _tasks(task_id, depends_on_id)
+        deleted, _ = dependency_model(Task).objects.filter(task_id=task.id, depends_on_id=depends_on.id).delete()
+        if deleted:
+            _changed(task)
+    return task
+
+
+def compute_graph(rows):
+    """
+    Return ``order`` (a topological order of the unfinished tasks),
+    ``blocked`` (those waiting for an unfinished task, in that order) and
+    ``critical_path`` from (task id, status, depends_on id or None) rows.
+    """
+    open_tasks = {}
+    edges = []
+    for task_id, status, depends_on_id in rows:
+        if status != 'DONE':
+            open_tasks[task_id] = None
+            if depends_on_id is not None:
+                edges.append((depends_on_id, task_id))
+
+    dependents = {task_id: [] for task_id in open_tasks}
+    waiting_for = dict.fromkeys(open_tasks, 0)
+    for depends_on_id, task_id in edges:
+        # A finished blocker no longer blocks.
+        if depends_on_id in open_tasks:
+            dependents[depends_on_id].append(task_id)
+            waiting_for[task_id] += 1
+    blocked = {task_id for task_id, count in waiting_for.items() if count}
+
+    # Kahn's algorithm, tracking the longest chain ending at each task.
+    ready = deque(task_id for task_id, count in waiting_for.items() if not count)
+    length = dict.fromkeys(open_tasks, 1)
+    previous = {}
+    order = []
+    while ready:
+        task_id = ready.popleft()
+        order.append(task_id)
+        for dependent in dependents[task_id]:
+            if length[task_id] + 1 > length[dependent]:
+                length[dependent] = length[task_id] + 1
+                previous[dependent] = task_id
+            waiting_for[dependent] -= 1
+            if not waiting_for[dependent]:
+                ready.append(dependent)
+
+    critical_path = []
+    if order:
+        task_id = max(order, key=length.__getitem__)
+        while task_id is not None:
+            critical_path.append(task_id)
+            task_id = previous.get(task_id)
+        critical_path.reverse()
+    return {
+        'order': order,
+        'blocked': [task_id for task_id in order if task_id in blocked],
+        'critical_path': critical_path,
+    }
+
+
+def project_graph(project):
+    """compute_graph() of ``project``'s tasks, cached per data version."""
+    # Read the version before the rows: a write committed in between then
+    # caches newer rows under the older version, never the reverse.
+    key = f'task-graph:{project.id}:{get_organization_version(project.organization_id)}'
+    graph = cache.get(key)
+    if graph is None:
+        # One LEFT JOIN: a row per task and dependency, ordered for stable results.
+        rows = project.task_relation.order_by('id').values_list('id', 'status', 'depends_on')
+        graph = compute_graph(rows)
+        cache.set(key, graph, get_setting('CACHE_TIMEOUT'))
+    return graph
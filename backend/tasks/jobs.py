@@ -0,0 +1,42 @@
+from jobs.registry import enqueue, job
+
+from .board import REBALANCE_JOB, rebalance_column
+from .deletion import PURGE_JOB, purge
+from .reminders import SCAN_JOB, SEND_JOB, drain_outbox, scan_due_tasks
+
+
+@job(REBALANCE_JOB)
+def rebalance_task_ranks(payload):
+    """Renumber a board column whose rank keys have grown long."""
+    return {'tasks': rebalance_column(payload['project_id'], payload['status'])}
+
+
+@job(SCAN_JOB)
+def scan_due_task_reminders(payload):
+    """Queue reminders for tasks coming due, then send them."""
+    result = scan_due_tasks()
+    if payload.get('send', True):
+        result.update(drain_outbox())
+        if result['more']:
+            enqueue(SEND_JOB, {})
+    return result
+
+
+@job(SEND_JOB)
+def send_task_reminders(payload):
+    """Send pending reminders from the outbox."""
+    result = drain_outbox()
+    if result['more']:
+        # Continue in a new job rather than outlive this one's lease.
+        enqueue(SEND_JOB, payload)
+    return result
+
+
+@job(PURGE_JOB)
+def purge_deletion(payload):
+    """Delete a batch of a deleted project's or organization's rows."""
+    deletion = purge(payload['deletion_id'])
+    if not deletion.is_finished:
+        # Continue in a new job rather than outlive this one's lease.
+        enqueue(PURGE_JOB, payload)
+    return {'deleted_rows': deletion.deleted_rows, 'finished': deletion.is_finished}
@@ -0,0 +1,77 @@
+"""
+Filtering tasks by label and counting tasks per label.
+
+Labels hang off tasks through TaskLabel (ArchivedTaskLabel for archived
+tasks), indexed on both (task, label) and (label, task). A label filter is
+a semi-join on the (label, task) index, ``id IN (SELECT task_id ...)``;
+matching ALL labels groups those links by task and keeps the tasks
+``HAVING COUNT(*)`` equal to the number of labels.
+"""
+
+from django.db import transaction
+from django.db.models import Count, Q
+
+from .models import Label, Task
+from .updates import update_task
+
+
+LABEL_MATCH_ANY = 'ANY'
+LABEL_MATCH_ALL = 'ALL'
+
+
+def link_model(task_model):
+    """The TaskLabel-like through model of ``task_model``."""
+    return task_model._meta.get_field('labels').remote_field.through
+
+
+def filter_by_labels(tasks, label_ids, match=LABEL_MATCH_ANY):
+    """Narrow the ``tasks`` queryset to tasks with any (or all) of ``label_ids``."""
+    label_ids = {int(label_id) for label_id in label_ids}
+    if not label_ids:
+        return tasks
+    links = link_model(tasks.model).objects.filter(label_id__in=label_ids)
+    if match == LABEL_MATCH_ALL:
+        links = (
+            links.values('task_id')
+            .annotate(matched=Count('label_id'))
+            .filter(matched=len(label_ids))
+        )
+    return tasks.filter(id__in=links.values('task_id'))
+
+
+def set_task_labels(task_id, label_ids, expected_version=None):
+    """
+    Replace a task's labels and return the task, counted as an edit of the
+    task (its version goes up). Raises Label.DoesNotExist for a label of
+    another organization, and what update_task() raises.
+    """
+    label_ids = {int(label_id) for label_id in label_ids}
+    with transaction.atomic():
+        task = update_task(task_id, expected_version)
+        labels = set(
+            Label.objects.filter(id__in=label_ids, organization__projects=task.project_id)
+            .values_list('id', flat=True)
+        )
+        if labels != label_ids:
+            raise Label.DoesNotExist("Label not found")
+        links = link_model(Task).objects
+        links.filter(task_id=task.id).exclude(label_id__in=labels).delete()
+        current = set(links.filter(task_id=task.id).values_list('label_id', flat=True))
+        links.bulk_create([links.model(task_id=task.id, label_id=label_id) for label_id in labels - current])
+    return task
+
+
+def labels_with_counts(organization):
+    """
+    The organization's labels, each annotated with ``open_count`` and
+    ``done_count`` of live tasks, from one aggregate query.
+    """
+    counted = Q(
+        task_links__task__project__deleting_at__isnull=True,
+        task_links__task__project__is_template=False,
+    )
+    open_statuses = [status for status, _ in Task.TASK_STATUS_CHOICES if status != 'DONE']
+    return Label.objects.filter(organization=organization).annotate(
+        open_count=Count('task_links', filter=counted & Q(task_links__task__status__in=open_statuses)),
+        done_count=Count('task_links', filter=counted & Q(task_links__task__status='DONE')),
+    ).order_by('name')
@@ -0,0 +1,41 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tasks.archive import DEFAULT_BATCH_SIZE, archivable_projects, archive_project
+
+
+class Command(BaseCommand):
+    help = "Move tasks and comments of completed/cancelled projects into the archive tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than',
+            type=int,
+            required=True,
+            metavar='DAYS',
+            help="Only archive projects not updated in this many days.",
+        )
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help="List the projects that would be archived without moving anything.",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['older_than'])
+        projects = archivable_projects(cutoff).select_related('organization')
+
+        archived = 0
+        for project in projects.iterator():
+            if options['dry_run']:
+                self.stdout.write(f"Would archive {project}")
+                continue
+            moved = archive_project(project, batch_size=options['batch_size'])
+            archived += 1
+            self.stdout.write(f"Archived {project} ({moved} tasks)")
+
+        if not options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f"Archived {archived} project(s)"))
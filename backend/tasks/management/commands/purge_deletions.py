@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from tasks.deletion import purge
+from tasks.models import Deletion
+
+
+class Command(BaseCommand):
+    help = "Finish pending project and organization deletions without the job worker."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help="Rows per DELETE (default: DELETION['BATCH_SIZE']).")
+
+    def handle(self, *args, **options):
+        for deletion in Deletion.objects.filter(finished_at__isnull=True).order_by('id'):
+            while not deletion.is_finished:
+                deletion = purge(deletion.id, batch_size=options['batch_size'])
+                rows = ', '.join(f"{table} {count}" for table, count in deletion.deleted_rows.items())
+                self.stdout.write(f"{deletion}: {rows or 'nothing deleted yet'}")
+            self.stdout.write(self.style.SUCCESS(f"{deletion} finished"))
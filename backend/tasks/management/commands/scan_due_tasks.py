@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils.module_loading import import_string
+
+from tasks.reminders import drain_outbox, scan_due_tasks
+
+
+class Command(BaseCommand):
+    help = "Queue reminders for tasks coming due and send them from the outbox."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            metavar='SECONDS',
+            help="Keep running, scanning every SECONDS.",
+        )
+        parser.add_argument(
+            '--no-send',
+            action='store_true',
+            help="Only fill the outbox.",
+        )
+        parser.add_argument(
+            '--sender',
+            help="Sender class overriding TASK_REMINDERS['SENDER'], e.g. tasks.reminders.FileSender.",
+        )
+
+    def handle(self, *args, **options):
+        sender = import_string(options['sender'])() if options['sender'] else None
+        while True:
+            result = scan_due_tasks()
+            if not options['no_send']:
+                result.update(drain_outbox(sender))
+            self.stdout.write(', '.join(f"{name} {count}" for name, count in result.items()))
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
+            close_old_connections()
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from projects.models import Project
+from tasks.archive import DEFAULT_BATCH_SIZE, unarchive_project
+
+
+class Command(BaseCommand):
+    help = "Move an archived project's tasks and comments back into the live tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument('project_ids', nargs='+', type=int)
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        for project_id in options['project_ids']:
+            try:
+                project = Project.objects.select_related('organization').get(id=project_id)
+            except Project.DoesNotExist:
+                raise CommandError(f"Project {project_id} not found")
+            # A restore that was interrupted is picked up where it stopped.
+            if not project.is_archived and project.archive_transition != 'RESTORING':
+                self.stdout.write(f"{project} is not archived, skipping")
+                continue
+            moved = unarchive_project(project, batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"Restored {project} ({moved} tasks)"))
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="taskcomment",
+            index=models.Index(
+                fields=["task", "-timestamp"], name="taskcomment_task_recent_idx"
+            ),
+        ),
+    ]
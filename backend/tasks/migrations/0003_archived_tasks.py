@@ -0,0 +1,95 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:48
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0002_project_archived_at"),
+        ("tasks", "0002_taskcomment_task_recent_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedTask",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("title", models.CharField(max_length=200)),
+                ("description", models.TextField(blank=True)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("TODO", "To Do"),
+                            ("IN_PROGRESS", "In Progress"),
+                            ("REVIEW", "Review"),
+                            ("DONE", "Done"),
+                        ],
+                        default="TODO",
+                        max_length=20,
+                    ),
+                ),
+                ("assignee_email", models.EmailField(blank=True, max_length=254)),
+                ("due_date", models.DateTimeField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_tasks",
+                        to="projects.project",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-created_at"],
+                "abstract": False,
+                "unique_together": {("project", "title")},
+            },
+        ),
+        migrations.CreateModel(
+            name="ArchivedTaskComment",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("content", models.TextField()),
+                ("author_email", models.EmailField(max_length=254)),
+                ("timestamp", models.DateTimeField(auto_now_add=True)),
+                (
+                    "task",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="comments",
+                        to="tasks.archivedtask",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["timestamp"],
+                "abstract": False,
+                "indexes": [
+                    models.Index(
+                        fields=["task", "-timestamp"], name="archivedcomment_recent_idx"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0003_archived_tasks"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="archivedtask",
+            name="version",
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="version",
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:04
+
+import math
+
+from django.db import migrations, models
+
+
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+
+def spread_ranks(count):
+    """tasks.ranking.spread_ranks() as of this migration."""
+    width = max(1, math.ceil(math.log(count + 1, len(DIGITS))) + 1)
+    span = len(DIGITS) ** width
+    ranks = []
+    for index in range(1, count + 1):
+        value = index * span // (count + 1)
+        digits = []
+        for _ in range(width):
+            value, digit = divmod(value, len(DIGITS))
+            digits.append(DIGITS[digit])
+        ranks.append("".join(reversed(digits)).rstrip("0"))
+    return ranks
+
+
+def rank_existing_tasks(apps, schema_editor):
+    """Rank every column in its current (newest first) display order."""
+    for model_name in ("Task", "ArchivedTask"):
+        model = apps.get_model("tasks", model_name)
+        columns = model.objects.order_by().values_list("project_id", "status").distinct()
+        for project_id, status in columns:
+            tasks = list(
+                model.objects.filter(project_id=project_id, status=status)
+                .order_by("-created_at", "-id")
+                .only("id")
+            )
+            for task, rank in zip(tasks, spread_ranks(len(tasks))):
+                task.rank = rank
+            model.objects.bulk_update(tasks, ["rank"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0004_task_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="archivedtask",
+            name="rank",
+            field=models.CharField(blank=True, default="", max_length=255),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="rank",
+            field=models.CharField(blank=True, default="", max_length=255),
+        ),
+        migrations.RunPython(rank_existing_tasks, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["project", "status", "rank"], name="task_board_idx"
+            ),
+        ),
+    ]
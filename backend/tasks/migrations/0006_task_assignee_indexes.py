@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0005_task_rank"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["assignee_email", "status"], name="task_assignee_status_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["assignee_email", "-created_at"],
+                name="task_assignee_recent_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0006_task_assignee_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReminderCursor",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100, unique=True)),
+                ("due_date", models.DateTimeField()),
+                ("task_id", models.BigIntegerField(default=0)),
+                ("updated_at", models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name="TaskReminder",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("recipient", models.EmailField(max_length=254)),
+                ("due_date", models.DateTimeField()),
+                ("dedup_key", models.CharField(max_length=100, unique=True)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("PENDING", "Pending"),
+                            ("SENT", "Sent"),
+                            ("CANCELLED", "Cancelled"),
+                        ],
+                        default="PENDING",
+                        max_length=20,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("sent_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "ordering": ["due_date"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(fields=["due_date", "id"], name="task_due_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(fields=["updated_at"], name="task_updated_idx"),
+        ),
+        migrations.AddField(
+            model_name="taskreminder",
+            name="task",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="reminders",
+                to="tasks.task",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="taskreminder",
+            index=models.Index(
+                fields=["status", "recipient"], name="taskreminder_outbox_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,151 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("organizations", "0003_organization_deleting_at"),
+        ("tasks", "0008_deletion"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Label",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=50)),
+                ("color", models.CharField(blank=True, default="", max_length=7)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "organization",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="labels",
+                        to="organizations.organization",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["name"],
+            },
+        ),
+        migrations.CreateModel(
+            name="TaskLabel",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "label",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="task_links",
+                        to="tasks.label",
+                    ),
+                ),
+                (
+                    "task",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="label_links",
+                        to="tasks.task",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ArchivedTaskLabel",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "label",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_task_links",
+                        to="tasks.label",
+                    ),
+                ),
+                (
+                    "task",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="label_links",
+                        to="tasks.archivedtask",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name="archivedtask",
+            name="labels",
+            field=models.ManyToManyField(
+                blank=True,
+                related_name="archived_tasks",
+                through="tasks.ArchivedTaskLabel",
+                to="tasks.label",
+            ),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="labels",
+            field=models.ManyToManyField(
+                blank=True,
+                related_name="tasks",
+                through="tasks.TaskLabel",
+                to="tasks.label",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tasklabel",
+            index=models.Index(
+                fields=["label", "task"], name="tasklabel_label_task_idx"
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="tasklabel",
+            unique_together={("task", "label")},
+        ),
+        migrations.AlterUniqueTogether(
+            name="label",
+            unique_together={("organization", "name")},
+        ),
+        migrations.AddIndex(
+            model_name="archivedtasklabel",
+            index=models.Index(
+                fields=["label", "task"], name="archivedlabel_label_task_idx"
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="archivedtasklabel",
+            unique_together={("task", "label")},
+        ),
+    ]
@@ -0,0 +1,120 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0009_task_labels"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskDependency",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "depends_on",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="dependent_links",
+                        to="tasks.task",
+                    ),
+                ),
+                (
+                    "task",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="dependency_links",
+                        to="tasks.task",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ArchivedTaskDependency",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "depends_on",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="dependent_links",
+                        to="tasks.archivedtask",
+                    ),
+                ),
+                (
+                    "task",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="dependency_links",
+                        to="tasks.archivedtask",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name="archivedtask",
+            name="depends_on",
+            field=models.ManyToManyField(
+                blank=True,
+                related_name="dependents",
+                through="tasks.ArchivedTaskDependency",
+                to="tasks.archivedtask",
+            ),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="depends_on",
+            field=models.ManyToManyField(
+                blank=True,
+                related_name="dependents",
+                through="tasks.TaskDependency",
+                to="tasks.task",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="taskdependency",
+            index=models.Index(
+                fields=["depends_on", "task"], name="taskdep_depends_on_task_idx"
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="taskdependency",
+            unique_together={("task", "depends_on")},
+        ),
+        migrations.AddIndex(
+            model_name="archivedtaskdependency",
+            index=models.Index(
+                fields=["depends_on", "task"], name="archiveddep_depends_on_idx"
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="archivedtaskdependency",
+            unique_together={("task", "depends_on")},
+        ),
+    ]
@@ -1,10 +1,33 @@
 from django.db import models
+from organizations.models import Organization
 from projects.models import Project
+from .ranking import rank_between
 
 
-class Task(models.Model):
+class Label(models.Model):
     """
-    Task model that belongs to a project.
+    Organization-wide tag (component, priority, ...) attached to tasks.
+    """
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        related_name='labels'
+    )
+    name = models.CharField(max_length=50)
+    color = models.CharField(max_length=7, blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['name']
+        unique_together = ['organization', 'name']
+
+    def __str__(self):
+        return f"{self.name} - {self.organization.name}"
+
+
+class BaseTask(models.Model):
+    """
+    Columns and behaviour shared by live and archived tasks.
     """
     TASK_STATUS_CHOICES = [
         ('TODO', 'To Do'),
@@ -13,11 +36,6 @@ class Task(models.Model):
         ('DONE', 'Done'),
     ]
 
-    project = models.ForeignKey(
-        Project, 
-        on_delete=models.CASCADE, 
-        related_name='tasks'
-    )
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True)
     status = models.CharField(
@@ -29,14 +47,37 @@ class Task(models.Model):
     due_date = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Incremented on every update, for optimistic concurrency (tasks/updates.py)
+    version = models.PositiveIntegerField(default=1)
+    # Position within its (project, status) board column (tasks/ranking.py)
+    rank = models.CharField(max_length=255, blank=True, default='')
 
     class Meta:
+        abstract = True
         ordering = ['-created_at']
         unique_together = ['project', 'title']
 
     def __str__(self):
         return f"{self.title} - {self.project.name}"
 
+    def save(self, *args, **kwargs):
+        if self._state.adding and not self.rank:
+            # New tasks go to the top of their column.
+            top = (
+                type(self)._default_manager
+                .filter(project_id=self.project_id, status=self.status)
+                .order_by('rank')
+                .values_list('rank', flat=True)
+                .first()
+            )
+            self.rank = rank_between(None, top)
+        if not self._state.adding:
+            self.version += 1
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'version'}
+        super().save(*args, **kwargs)
+
     @property
     def organization(self):
         """Return the organization this task belongs to."""
@@ -56,20 +97,45 @@ class Task(models.Model):
         return False
 
 
-class TaskComment(models.Model):
+class Task(BaseTask):
     """
-    Comment model for tasks.
+    Task model that belongs to a project.
     """
-    task = models.ForeignKey(
-        Task, 
+    project = models.ForeignKey(
+        Project, 
         on_delete=models.CASCADE, 
-        related_name='comments'
+        related_name='tasks'
+    )
+    labels = models.ManyToManyField(Label, through='TaskLabel', related_name='tasks', blank=True)
+    # Tasks that must be finished before this one (tasks.dependencies)
+    depends_on = models.ManyToManyField(
+        'self', through='TaskDependency', symmetrical=False, related_name='dependents', blank=True
     )
+
+    class Meta(BaseTask.Meta):
+        indexes = [
+            # Board columns: one ordered scan per (project, status).
+            models.Index(fields=['project', 'status', 'rank'], name='task_board_idx'),
+            # Per-assignee workload aggregates and newest-first listings.
+            models.Index(fields=['assignee_email', 'status'], name='task_assignee_status_idx'),
+            models.Index(fields=['assignee_email', '-created_at'], name='task_assignee_recent_idx'),
+            # The due-date reminder scan walks (due_date, id) from its cursor
+            # and catches edits behind it by updated_at (tasks.reminders).
+            models.Index(fields=['due_date', 'id'], name='task_due_idx'),
+            models.Index(fields=['updated_at'], name='task_updated_idx'),
+        ]
+
+
+class BaseTaskComment(models.Model):
+    """
+    Columns and behaviour shared by live and archived task comments.
+    """
     content = models.TextField()
     author_email = models.EmailField()
     timestamp = models.DateTimeField(auto_now_add=True)
 
     class Meta:
+        abstract = True
         ordering = ['timestamp']
 
     def __str__(self):
@@ -80,3 +146,246 @@ class TaskComment(models.Model):
         """Return the organization this comment belongs to."""
         return self.task.organization
 
+
+class TaskComment(BaseTaskComment):
+    """
+    Comment model for tasks.
+    """
+    task = models.ForeignKey(
+        Task, 
+        on_delete=models.CASCADE, 
+        related_name='comments'
+    )
+
+    class Meta(BaseTaskComment.Meta):
+        indexes = [
+            # Serves the newest-first per-task window and keyset pages.
+            models.Index(fields=['task', '-timestamp'], name='taskcomment_task_recent_idx'),
+        ]
+
+
+class TaskLabel(models.Model):
+    """
+    A label on a task. The two composite indexes serve both directions:
+    a task list's labels and a label filter's tasks.
+    """
+    task = models.ForeignKey(
+        Task,
+        on_delete=models.CASCADE,
+        related_name='label_links',
+        db_index=False
+    )
+    label = models.ForeignKey(
+        Label,
+        on_delete=models.CASCADE,
+        related_name='task_links',
+        db_index=False
+    )
+
+    class Meta:
+        unique_together = ['task', 'label']
+        indexes = [
+            models.Index(fields=['label', 'task'], name='tasklabel_label_task_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.label.name} on task #{self.task_id}"
+
+
+class TaskDependency(models.Model):
+    """
+    ``task`` is blocked until ``depends_on`` is done; both are tasks of the
+    same project. The graph is kept acyclic by tasks.dependencies.
+    """
+    task = models.ForeignKey(
+        Task,
+        on_delete=models.CASCADE,
+        related_name='dependency_links',
+        db_index=False
+    )
+    depends_on = models.ForeignKey(
+        Task,
+        on_delete=models.CASCADE,
+        related_name='dependent_links',
+        db_index=False
+    )
+
+    class Meta:
+        unique_together = ['task', 'depends_on']
+        indexes = [
+            models.Index(fields=['depends_on', 'task'], name='taskdep_depends_on_task_idx'),
+        ]
+
+    def __str__(self):
+        return f"Task #{self.task_id} depends on task #{self.depends_on_id}"
+
+
+class ReminderCursor(models.Model):
+    """
+    How far a reminder scan has got: the last (due_date, task id) it
+    walked past and the updated_at watermark of edits it has seen.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    due_date = models.DateTimeField()
+    task_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.name} at ({self.due_date}, {self.task_id})"
+
+
+class TaskReminder(models.Model):
+    """
+    Outbox row: a reminder that a task is coming due, sent to its assignee
+    by tasks.reminders.drain_outbox together with their other reminders.
+    """
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('SENT', 'Sent'),
+        ('CANCELLED', 'Cancelled'),
+    ]
+
+    task = models.ForeignKey(
+        Task,
+        on_delete=models.CASCADE,
+        related_name='reminders'
+    )
+    recipient = models.EmailField()
+    due_date = models.DateTimeField()
+    # One reminder per task and due date, however often it is scanned.
+    dedup_key = models.CharField(max_length=100, unique=True)
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='PENDING'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['due_date']
+        indexes = [
+            models.Index(fields=['status', 'recipient'], name='taskreminder_outbox_idx'),
+        ]
+
+    def __str__(self):
+        return f"Reminder to {self.recipient} for task #{self.task_id} ({self.status})"
+
+
+class Deletion(models.Model):
+    """
+    A project, or a whole organization, marked for deletion and emptied in
+    batches by tasks.deletion. ``deleted_rows`` counts rows removed so far
+    per table.
+    """
+    organization_id = models.BigIntegerField()
+    # Null when the whole organization is deleted.
+    project_id = models.BigIntegerField(null=True, blank=True)
+    deleted_rows = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        target = f"project #{self.project_id}" if self.project_id else f"organization #{self.organization_id}"
+        return f"Deletion of {target}"
+
+    @property
+    def is_finished(self):
+        return self.finished_at is not None
+
+
+class ArchivedTask(BaseTask):
+    """
+    Task of an archived (completed or cancelled) project.
+
+    Same columns and ids as the Task it was moved from, kept out of the
+    hot tasks table. See tasks.archive.
+    """
+    # GraphQL serves archived rows with the live model's type.
+    live_model = Task
+
+    project = models.ForeignKey(
+        Project, 
+        on_delete=models.CASCADE, 
+        related_name='archived_tasks'
+    )
+    labels = models.ManyToManyField(Label, through='ArchivedTaskLabel', related_name='archived_tasks', blank=True)
+    depends_on = models.ManyToManyField(
+        'self', through='ArchivedTaskDependency', symmetrical=False, related_name='dependents', blank=True
+    )
+
+    class Meta(BaseTask.Meta):
+        pass
+
+
+class ArchivedTaskComment(BaseTaskComment):
+    """
+    Comment of an archived task.
+    """
+    live_model = TaskComment
+
+    task = models.ForeignKey(
+        ArchivedTask, 
+        on_delete=models.CASCADE, 
+        related_name='comments'
+    )
+
+    class Meta(BaseTaskComment.Meta):
+        indexes = [
+            models.Index(fields=['task', '-timestamp'], name='archivedcomment_recent_idx'),
+        ]
+
+
+class ArchivedTaskLabel(models.Model):
+    """
+    A label on an archived task.
+    """
+    task = models.ForeignKey(
+        ArchivedTask,
+        on_delete=models.CASCADE,
+        related_name='label_links',
+        db_index=False
+    )
+    label = models.ForeignKey(
+        Label,
+        on_delete=models.CASCADE,
+        related_name='archived_task_links',
+        db_index=False
+    )
+
+    class Meta:
+        unique_together = ['task', 'label']
+        indexes = [
+            models.Index(fields=['label', 'task'], name='archivedlabel_label_task_idx'),
+        ]
+
+
+class ArchivedTaskDependency(models.Model):
+    """
+    A dependency between archived tasks. The project's dependencies move
+    as a whole while its tasks move in batches (tasks.archive), so the
+    foreign keys are not enforced by the database.
+    """
+    task = models.ForeignKey(
+        ArchivedTask,
+        on_delete=models.CASCADE,
+        related_name='dependency_links',
+        db_index=False,
+        db_constraint=False
+    )
+    depends_on = models.ForeignKey(
+        ArchivedTask,
+        on_delete=models.CASCADE,
+        related_name='dependent_links',
+        db_index=False,
+        db_constraint=False
+    )
+
+    class Meta:
+        unique_together = ['task', 'depends_on']
+        indexes = [
+            models.Index(fields=['depends_on', 'task'], name='archiveddep_depends_on_idx'),
+        ]
@@ -0,0 +1,70 @@
+"""
+Fractional rank keys for manually ordered task lists.
+
+A rank is a string of base-36 digits read as a fraction (``'i'`` is 0.5),
+so a key can always be found between two others without touching any
+other row: moving a card rewrites one rank. Keys never end in ``'0'``,
+which keeps room below every key.
+
+Between two keys the new one is their midpoint. Towards an open end
+(adding to the top or bottom of a column, which happens again and again
+at the same end) it steps one digit from the neighbour instead of halving
+the gap, so keys grow by a digit every 35 such inserts rather than every
+5; tasks.board renumbers a column once its keys grow long anyway. Lowercase digits and letters sort the
+same under byte-wise and common locale collations.
+"""
+
+import math
+
+
+DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+BASE = len(DIGITS)
+
+
+def rank_between(lower=None, upper=None):
+    """
+    Return a key strictly between ``lower`` and ``upper``; either may be
+    None (or '') for an open end. Raises ValueError unless lower < upper.
+    """
+    lower = lower or ''
+    upper = upper or None
+    if upper is not None and lower >= upper:
+        raise ValueError(f"Rank {lower!r} is not below {upper!r}")
+    open_lower, open_upper = not lower, upper is None
+
+    digits = []
+    position = 0
+    while True:
+        low = DIGITS.index(lower[position]) if position < len(lower) else 0
+        high = BASE
+        if upper is not None:
+            high = DIGITS.index(upper[position]) if position < len(upper) else 0
+        if high - low > 1:
+            if open_lower == open_upper:
+                digit = (low + high) // 2
+            elif open_lower:
+                digit = high - 1
+            else:
+                digit = low + 1
+            digits.append(DIGITS[digit])
+            return ''.join(digits)
+        digits.append(DIGITS[low])
+        if high - low == 1:
+            # The prefix is now below upper; only lower constrains the rest.
+            upper = None
+        position += 1
+
+
+def spread_ranks(count):
+    """``count`` short, evenly spaced ascending keys, for (re)numbering a list."""
+    width = max(1, math.ceil(math.log(count + 1, BASE)) + 1)
+    span = BASE ** width
+    ranks = []
+    for index in range(1, count + 1):
+        value = index * span // (count + 1)
+        digits = []
+        for _ in range(width):
+            value, digit = divmod(value, BASE)
+            digits.append(DIGITS[digit])
+        ranks.append(''.join(reversed(digits)).rstrip('0'))
+    return ranks
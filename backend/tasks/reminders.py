@@ -0,0 +1,263 @@
+"""
+Reminders for tasks coming due.
+
+scan_due_tasks() walks the (due_date, id) index from a persisted cursor up
+to ``now + LEAD_TIME_HOURS`` and writes a TaskReminder outbox row for each
+open, assigned task it passes, so a run reads only the tasks that entered
+the window since the previous run, never every open task.
+
+Edits behind the cursor (a due date moved earlier, a finished task
+reopened) are caught by a second scan of tasks whose ``updated_at`` is
+past the cursor's watermark; this also sees the narrow UPDATEs of
+tasks.updates, which send no signals. Dedup keys are (task, due date), so
+rescanning a task is harmless and a new due date gets a new reminder.
+
+drain_outbox() sends pending reminders with the configured sender, one
+message per assignee, batch after batch until the outbox is empty or
+TIME_BUDGET_SECONDS have passed. A reminder whose task was finished,
+reassigned, rescheduled or deleted after it was written is cancelled
+instead of sent.
+"""
+
+import json
+import logging
+import sys
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import ReminderCursor, Task, TaskReminder
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'LEAD_TIME_HOURS': 24,
+    'BATCH_SIZE': 500,
+    'SENDER': 'tasks.reminders.ConsoleSender',
+    'FILE_PATH': 'reminders.jsonl',
+    'TIME_BUDGET_SECONDS': 60,
+}
+
+CURSOR_NAME = 'due_tasks'
+SCAN_JOB = 'scan_due_tasks'
+SEND_JOB = 'send_task_reminders'
+
+# Edits are re-read from this far before the previous scan, so a
+# transaction that set updated_at before the scan but committed after it
+# is not missed.
+WATERMARK_LAG = timedelta(minutes=1)
+
+
+def get_setting(name):
+    return getattr(settings, 'TASK_REMINDERS', {}).get(name, DEFAULTS[name])
+
+
+def dedup_key(task_id, due_date):
+    return f'task:{task_id}:due:{due_date.isoformat()}'
+
+
+def _queue(tasks):
+    """Write outbox rows for the open, assigned ``tasks`` not reminded yet; returns how many."""
+    reminders = {
+        dedup_key(task.id, task.due_date): TaskReminder(
+            task_id=task.id,
+            recipient=task.assignee_email,
+            due_date=task.due_date,
+            dedup_key=dedup_key(task.id, task.due_date),
+        )
+        for task in tasks
+        if task.status != 'DONE' and task.assignee_email
+    }
+    for key in TaskReminder.objects.filter(dedup_key__in=list(reminders)).values_list('dedup_key', flat=True):
+        del reminders[key]
+    # A concurrent scan may still win a key; the unique constraint settles it.
+    TaskReminder.objects.bulk_create(reminders.values(), ignore_conflicts=True)
+    return len(reminders)
+
+
+def _lock_cursor(now):
+    cursor, _ = ReminderCursor.objects.select_for_update().get_or_create(
+        # The first scan starts now: tasks already overdue are not reminded.
+        name=CURSOR_NAME, defaults={'due_date': now, 'task_id': 0, 'updated_at': now},
+    )
+    return cursor
+
+
+def _scan_fields(queryset):
+    return queryset.only('id', 'due_date', 'status', 'assignee_email')
+
+
+def scan_due_tasks(now=None, batch_size=None):
+    """Queue reminders for tasks due before ``now + LEAD_TIME_HOURS``. Returns counts."""
+    now = now or timezone.now()
+    batch_size = batch_size or get_setting('BATCH_SIZE')
+    horizon = now + timedelta(hours=get_setting('LEAD_TIME_HOURS'))
+
+    with transaction.atomic():
+        cursor = _lock_cursor(now)
+        behind_cursor = Q(due_date__lt=cursor.due_date) | Q(due_date=cursor.due_date, id__lte=cursor.task_id)
+        edited = _scan_fields(
+            Task.objects.filter(behind_cursor, updated_at__gt=cursor.updated_at - WATERMARK_LAG, due_date__gte=now)
+        )
+        queued_edits = last_id = 0
+        while True:
+            batch = list(edited.filter(id__gt=last_id).order_by('id')[:batch_size])
+            queued_edits += _queue(batch)
+            if len(batch) < batch_size:
+                break
+            last_id = batch[-1].id
+        cursor.updated_at = now
+        cursor.save(update_fields=['updated_at'])
+
+    scanned = queued = 0
+    while True:
+        with transaction.atomic():
+            cursor = _lock_cursor(now)
+            batch = list(_scan_fields(
+                Task.objects.filter(
+                    Q(due_date__gt=cursor.due_date) | Q(due_date=cursor.due_date, id__gt=cursor.task_id),
+                    due_date__lte=horizon,
+                ).order_by('due_date', 'id')
+            )[:batch_size])
+            if not batch:
+                break
+            queued += _queue(batch)
+            scanned += len(batch)
+            cursor.due_date, cursor.task_id = batch[-1].due_date, batch[-1].id
+            cursor.save(update_fields=['due_date', 'task_id'])
+        if len(batch) < batch_size:
+            break
+
+    return {'scanned': scanned, 'queued': queued, 'queued_edits': queued_edits}
+
+
+def format_reminder(recipient, reminders):
+    """Return (subject, body) of the message for one assignee."""
+    subject = (
+        f"{len(reminders)} tasks due soon" if len(reminders) > 1
+        else f"Task due soon: {reminders[0].task.title}"
+    )
+    lines = [
+        f"- {reminder.task.title} ({reminder.task.project.name}), due {reminder.due_date:%Y-%m-%d %H:%M %Z}"
+        for reminder in reminders
+    ]
+    return subject, '\n'.join(lines)
+
+
+class ConsoleSender:
+    """Prints reminders; for local testing."""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def send(self, recipient, reminders):
+        subject, body = format_reminder(recipient, reminders)
+        self.stream.write(f"To: {recipient}\nSubject: {subject}\n{body}\n\n")
+
+
+class FileSender:
+    """Appends one JSON line per message to TASK_REMINDERS['FILE_PATH']; for local testing."""
+
+    def __init__(self, path=None):
+        self.path = path or get_setting('FILE_PATH')
+
+    def send(self, recipient, reminders):
+        subject, body = format_reminder(recipient, reminders)
+        with open(self.path, 'a') as output:
+            output.write(json.dumps({
+                'to': recipient,
+                'subject': subject,
+                'body': body,
+                'tasks': [reminder.task_id for reminder in reminders],
+                'sent_at': timezone.now().isoformat(),
+            }) + '\n')
+
+
+class EmailSender:
+    """Sends reminders with Django's email backend."""
+
+    def send(self, recipient, reminders):
+        subject, body = format_reminder(recipient, reminders)
+        send_mail(subject, body, None, [recipient])
+
+
+def get_sender():
+    return import_string(get_setting('SENDER'))()
+
+
+def _drain_batch(sender, batch_size, failed_ids):
+    """Send one batch of pending reminders, skipping ``failed_ids``. Returns counts."""
+    pending = list(
+        TaskReminder.objects.filter(status='PENDING')
+        .exclude(id__in=failed_ids)
+        .select_related('task', 'task__project')
+        .order_by('recipient', 'due_date')[:batch_size]
+    )
+
+    by_recipient = defaultdict(list)
+    cancelled = []
+    for reminder in pending:
+        task = reminder.task
+        if (
+            task.status == 'DONE' or task.assignee_email != reminder.recipient
+            or task.due_date != reminder.due_date or task.project.deleting_at is not None
+            or task.project.is_template
+        ):
+            cancelled.append(reminder.id)
+        else:
+            by_recipient[reminder.recipient].append(reminder)
+    TaskReminder.objects.filter(id__in=cancelled).update(status='CANCELLED')
+
+    sent = failed = 0
+    for recipient, reminders in by_recipient.items():
+        try:
+            sender.send(recipient, reminders)
+        except Exception:
+            # Left PENDING; the next drain retries.
+            logger.exception("Sending %d reminder(s) to %s failed", len(reminders), recipient)
+            failed += len(reminders)
+            failed_ids.update(reminder.id for reminder in reminders)
+            continue
+        TaskReminder.objects.filter(id__in=[reminder.id for reminder in reminders]).update(
+            status='SENT', sent_at=timezone.now()
+        )
+        sent += len(reminders)
+
+    return {
+        'sent': sent,
+        'failed': failed,
+        'cancelled': len(cancelled),
+        'recipients': len(by_recipient),
+        'fetched': len(pending),
+    }
+
+
+def drain_outbox(sender=None, batch_size=None, time_budget=None):
+    """
+    Send pending reminders, one message per recipient, until a batch comes
+    back short or ``time_budget`` seconds have passed. Returns the counts
+    summed over the batches; ``more`` is true when the budget ran out first.
+    """
+    sender = sender or get_sender()
+    batch_size = batch_size or get_setting('BATCH_SIZE')
+    deadline = time.monotonic() + (time_budget or get_setting('TIME_BUDGET_SECONDS'))
+    # Failed reminders stay PENDING for the next drain, not this one.
+    failed_ids = set()
+    totals = {'sent': 0, 'failed': 0, 'cancelled': 0, 'recipients': 0, 'more': False}
+    while True:
+        counts = _drain_batch(sender, batch_size, failed_ids)
+        for name in ('sent', 'failed', 'cancelled', 'recipients'):
+            totals[name] += counts[name]
+        if counts['fetched'] < batch_size:
+            return totals
+        if time.monotonic() > deadline:
+            totals['more'] = True
+            return totals
@@ -0,0 +1,48 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.versioning import bump_organization_version_on_commit
+from organizations.changes import record_change
+from projects.models import Project
+
+from .models import Label, Task, TaskComment
+
+
+def organization_id_for_project(project_id):
+    return Project.objects.filter(id=project_id).values_list('organization_id', flat=True).first()
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def bump_version_on_task_change(sender, instance, signal, **kwargs):
+    """Invalidate cached responses of the task's organization and log the change."""
+    organization_id = organization_id_for_project(instance.project_id)
+    bump_organization_version_on_commit(organization_id)
+    record_change(organization_id, instance, deleted=signal is post_delete)
+
+
+@receiver(post_save, sender=Task)
+def rebalance_column_of_new_task(sender, instance, created, **kwargs):
+    """New tasks go to the top of their column; renumber it once that key grows long."""
+    # tasks.board imports this module.
+    from .board import MAX_RANK_LENGTH, schedule_rebalance
+
+    if created and len(instance.rank) > MAX_RANK_LENGTH:
+        schedule_rebalance(instance.project_id, instance.status)
+
+
+@receiver(post_save, sender=TaskComment)
+@receiver(post_delete, sender=TaskComment)
+def bump_version_on_comment_change(sender, instance, signal, **kwargs):
+    """Invalidate cached responses of the comment's organization and log the change."""
+    project_id = Task.objects.filter(id=instance.task_id).values_list('project_id', flat=True).first()
+    organization_id = organization_id_for_project(project_id)
+    bump_organization_version_on_commit(organization_id)
+    record_change(organization_id, instance, deleted=signal is post_delete)
+
+
+@receiver(post_save, sender=Label)
+@receiver(post_delete, sender=Label)
+def bump_version_on_label_change(sender, instance, **kwargs):
+    """Invalidate cached responses of the label's organization."""
+    bump_organization_version_on_commit(instance.organization_id)
@@ -0,0 +1,521 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core import conditional
+from core.schema import schema
+from jobs.models import Job
+from organizations.changes import changes_since
+from organizations.models import ChangeLogEntry, Organization
+from projects.models import Project
+from .archive import archive_project, unarchive_project
+from .board import MAX_RANK_LENGTH, REBALANCE_JOB, InvalidMove, column, move_task, rebalance_column
+from .cloning import available_name, clone_project
+from .deletion import mark_organization_deleted, mark_project_deleted, purge
+from .dependencies import DependencyCycle, add_dependency, creates_cycle
+from .labels import LABEL_MATCH_ALL, LABEL_MATCH_ANY, filter_by_labels, labels_with_counts, set_task_labels
+from .models import ArchivedTask, ArchivedTaskComment, Label, Task, TaskComment, TaskReminder
+from .ranking import rank_between
+from .reminders import dedup_key, drain_outbox
+from .updates import ProjectArchiving, TaskConflict, update_task
+
+
+class DependencyCycleTests(TestCase):
+    def setUp(self):
+        organization = Organization.objects.create(name="Acme", contact_email="ops@acme.test")
+        project = Project.objects.create(organization=organization, name="Launch")
+        self.first, self.second, self.third = (
+            Task.objects.create(project=project, title=title) for title in ("First", "Second", "Third")
+        )
+
+    def test_rejects_cycles(self):
+        add_dependency(self.second.id, self.first.id)
+        add_dependency(self.third.id, self.second.id)
+        with self.assertRaises(DependencyCycle):
+            add_dependency(self.first.id, self.third.id)
+        with self.assertRaises(DependencyCycle):
+            add_dependency(self.first.id, self.first.id)
+
+    def test_seed_has_the_column_type(self):
+        # A bare ``SELECT %s`` seed is typed integer on PostgreSQL and
+        # clashes with the bigint recursive term.
+        with CaptureQueriesContext(connection) as queries:
+            creates_cycle(self.first.id, self.second.id)
+        sql = queries.captured_queries[-1]['sql']
+        self.assertIn('WITH RECURSIVE', sql)
+        self.assertNotRegex(sql, r'AS \(SELECT \d+ UNION')
+        self.assertIn(f'FROM {connection.ops.quote_name(Task._meta.db_table)} WHERE', sql)
+
+
+class ArchiveTransitionTests(TestCase):
+    def setUp(self):
+        organization = Organization.objects.create(name="Acme", contact_email="ops@acme.test")
+        self.project = Project.objects.create(organization=organization, name="Done", status='COMPLETED')
+        self.task = Task.objects.create(project=self.project, title="Ship")
+
+    def test_task_writes_are_refused_while_tasks_move(self):
+        Project.objects.filter(id=self.project.id).update(archive_transition='RESTORING')
+        with self.assertRaises(ProjectArchiving):
+            update_task(self.task.id, status='DONE')
+        result = schema.execute(
+            'mutation($p: ID!) { createTask(projectId: $p, title: "New") { success errors } }',
+            variable_values={'p': self.project.id},
+        )
+        self.assertFalse(result.data['createTask']['success'])
+        result = schema.execute(
+            'mutation($t: ID!) { createTaskComment(taskId: $t, content: "x", authorEmail: "a@acme.test") '
+            '{ success errors } }',
+            variable_values={'t': self.task.id},
+        )
+        self.assertEqual(result.data['createTaskComment']['errors'], [str(ProjectArchiving())])
+
+    def test_round_trip_clears_the_transition(self):
+        archive_project(self.project, batch_size=1)
+        self.project.refresh_from_db()
+        self.assertTrue(self.project.is_archived)
+        self.assertFalse(self.project.is_moving_tasks)
+        self.assertTrue(ArchivedTask.objects.filter(id=self.task.id).exists())
+        unarchive_project(self.project, batch_size=1)
+        self.project.refresh_from_db()
+        self.assertFalse(self.project.is_moving_tasks)
+        self.assertEqual(update_task(self.task.id, status='DONE').status, 'DONE')
+
+
+class PendingDeletionTests(TestCase):
+    def setUp(self):
+        self.organization = Organization.objects.create(name="Acme", contact_email="ops@acme.test")
+        self.project = Project.objects.create(organization=self.organization, name="Old")
+        self.task = Task.objects.create(project=self.project, title="Ship")
+
+    def assert_not_writable(self):
+        with self.assertRaises(Task.DoesNotExist):
+            update_task(self.task.id, status='DONE')
+        self.task.refresh_from_db()
+        self.assertEqual((self.task.status, self.task.version), ('TODO', 1))
+
+    def test_tasks_of_deleted_project_are_not_updated(self):
+        mark_project_deleted(self.project)
+        self.assert_not_writable()
+
+    def test_tasks_of_deleted_organization_are_not_updated(self):
+        Organization.objects.filter(id=self.organization.id).update(deleting_at=self.project.created_at)
+        self.assert_not_writable()
+
+    def test_stale_version_is_still_a_conflict(self):
+        with self.assertRaises(TaskConflict):
+            update_task(self.task.id, expected_version=5, status='DONE')
+
+    def test_deletion_poll_sees_the_purge_finish(self):
+        deletion = mark_project_deleted(self.project)
+        query = '{ deletion(id: "%d") { isFinished deletedRows } }' % deletion.id
+        # The worker bumps no data version, so none may validate the poll.
+        self.assertIsNone(conditional.version_etag(query, None, None))
+        first = self.client.get('/graphql/', {'query': query})
+        self.assertFalse(first.json()['data']['deletion']['isFinished'])
+        purge(deletion.id)
+        second = self.client.get('/graphql/', {'query': query}, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 200)
+        self.assertTrue(second.json()['data']['deletion']['isFinished'])
+        self.assertFalse(Task.objects.filter(id=self.task.id).exists())
+
+
+class DrainOutboxTests(TestCase):
+    class Sender:
+        def __init__(self):
+            self.sent = []
+
+        def send(self, recipient, reminders):
+            if recipient == 'broken@acme.test':
+                raise OSError("mailbox unavailable")
+            self.sent.append(recipient)
+
+    def setUp(self):
+        organization = Organization.objects.create(name="Acme", contact_email="ops@acme.test")
+        project = Project.objects.create(organization=organization, name="Launch")
+        due = timezone.now() + timedelta(hours=1)
+        for number in range(7):
+            recipient = 'broken@acme.test' if number == 0 else f'user{number}@acme.test'
+            task = Task.objects.create(project=project, title=f"Task {number}", assignee_email=recipient, due_date=due)
+            TaskReminder.objects.create(
+                task=task, recipient=recipient, due_date=due, dedup_key=dedup_key(task.id, due)
+            )
+
+    def test_drains_every_batch_and_skips_failures(self):
+        sender = self.Sender()
+        result = drain_outbox(sender, batch_size=2)
+        self.assertEqual((result['sent'], result['failed'], result['more']), (6, 1, False))
+        self.assertEqual(len(sender.sent), 6)
+        self.assertEqual(TaskReminder.objects.filter(status='PENDING').count(), 1)
+
+    def test_stops_at_the_time_budget(self):
+        result = drain_outbox(self.Sender(), batch_size=2, time_budget=-1)
+        self.assertEqual(result['sent'] + result['failed'], 2)
+        self.assertTrue(result['more'])
+
+
+class TopInsertRankTests(TestCase):
+    def test_keys_grow_slowly_at_an_open_end(self):
+        top = bottom = None
+        for _ in range(1000):
+            top = rank_between(None, top)
+            bottom = rank_between(bottom, None)
+        self.assertLessEqual(len(top), 30)
+        self.assertLessEqual(len(bottom), 30)
+
+    def test_creating_a_long_key_schedules_a_rebalance(self):
+        organization = Organization.objects.create(name="Acme", contact_email="ops@acme.test")
+        project = Project.objects.create(organization=organization, name="Launch")
+        old = Task.objects.create(project=project, title="Old")
+        Task.objects.filter(id=old.id).update(rank='0' * MAX_RANK_LENGTH + '1')
+        self.assertFalse(Job.objects.filter(name=REBALANCE_JOB).exists())
+        task = Task.objects.create(project=project, title="New")
+        self.assertGreater(len(task.rank), MAX_RANK_LENGTH)
+        job = Job.objects.get(name=REBALANCE_JOB)
+        self.assertEqual(job.payload, {'project_id': project.id, 'status': 'TODO'})
+
+
+@override_settings(CHANGE_LOG={'SETTLE_SECONDS': 0})
+class PurgeChangeLogTests(TestCase):
+    def test_purge_logs_deletes_of_the_children(self):
+        organization = Organization.objects.create(name="Acme", contact_email="ops@acme.test")
+        project = Project.objects.create(organization=organization, name="Old")
+        tasks = [Task.objects.create(project=project, title=f"Task {number}") for number in range(3)]
+        comment = TaskComment.objects.create(task=tasks[0], content="Done?", author_email="a@acme.test")
+        archived = Project.objects.create(organization=organization, name="Archived", status='COMPLETED')
+        archived_task = Task.objects.create(project=archived, title="Shipped")
+        archive_project(archived)
+        cursor = ChangeLogEntry.objects.order_by('-id').values_list('id', flat=True).first()
+
+        for deleted in (project, archived):
+            purge(mark_project_deleted(deleted).id, batch_size=2)
+        deletes = set(changes_since(organization.id, cursor, 100)['deletes'])
+        self.assertEqual(deletes, {
+            ('Project', project.id), ('Project', archived.id), ('TaskComment', comment.id),
+            ('Task', archived_task.id), *(('Task', task.id) for task in tasks),
+        })
+
+    def test_organization_purge_logs_its_projects(self):
+        organization = Organization.objects.create(name="Acme", contact_email="ops@acme.test")
+        project = Project.objects.create(organization=organization, name="Launch")
+        task = Task.objects.create(project=project, title="Ship")
+        cursor = ChangeLogEntry.objects.order_by('-id').values_list('id', flat=True).first()
+        purge(mark_organization_deleted(organization).id)
+        deletes = set(changes_since(organization.id, cursor, 100)['deletes'])
+        self.assertEqual(deletes, {('Organization', organization.id), ('Project', project.id), ('Task', task.id)})
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        self.organization = Organization.objects.create(name="Acme", contact_email="ops@acme.test")
+        self.project = Project.objects.create(organization=self.organization, name="Shipped", status='COMPLETED')
+        self.first = Task.objects.create(project=self.project, title="First", status='DONE')
+        self.second = Task.objects.create(project=self.project, title="Second")
+        self.comment = TaskComment.objects.create(task=self.first, content="Done", author_email="a@acme.test")
+        self.label = Label.objects.create(organization=self.organization, name="Backend")
+        set_task_labels(self.second.id, [self.label.id])
+        add_dependency(self.second.id, self.first.id)
+
+    def test_rows_move_with_their_ids(self):
+        self.assertEqual(archive_project(self.project, batch_size=1), 2)
+        self.assertFalse(Task.objects.filter(project=self.project).exists())
+        self.assertFalse(TaskComment.objects.filter(task__project=self.project).exists())
+        archived = ArchivedTask.objects.get(id=self.second.id)
+        self.assertEqual(list(archived.labels.all()), [self.label])
+        self.assertEqual(list(archived.depends_on.all()), [ArchivedTask.objects.get(id=self.first.id)])
+        self.assertEqual(ArchivedTaskComment.objects.get(id=self.comment.id).task_id, self.first.id)
+
+        unarchive_project(self.project, batch_size=1)
+        self.assertFalse(ArchivedTask.objects.exists())
+        task = Task.objects.get(id=self.second.id)
+        self.assertEqual(list(task.labels.all()), [self.label])
+        self.assertEqual(list(task.depends_on.all()), [self.first])
+        self.assertEqual(TaskComment.objects.get(id=self.comment.id).task_id, self.first.id)
+
+    def test_archived_projects_are_read_from_the_archive(self):
+        archive_project(self.project)
+        result = schema.execute(
+            'query($p: ID!, $t: ID!) { tasks(projectId: $p) { title comments { content } } '
+            'task(id: $t) { title } project(id: $p) { taskCount completionRate } }',
+            variable_values={'p': self.project.id, 't': self.first.id},
+        )
+        self.assertIsNone(result.errors)
+        self.assertEqual(
+            sorted((task['title'], len(task['comments'])) for task in result.data['tasks']),
+            [("First", 1), ("Second", 0)],
+        )
+        self.assertEqual(result.data['task'], {'title': "First"})
+        self.assertEqual(result.data['project'], {'taskCount': 2, 'completionRate': 50.0})
+
+    def test_command_archives_only_finished_idle_projects(self):
+        active = Project.objects.create(organization=self.organization, name="Active")
+        Task.objects.create(project=active, title="Open")
+        call_command('archive_projects', older_than=0, stdout=StringIO())
+        self.assertTrue(Project.objects.get(id=self.project.id).is_archived)
+        self.assertFalse(Project.objects.get(id=active.id).is_archived)
+        call_command('archive_projects', older_than=0, stdout=StringIO())
+        self.assertEqual(ArchivedTask.objects.count(), 2)
+
+
+class UpdateTaskTests(TestCase):
+    def setUp(self):
+        organization = Organization.objects.create(name="Acme", contact_email="ops@acme.test")
+        self.project = Project.objects.create(organization=organization, name="Launch")
+        self.task = Task.objects.create(project=self.project, title="Ship", assignee_email="dev@acme.test")
+
+    def test_writes_the_task_in_one_statement(self):
+        with CaptureQueriesContext(connection) as queries:
+            task = update_task(self.task.id, expected_version=1, status='DONE')
+        task_queries = [query['sql'] for query in queries.captured_queries if '"tasks_task"' in query['sql']]
+        self.assertEqual(len(task_queries), 1)
+        self.assertTrue(task_queries[0].startswith('UPDATE'))
+        self.assertEqual((task.status, task.version, task.title), ('DONE', 2, "Ship"))
+
+    def test_leaves_other_columns_alone(self):
+        # A concurrent edit of another column, made after this task was read.
+        Task.objects.filter(id=self.task.id).update(title="Ship it")
+        task = update_task(self.task.id, status='IN_PROGRESS')
+        task.refresh_from_db()
+        self.assertEqual((task.title, task.status, task.assignee_email), ("Ship it", 'IN_PROGRESS', "dev@acme.test"))
+
+    def test_stale_version_returns_the_current_task(self):
+        update_task(self.task.id, status='IN_PROGRESS')
+        with self.assertRaises(TaskConflict) as raised:
+            update_task(self.task.id, expected_version=1, status='DONE')
+        self.assertEqual(raised.exception.task.version, 2)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.status, 'IN_PROGRESS')
+
+    def test_mutation_reports_conflicts(self):
+        mutation = (
+            'mutation($t: ID!, $v: Int) { updateTaskStatus(taskId: $t, status: "DONE", expectedVersion: $v) '
+            '{ success errors task { status version } } }'
+        )
+        result = schema.execute(mutation, variable_values={'t': self.task.id, 'v': 1})
+        self.assertEqual(result.data['updateTaskStatus']['task'], {'status': 'DONE', 'version': 2})
+        result = schema.execute(mutation, variable_values={'t': self.task.id, 'v': 1})
+        self.assertFalse(result.data['updateTaskStatus']['success'])
+        self.assertEqual(result.data['updateTaskStatus']['task'], {'status': 'DONE', 'version': 2})
+
+
+class BoardTests(TestCase):
+    def setUp(self):
+        organization = Organization.objects.create(name="Acme", contact_email="ops@acme.test")
+        self.project = Project.objects.create(organization=organization, name="Launch")
+        for title in ("A", "B", "C", "D"):
+            Task.objects.create(project=self.project, title=title)
+
+    def titles(self, status='TODO'):
+        return list(column(self.project.id, status).values_list('title', flat=True))
+
+    def task(self, title):
+        return Task.objects.get(project=self.project, title=title)
+
+    def test_moves_between_neighbours(self):
+        order = self.titles()
+        moved = order[-1]
+        move_task(self.task(moved).id, 'TODO', before_id=self.task(order[0]).id, after_id=self.task(order[1]).id)
+        self.assertEqual(self.titles(), [order[0], moved, *order[1:-1]])
+        # Only a neighbour below: right above it.
+        move_task(self.task(order[0]).id, 'TODO', after_id=self.task(order[2]).id)
+        self.assertEqual(self.titles(), [moved, order[1], order[0], order[2]])
+
+    def test_moves_to_the_top_of_another_column(self):
+        move_task(self.task("A").id, 'DONE')
+        move_task(self.task("B").id, 'DONE')
+        self.assertEqual(self.titles('DONE'), ["B", "A"])
+        self.assertNotIn("A", self.titles())
+
+    def test_rejects_neighbours_outside_the_column_or_out_of_order(self):
+        order = self.titles()
+        move_task(self.task(order[0]).id, 'DONE')
+        with self.assertRaises(InvalidMove):
+            move_task(self.task(order[1]).id, 'TODO', before_id=self.task(order[0]).id)
+        with self.assertRaises(InvalidMove):
+            move_task(
+                self.task(order[1]).id, 'TODO', before_id=self.task(order[3]).id, after_id=self.task(order[2]).id
+            )
+
+    def test_rebalance_keeps_the_order(self):
+        order = self.titles()
+        moves = 0
+        while not Job.objects.filter(name=REBALANCE_JOB).exists():
+            # Keep squeezing the last task in right below the first one.
+            current = self.titles()
+            move_task(self.task(current[-1]).id, 'TODO', before_id=self.task(current[0]).id,
+                      after_id=self.task(current[1]).id)
+            moves += 1
+            self.assertLess(moves, 200)
+        before = self.titles()
+        self.assertEqual(rebalance_column(self.project.id, 'TODO'), len(order))
+        self.assertEqual(self.titles(), before)
+        ranks = column(self.project.id, 'TODO').values_list('rank', flat=True)
+        self.assertTrue(all(len(rank) <= MAX_RANK_LENGTH for rank in ranks))
+
+    def test_board_column_query_and_move_mutation(self):
+        order = self.titles()
+        result = schema.execute(
+            'mutation($t: ID!, $b: ID) { moveTask(taskId: $t, status: "TODO", beforeId: $b) { success errors } }',
+            variable_values={'t': self.task(order[0]).id, 'b': self.task(order[1]).id},
+        )
+        self.assertTrue(result.data['moveTask']['success'])
+        result = schema.execute(
+            'query($p: ID!) { boardColumn(projectId: $p, status: "TODO") { title } }',
+            variable_values={'p': self.project.id},
+        )
+        self.assertEqual(
+            [task['title'] for task in result.data['boardColumn']], [order[1], order[0], *order[2:]]
+        )
+
+
+class CloneProjectTests(TestCase):
+    def setUp(self):
+        self.organization = Organization.objects.create(name="Acme", contact_email="ops@acme.test")
+        self.due = timezone.now() + timedelta(days=10)
+        self.source = Project.objects.create(organization=self.organization, name="Launch", due_date=self.due)
+        self.design = Task.objects.create(project=self.source, title="Design", due_date=self.due, status='DONE')
+        self.build = Task.objects.create(project=self.source, title="Build")
+        add_dependency(self.build.id, self.design.id)
+        self.urgent = Label.objects.create(organization=self.organization, name="urgent", color="red")
+        set_task_labels(self.design.id, [self.urgent.id])
+        TaskComment.objects.create(task=self.design, content="Looks good", author_email="a@acme.test")
+
+    def test_copies_tasks_labels_and_dependencies(self):
+        copy = clone_project(self.source, self.organization, due_date_shift=7)
+        self.assertEqual((copy.name, copy.is_template), ("Launch (2)", False))
+        self.assertEqual(copy.due_date, self.due + timedelta(days=7))
+        tasks = {task.title: task for task in copy.tasks.all()}
+        self.assertEqual(set(tasks), {"Design", "Build"})
+        design = tasks["Design"]
+        self.assertEqual((design.status, design.rank, design.version), ('DONE', self.design.rank, 1))
+        self.assertEqual(design.due_date, self.due + timedelta(days=7))
+        self.assertEqual(list(design.labels.all()), [self.urgent])
+        self.assertEqual(list(tasks["Build"].depends_on.all()), [design])
+        self.assertFalse(TaskComment.objects.filter(task__project=copy).exists())
+        logged = set(
+            ChangeLogEntry.objects.filter(model='Task', object_id__in=[design.id, tasks["Build"].id])
+            .values_list('object_id', flat=True)
+        )
+        self.assertEqual(logged, {design.id, tasks["Build"].id})
+
+    def test_query_count_does_not_grow_with_the_tasks(self):
+        def clone_queries():
+            with CaptureQueriesContext(connection) as queries:
+                clone_project(self.source, self.organization, include_comments=True)
+            return len(queries.captured_queries)
+
+        few = clone_queries()
+        for number in range(20):
+            task = Task.objects.create(project=self.source, title=f"Step {number}")
+            TaskComment.objects.create(task=task, content="Noted", author_email="a@acme.test")
+        self.assertEqual(clone_queries(), few)
+
+    def test_copies_comments_on_request(self):
+        copy = clone_project(self.source, self.organization, include_comments=True)
+        self.assertEqual(
+            list(TaskComment.objects.filter(task__project=copy).values_list('task__title', 'content')),
+            [("Design", "Looks good")],
+        )
+
+    def test_copies_into_another_organization_use_its_labels(self):
+        other = Organization.objects.create(name="Globex", contact_email="ops@globex.test")
+        copy = clone_project(self.source, other, name="Launch")
+        self.assertEqual(copy.name, "Launch")
+        label = Task.objects.get(project=copy, title="Design").labels.get()
+        self.assertEqual((label.organization_id, label.name, label.color), (other.id, "urgent", "red"))
+        # A second copy reuses the label created by the first.
+        clone_project(self.source, other)
+        self.assertEqual(Label.objects.filter(organization=other).count(), 1)
+
+    def test_templates(self):
+        template = clone_project(self.source, self.organization, name="Checklist", as_template=True)
+        self.assertTrue(template.is_template)
+        result = schema.execute('{ projectTemplates(organizationSlug: "acme") { name } }')
+        self.assertEqual(result.data['projectTemplates'], [{'name': "Checklist"}])
+        project = clone_project(template, self.organization, name="Q3 launch")
+        self.assertFalse(project.is_template)
+        self.assertEqual(project.tasks.count(), 2)
+
+    def test_names_get_the_first_free_suffix(self):
+        self.assertEqual(available_name(self.organization.id, "Launch"), "Launch (2)")
+        second = clone_project(self.source, self.organization)
+        # Cloning a copy numbers from the original name.
+        self.assertEqual(clone_project(second, self.organization).name, "Launch (3)")
+        self.assertEqual(available_name(self.organization.id, "Other"), "Other")
+
+    def test_clone_mutation_copies_archived_projects(self):
+        Project.objects.filter(id=self.source.id).update(status='COMPLETED')
+        self.source.refresh_from_db()
+        archive_project(self.source)
+        result = schema.execute(
+            'mutation($p: ID!) { cloneProject(projectId: $p, name: "Relaunch", includeComments: true) '
+            '{ success errors project { name tasks { title comments { content } } } } }',
+            variable_values={'p': self.source.id},
+        )
+        self.assertEqual(result.data['cloneProject']['errors'], [])
+        tasks = sorted(result.data['cloneProject']['project']['tasks'], key=lambda task: task['title'])
+        self.assertEqual(tasks, [
+            {'title': "Build", 'comments': []},
+            {'title': "Design", 'comments': [{'content': "Looks good"}]},
+        ])
+
+
+class LabelTests(TestCase):
+    def setUp(self):
+        self.organization = Organization.objects.create(name="Acme", contact_email="ops@acme.test")
+        self.project = Project.objects.create(organization=self.organization, name="Launch")
+        self.bug, self.ui, self.docs = (
+            Label.objects.create(organization=self.organization, name=name) for name in ("bug", "ui", "docs")
+        )
+        self.both = Task.objects.create(project=self.project, title="Both")
+        self.bug_only = Task.objects.create(project=self.project, title="Bug only", status='DONE')
+        self.plain = Task.objects.create(project=self.project, title="Plain")
+        set_task_labels(self.both.id, [self.bug.id, self.ui.id])
+        set_task_labels(self.bug_only.id, [self.bug.id])
+
+    def titles(self, label_ids, match):
+        tasks = filter_by_labels(Task.objects.filter(project=self.project), label_ids, match)
+        return set(tasks.values_list('title', flat=True))
+
+    def test_filter_matches_any_or_all_labels(self):
+        self.assertEqual(self.titles([self.bug.id, self.ui.id], LABEL_MATCH_ANY), {"Both", "Bug only"})
+        self.assertEqual(self.titles([self.bug.id, self.ui.id], LABEL_MATCH_ALL), {"Both"})
+        self.assertEqual(self.titles([self.docs.id], LABEL_MATCH_ANY), set())
+        self.assertEqual(self.titles([], LABEL_MATCH_ALL), {"Both", "Bug only", "Plain"})
+
+    def test_tasks_query_filters_by_label(self):
+        result = schema.execute(
+            'query($p: ID!, $l: [ID]) { tasks(projectId: $p, labels: $l, labelMatch: ALL) { title } }',
+            variable_values={'p': self.project.id, 'l': [self.bug.id, self.ui.id]},
+        )
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data['tasks'], [{'title': "Both"}])
+
+    def test_counts_per_label_in_one_query(self):
+        template = Project.objects.create(organization=self.organization, name="Template", is_template=True)
+        step = Task.objects.create(project=template, title="Step")
+        set_task_labels(step.id, [self.docs.id])
+        with self.assertNumQueries(1):
+            counts = [
+                (label.name, label.open_count, label.done_count) for label in labels_with_counts(self.organization)
+            ]
+        self.assertEqual(counts, [("bug", 1, 1), ("docs", 0, 0), ("ui", 1, 0)])
+
+    def test_setting_labels_replaces_them_and_bumps_the_version(self):
+        task = set_task_labels(self.both.id, [self.ui.id, self.docs.id], expected_version=2)
+        self.assertEqual(task.version, 3)
+        self.assertEqual(set(self.both.labels.values_list('name', flat=True)), {"ui", "docs"})
+        with self.assertRaises(TaskConflict):
+            set_task_labels(self.both.id, [], expected_version=2)
+
+    def test_labels_of_other_organizations_are_refused(self):
+        other = Organization.objects.create(name="Globex", contact_email="ops@globex.test")
+        foreign = Label.objects.create(organization=other, name="bug")
+        with self.assertRaises(Label.DoesNotExist):
+            set_task_labels(self.plain.id, [foreign.id])
+        self.plain.refresh_from_db()
+        self.assertEqual((self.plain.version, self.plain.labels.count()), (1, 0))
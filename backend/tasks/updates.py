@@ -0,0 +1,132 @@
+"""
+Narrow, version-checked task updates.
+
+Mutations change one or two columns of a task. Instead of loading the row
+and saving every column back, update_task() issues a single
+
+    UPDATE tasks_task SET <columns>, updated_at = ..., version = version + 1
+    WHERE id = ... AND version = ... RETURNING ...
+
+so concurrent editors never overwrite each other's columns, the row lock
+is held for one statement, and a stale ``version`` becomes a TaskConflict
+instead of a lost update. Tasks of a project being deleted (tasks.deletion)
+are not found, and tasks of one moving to or from the archive tables
+(tasks.archive) are not written; that is a ProjectArchiving error.
+"""
+
+from django.db import connection
+from django.db.models import F
+from django.utils import timezone
+
+from core.versioning import bump_organization_version_on_commit
+from organizations.changes import record_changes
+from projects.models import Project
+from .models import Task
+from .signals import organization_id_for_project
+
+
+class TaskConflict(Exception):
+    """The task changed since the version the client last read."""
+
+    def __init__(self, task):
+        super().__init__(
+            f"Task was modified by someone else (current version is {task.version})"
+        )
+        self.task = task
+
+
+class ProjectArchiving(Exception):
+    """The task's project is being moved to or from the archive tables."""
+
+    def __init__(self):
+        super().__init__("Project is being archived or restored, please retry")
+
+
+def writable_projects():
+    """Projects whose tasks may be written: not being deleted, nor their organization."""
+    return Project.all_objects.filter(
+        deleting_at__isnull=True, organization__deleting_at__isnull=True, archive_transition=''
+    )
+
+
+def get_writable_task(task_id):
+    """Return the live task ``task_id``. Raises Task.DoesNotExist or ProjectArchiving."""
+    task = (
+        Task.objects.filter(
+            id=task_id, project__deleting_at__isnull=True, project__organization__deleting_at__isnull=True
+        )
+        .select_related('project').first()
+    )
+    if task is None:
+        raise Task.DoesNotExist("Task not found")
+    if task.project.is_moving_tasks:
+        raise ProjectArchiving
+    return task
+
+
+def _supports_update_returning():
+    # MariaDB can RETURN from INSERT but not from UPDATE.
+    return connection.vendor in ('postgresql', 'sqlite') and connection.features.can_return_columns_from_insert
+
+
+def _update_returning(task_id, expected_version, values):
+    quote = connection.ops.quote_name
+    meta = Task._meta
+    assignments = []
+    params = []
+    for name, value in values.items():
+        field = meta.get_field(name)
+        assignments.append(f'{quote(field.column)} = %s')
+        params.append(field.get_db_prep_save(value, connection))
+    version = quote(meta.get_field('version').column)
+    assignments.append(f'{version} = {version} + 1')
+
+    projects, project_params = writable_projects().order_by().values('id').query.sql_with_params()
+    where = f'{quote(meta.pk.column)} = %s AND {quote(meta.get_field("project").column)} IN ({projects})'
+    params.extend([task_id, *project_params])
+    if expected_version is not None:
+        where += f' AND {version} = %s'
+        params.append(expected_version)
+
+    columns = ', '.join(quote(field.column) for field in meta.concrete_fields)
+    # raw() maps the RETURNING row onto a Task, applying the field converters.
+    updated = list(Task.objects.raw(
+        f'UPDATE {quote(meta.db_table)} SET {", ".join(assignments)} '
+        f'WHERE {where} RETURNING {columns}',
+        params,
+    ))
+    return updated[0] if updated else None
+
+
+def _update_then_select(task_id, expected_version, values):
+    tasks = Task.objects.filter(id=task_id, project__in=writable_projects())
+    if expected_version is not None:
+        tasks = tasks.filter(version=expected_version)
+    if not tasks.update(version=F('version') + 1, **values):
+        return None
+    return Task.objects.get(id=task_id)
+
+
+def update_task(task_id, expected_version=None, **values):
+    """
+    Set ``values`` on a task in one statement and return the updated task.
+
+    With ``expected_version`` the update only applies if the task is still
+    at that version. Raises Task.DoesNotExist, ProjectArchiving or
+    TaskConflict.
+    """
+    task_id = Task._meta.pk.to_python(task_id)
+    values['updated_at'] = timezone.now()
+    if _supports_update_returning():
+        task = _update_returning(task_id, expected_version, values)
+    else:
+        task = _update_then_select(task_id, expected_version, values)
+
+    if task is None:
+        raise TaskConflict(get_writable_task(task_id))
+
+    # Bypasses save(), so do what the post_save signal would.
+    organization_id = organization_id_for_project(task.project_id)
+    bump_organization_version_on_commit(organization_id)
+    record_changes(organization_id, 'Task', [task.id])
+    return task
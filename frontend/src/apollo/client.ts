@@ -6,6 +6,8 @@ import { setContext } from '@apollo/client/link/context';
 const httpLink = createHttpLink({
   uri: 'http://localhost:8000/graphql/',
   credentials: 'omit', // Add this for debugging
+  // Queries go out as GET so the browser can revalidate them with ETags
+  useGETForQueries: true,
 });
 
 // Error handling link
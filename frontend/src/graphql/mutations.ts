@@ -98,8 +98,8 @@ export const CREATE_TASK = gql`
 `;
 
 export const UPDATE_TASK_STATUS = gql`
-  mutation UpdateTaskStatus($taskId: ID!, $status: String!) {
-    updateTaskStatus(taskId: $taskId, status: $status) {
+  mutation UpdateTaskStatus($taskId: ID!, $status: String!, $expectedVersion: Int) {
+    updateTaskStatus(taskId: $taskId, status: $status, expectedVersion: $expectedVersion) {
       success
       errors
       task {
@@ -107,6 +107,7 @@ export const UPDATE_TASK_STATUS = gql`
         title
         status
         updatedAt
+        version
         project {
           id
           name
@@ -175,3 +176,133 @@ export const UPDATE_ORGANIZATION = gql`
   }
 `;
 
+
+// Deletions hide the record at once; poll GET_DELETION for progress
+export const DELETE_ORGANIZATION = gql`
+  mutation DeleteOrganization($id: ID!) {
+    deleteOrganization(id: $id) {
+      success
+      errors
+      deletion {
+        id
+        isFinished
+      }
+    }
+  }
+`;
+
+export const DELETE_PROJECT = gql`
+  mutation DeleteProject($id: ID!) {
+    deleteProject(id: $id) {
+      success
+      errors
+      deletion {
+        id
+        isFinished
+      }
+    }
+  }
+`;
+
+// Copies tasks (and optionally comments) server-side; pass a template's id
+// to start a project from it, or asTemplate to save one
+export const CLONE_PROJECT = gql`
+  mutation CloneProject(
+    $projectId: ID!
+    $targetOrganizationSlug: String
+    $name: String
+    $includeComments: Boolean
+    $dueDateShift: Int
+    $asTemplate: Boolean
+  ) {
+    cloneProject(
+      projectId: $projectId
+      targetOrganizationSlug: $targetOrganizationSlug
+      name: $name
+      includeComments: $includeComments
+      dueDateShift: $dueDateShift
+      asTemplate: $asTemplate
+    ) {
+      success
+      errors
+      project {
+        id
+        name
+        description
+        status
+        dueDate
+        isTemplate
+        taskCount
+        createdAt
+        updatedAt
+      }
+    }
+  }
+`;
+
+export const CREATE_LABEL = gql`
+  mutation CreateLabel($organizationSlug: String!, $name: String!, $color: String) {
+    createLabel(organizationSlug: $organizationSlug, name: $name, color: $color) {
+      success
+      errors
+      label {
+        id
+        name
+        color
+      }
+    }
+  }
+`;
+
+export const ADD_DEPENDENCY = gql`
+  mutation AddDependency($taskId: ID!, $dependsOnId: ID!) {
+    addDependency(taskId: $taskId, dependsOnId: $dependsOnId) {
+      success
+      errors
+      task {
+        id
+        dependsOn {
+          id
+          title
+          status
+        }
+      }
+    }
+  }
+`;
+
+export const REMOVE_DEPENDENCY = gql`
+  mutation RemoveDependency($taskId: ID!, $dependsOnId: ID!) {
+    removeDependency(taskId: $taskId, dependsOnId: $dependsOnId) {
+      success
+      errors
+      task {
+        id
+        dependsOn {
+          id
+          title
+          status
+        }
+      }
+    }
+  }
+`;
+
+export const SET_TASK_LABELS = gql`
+  mutation SetTaskLabels($taskId: ID!, $labelIds: [ID]!, $expectedVersion: Int) {
+    setTaskLabels(taskId: $taskId, labelIds: $labelIds, expectedVersion: $expectedVersion) {
+      success
+      errors
+      task {
+        id
+        version
+        updatedAt
+        labels {
+          id
+          name
+          color
+        }
+      }
+    }
+  }
+`;
@@ -80,8 +80,8 @@ export const GET_PROJECT = gql`
 
 // Task queries
 export const GET_TASKS = gql`
-  query GetTasks($projectId: ID!) {
-    tasks(projectId: $projectId) {
+  query GetTasks($projectId: ID!, $labels: [ID], $labelMatch: LabelMatch) {
+    tasks(projectId: $projectId, labels: $labels, labelMatch: $labelMatch) {
       id
       title
       description
@@ -90,6 +90,7 @@ export const GET_TASKS = gql`
       dueDate
       createdAt
       updatedAt
+      version
       project {
         id
         name
@@ -101,6 +102,11 @@ export const GET_TASKS = gql`
       }
       commentCount
       isOverdue
+      labels {
+        id
+        name
+        color
+      }
     }
   }
 `;
@@ -138,6 +144,130 @@ export const GET_ORGANIZATION_STATS = gql`
   }
 `;
 
+// Delta sync: poll with the returned cursor; refetch everything when
+// resyncRequired is true
+export const GET_CHANGES_SINCE = gql`
+  query GetChangesSince($organizationSlug: String!, $cursor: String, $first: Int) {
+    changesSince(organizationSlug: $organizationSlug, cursor: $cursor, first: $first) {
+      organizations {
+        id
+        name
+        slug
+        contactEmail
+        createdAt
+        updatedAt
+      }
+      projects {
+        id
+        name
+        description
+        status
+        dueDate
+        createdAt
+        updatedAt
+        organization {
+          id
+        }
+      }
+      tasks {
+        id
+        title
+        description
+        status
+        assigneeEmail
+        dueDate
+        createdAt
+        updatedAt
+        project {
+          id
+        }
+      }
+      comments {
+        id
+        content
+        authorEmail
+        timestamp
+        task {
+          id
+        }
+      }
+      deleted {
+        typename
+        id
+      }
+      cursor
+      hasMore
+      resyncRequired
+    }
+  }
+`;
+
+// Unfinished tasks waiting for another unfinished task, in dependency order
+export const GET_BLOCKED_TASKS = gql`
+  query GetBlockedTasks($projectId: ID!) {
+    blockedTasks(projectId: $projectId) {
+      id
+      title
+      status
+      assigneeEmail
+      dueDate
+      dependsOn {
+        id
+        title
+        status
+      }
+    }
+  }
+`;
+
+// Longest chain of unfinished tasks, first to last
+export const GET_CRITICAL_PATH = gql`
+  query GetCriticalPath($projectId: ID!) {
+    criticalPath(projectId: $projectId) {
+      id
+      title
+      status
+      assigneeEmail
+      dueDate
+    }
+  }
+`;
+
+// Labels with open/done task counts
+export const GET_LABELS = gql`
+  query GetLabels($organizationSlug: String!) {
+    labels(organizationSlug: $organizationSlug) {
+      id
+      name
+      color
+      openCount
+      doneCount
+    }
+  }
+`;
+
+export const GET_PROJECT_TEMPLATES = gql`
+  query GetProjectTemplates($organizationSlug: String!) {
+    projectTemplates(organizationSlug: $organizationSlug) {
+      id
+      name
+      description
+      taskCount
+    }
+  }
+`;
+
+export const GET_DELETION = gql`
+  query GetDeletion($id: ID!) {
+    deletion(id: $id) {
+      id
+      deletedRows
+      isFinished
+      finishedAt
+    }
+  }
+`;
+
 export const CREATE_PROJECT = gql`
   mutation CreateProject(
     $organizationSlug: String!
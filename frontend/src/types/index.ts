@@ -24,6 +24,7 @@ export interface Project {
   completedTaskCount?: number;
   completionRate?: number;
   isOverdue?: boolean;
+  isTemplate?: boolean;
 }
 
 // Task interface
@@ -39,8 +40,23 @@ export interface Task {
   project: Project;
   commentCount?: number;
   isOverdue?: boolean;
+  version?: number;
+  labels?: Label[];
+  dependsOn?: Task[];
+  dependents?: Task[];
 }
 
+// Label interface
+export interface Label {
+  id: string;
+  name: string;
+  color: string;
+  openCount?: number | null;
+  doneCount?: number | null;
+}
+
+export type LabelMatch = 'ANY' | 'ALL';
+
 // Task Comment interface
 export interface TaskComment {
   id: string;
@@ -92,6 +108,7 @@ export interface CreateTaskCommentForm {
 export interface UpdateTaskStatusForm {
   taskId: string;
   status: string;
+  expectedVersion?: number;
 }
 
 // API Response interfaces
@@ -130,6 +147,36 @@ export interface OrganizationStatsQuery {
   organizationStats: OrganizationStats;
 }
 
+export interface Deletion {
+  id: string;
+  // JSON object: rows deleted so far per table
+  deletedRows?: string;
+  isFinished: boolean;
+  finishedAt?: string | null;
+}
+
+export interface DeletionQuery {
+  deletion: Deletion | null;
+}
+
+export interface DeletedRecord {
+  typename: string;
+  id: string;
+}
+
+export interface ChangesSinceQuery {
+  changesSince: {
+    organizations: Organization[];
+    projects: Project[];
+    tasks: Task[];
+    comments: TaskComment[];
+    deleted: DeletedRecord[];
+    cursor: string;
+    hasMore: boolean;
+    resyncRequired: boolean;
+  } | null;
+}
+
 // GraphQL Mutation interfaces
 export interface CreateOrganizationMutation {
   createOrganization: ApiResponse<Organization>;
@@ -151,3 +198,47 @@ export interface CreateTaskCommentMutation {
   createTaskComment: ApiResponse<TaskComment>;
 }
 
+export interface LabelsQuery {
+  labels: Label[];
+}
+
+export interface CreateLabelMutation {
+  createLabel: { success: boolean; errors?: string[]; label: Label | null };
+}
+
+export interface BlockedTasksQuery {
+  blockedTasks: Task[];
+}
+
+export interface CriticalPathQuery {
+  criticalPath: Task[];
+}
+
+export interface AddDependencyMutation {
+  addDependency: { success: boolean; errors?: string[]; task: Task | null };
+}
+
+export interface RemoveDependencyMutation {
+  removeDependency: { success: boolean; errors?: string[]; task: Task | null };
+}
+
+export interface SetTaskLabelsMutation {
+  setTaskLabels: { success: boolean; errors?: string[]; task: Task | null };
+}
+
+export interface ProjectTemplatesQuery {
+  projectTemplates: Project[];
+}
+
+export interface CloneProjectMutation {
+  cloneProject: { success: boolean; errors?: string[]; project: Project | null };
+}
+
+export interface DeleteOrganizationMutation {
+  deleteOrganization: { success: boolean; errors?: string[]; deletion: Deletion | null };
+}
+
+export interface DeleteProjectMutation {
+  deleteProject: { success: boolean; errors?: string[]; deletion: Deletion | null };
+}
+